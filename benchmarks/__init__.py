@@ -0,0 +1,83 @@
+"""Benchmarks for strider_challenge loads and queries.
+
+Benchmarks run against the database set in `BENCHMARK_DATABASE_URL` (defaults to a
+SQLite file in the temporary directory) using the bundled `data/` files scaled up by
+`BENCHMARK_SCALE` (defaults to 100x). They drop and create the tables, so they never
+use the CLI's `DATABASE_URL`.
+
+"""
+
+import csv
+import os
+import pathlib
+import tempfile
+import time
+from typing import Any, Callable, Sequence
+
+from strider_challenge import adapters
+from strider_challenge.adapters.repository import Record
+
+DATA_FOLDER = pathlib.Path(__file__).parent.parent / "data"
+SCALE = int(os.environ.get("BENCHMARK_SCALE", "100"))
+DATABASE_URL = os.environ.get(
+    "BENCHMARK_DATABASE_URL",
+    f"sqlite:///{pathlib.Path(tempfile.gettempdir()) / 'strider_benchmarks.db'}",
+)
+
+
+def scale_streams(path: str, factor: int = SCALE) -> int:
+    """Write `streams.csv` repeated `factor` times, keeping every stream id unique.
+
+    Args:
+        path: where to write the scaled file.
+        factor: how many copies of the original records to write.
+
+    Returns:
+        number of records written.
+
+    """
+    with open(DATA_FOLDER / "internal" / "streams.csv") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    email = header.index("user_email")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(factor):
+            for row in rows:
+                writer.writerow(
+                    [f"{i}.{v}" if c == email else v for c, v in enumerate(row)]
+                )
+    return len(rows) * factor
+
+
+class NullRepository(adapters.AbstractRepository):
+    """Repository discarding the records, to measure only extract and transform."""
+
+    def _add(self, records: Sequence[Record]) -> None:
+        pass
+
+    def _get(self, reference: str) -> None:
+        return None
+
+
+def timed(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> float:
+    """Run a function and return its wall time in seconds."""
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def report(title: str, results: list[tuple[str, int, float]]) -> None:
+    """Print a table with wall time and throughput for each benchmark case.
+
+    Args:
+        title: benchmark name.
+        results: list of (case name, number of records, seconds).
+
+    """
+    print(f"\n{title}")
+    print(f"{'case':<32}{'records':>12}{'seconds':>12}{'records/s':>14}")
+    for name, records, seconds in results:
+        print(f"{name:<32}{records:>12}{seconds:>12.2f}{records / seconds:>14.0f}")
@@ -0,0 +1,86 @@
+"""Measure the latency of the analytical queries, with and without the indexes."""
+
+import tempfile
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import Index
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATA_FOLDER, DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, analytics, service_layer
+from strider_challenge.domain import model
+
+DECEMBER = (datetime(2021, 12, 1), datetime(2021, 12, 31, 23, 59, 59))
+QUERIES: list[tuple[str, Callable[[Session], Any]]] = [
+    ("movies based on books", analytics.share_of_streamed_movies_based_on_books),
+    (
+        "users streaming a movie",
+        lambda s: analytics.count_users_streaming(
+            s, "Unforgiven", datetime(2021, 12, 25, 7), datetime(2021, 12, 25, 12)
+        ),
+    ),
+    (
+        "movies by nationality",
+        lambda s: analytics.count_streamed_movies_based_on_books_by_nationality(
+            s, "singaporeans", *DECEMBER
+        ),
+    ),
+    ("average duration", analytics.average_stream_duration),
+    ("median size", analytics.median_stream_size),
+    (
+        "users watching half",
+        lambda s: analytics.count_users_watching_at_least(
+            s, 0.5, datetime(2021, 12, 24), DECEMBER[1]
+        ),
+    ),
+]
+INDEXES: list[Index] = [
+    *model.Stream.__table__.indexes,  # type: ignore
+    *model.Review.__table__.indexes,  # type: ignore
+]
+
+
+def _run_queries(session: Session, suffix: str, records: int) -> list:
+    return [
+        (f"{name} ({suffix})", records, min(timed(query, session) for _ in range(3)))
+        for name, query in QUERIES
+    ]
+
+
+def main() -> None:
+    """Load the bundled files (with scaled streams) and time each query."""
+    engine = create_engine(DATABASE_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with tempfile.TemporaryDirectory() as tmp, Session(engine) as session:
+        records = scale_streams(f"{tmp}/streams.csv")
+        service_layer.load_streams(
+            adapters.CsvCollector(path=f"{tmp}/streams.csv"), session=session, fast=True
+        )
+        for load, path in [
+            (service_layer.load_movies, "internal/movies.csv"),
+            (service_layer.load_authors, "vendor/authors.json"),
+            (service_layer.load_books, "vendor/books.json"),
+            (service_layer.load_reviews, "vendor/reviews.json"),
+        ]:
+            collector_cls = adapters.CsvCollector
+            if path.endswith(".json"):
+                collector_cls = adapters.JsonCollector
+            load(collector_cls(path=str(DATA_FOLDER / path)), session=session)
+        # refresh the planner statistics, as the database's maintenance would do
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        results = _run_queries(session, "indexed", records)
+        session.close()
+        for index in INDEXES:
+            index.drop(engine)
+        results += _run_queries(session, "no indexes", records)
+        session.close()
+        for index in INDEXES:
+            index.create(engine)
+    report("analytical queries (records are the streams)", results)
+
+
+if __name__ == "__main__":
+    main()
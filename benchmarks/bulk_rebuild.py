@@ -0,0 +1,40 @@
+"""Compare backfills and full reloads with upserts against bulk rebuilds."""
+
+import tempfile
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.domain import model
+
+CASES = [
+    ("upserts", adapters.SqlRepository),
+    ("bulk rebuild", adapters.RebuildRepository),
+]
+
+
+def main() -> None:
+    """Load the scaled streams file into an empty table and again into a full one."""
+    engine = create_engine(DATABASE_URL)
+    table = SQLModel.metadata.tables[model.Stream.__tablename__]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        records = scale_streams(f"{tmp}/streams.csv")
+        for name, repo_cls in CASES:
+            table.drop(engine, checkfirst=True)
+            table.create(engine)
+            for load in ["backfill", "reload"]:
+                with Session(engine) as session:
+                    seconds = timed(
+                        service_layer.load_streams,
+                        collector=adapters.CsvCollector(path=f"{tmp}/streams.csv"),
+                        repo=repo_cls(model=model.Stream, session=session),
+                        fast=True,
+                    )
+                results.append((f"{name}, {load}", records, seconds))
+    report(f"load streams ({engine.dialect.name})", results)
+
+
+if __name__ == "__main__":
+    main()
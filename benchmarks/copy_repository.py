@@ -0,0 +1,57 @@
+"""Compare PostgreSQL loads with `COPY` against the bulk upsert and ORM paths."""
+
+import tempfile
+from typing import Sequence
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, SCALE, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.adapters.repository import Record
+from strider_challenge.domain import model
+
+
+class OrmRepository(adapters.SqlRepository):
+    """Row by row ORM upserts, like `SqlRepository` before its bulk upserts."""
+
+    def _add(self, records: Sequence[Record]) -> None:
+        for record in records:
+            new_record = self._get(reference=getattr(record, self.pk)) or record
+            for key, value in record.dict().items():  # type: ignore[union-attr]
+                setattr(new_record, key, value)
+            self.session.add(new_record)
+        self.session.commit()
+
+
+# the row by row path is much slower, it loads a tenth of the scaled file
+CASES = [
+    ("orm row by row", OrmRepository, max(SCALE // 10, 1)),
+    ("bulk upsert (SqlRepository)", adapters.SqlRepository, SCALE),
+    ("copy (CopyRepository)", adapters.CopyRepository, SCALE),
+]
+
+
+def main() -> None:
+    """Load the scaled streams file with each repository into an empty table."""
+    engine = create_engine(DATABASE_URL)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("COPY benchmark requires a PostgreSQL BENCHMARK_DATABASE_URL.")
+    table = SQLModel.metadata.tables[model.Stream.__tablename__]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, repo_cls, scale in CASES:
+            records = scale_streams(f"{tmp}/streams.csv", scale)
+            table.drop(engine, checkfirst=True)
+            table.create(engine)
+            with Session(engine) as session:
+                seconds = timed(
+                    service_layer.load_streams,
+                    collector=adapters.CsvCollector(path=f"{tmp}/streams.csv"),
+                    repo=repo_cls(model=model.Stream, session=session),
+                )
+            results.append((name, records, seconds))
+    report("load streams into PostgreSQL", results)
+
+
+if __name__ == "__main__":
+    main()
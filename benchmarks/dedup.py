@@ -0,0 +1,41 @@
+"""Compare loads of a file with repeated records, with and without a digest table."""
+
+import tempfile
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+
+
+def main() -> None:
+    """Load the scaled streams file followed by a copy of its records."""
+    engine = create_engine(DATABASE_URL)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/streams.csv"
+        records = scale_streams(path)
+        with open(path) as f:
+            rows = f.readlines()[1:]
+        with open(path, "a") as f:
+            f.writelines(rows)
+        for name, digest_table in [
+            ("in-batch only", None),
+            ("digest table", adapters.DigestTable(capacity=records)),
+        ]:
+            SQLModel.metadata.drop_all(engine)
+            SQLModel.metadata.create_all(engine)
+            with Session(engine) as session:
+                seconds = timed(
+                    service_layer.load_streams,
+                    collector=adapters.CsvCollector(path=path),
+                    session=session,
+                    fast=True,
+                    digest_table=digest_table,
+                )
+            results.append((name, 2 * records, seconds))
+    report(f"load streams repeated twice ({engine.dialect.name})", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare loads of streams with a default engine and with each tuning profile."""
+
+import tempfile
+
+from sqlalchemy.future import Engine
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.adapters.engine import PROFILES
+
+
+def _load(engine: Engine, path: str, batch_size: int) -> float:
+    if engine.dialect.name == "sqlite":
+        # the journal mode is kept in the database file, start every case from the
+        # default one (the bulk profile switches it to WAL when it connects)
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        return timed(
+            service_layer.load_streams,
+            collector=adapters.CsvCollector(path=path),
+            session=session,
+            fast=True,
+            batch_size=batch_size,
+        )
+
+
+def main() -> None:
+    """Load the scaled streams file with a default engine and with each profile."""
+    url = DATABASE_URL
+    default = create_engine(url)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/streams.csv"
+        records = scale_streams(path)
+        seconds = _load(default, path, service_layer.DEFAULT_BATCH_SIZE)
+        results.append(("default engine", records, seconds))
+        for name, profile in PROFILES.items():
+            seconds = _load(adapters.get_engine(url, profile), path, profile.batch_size)
+            results.append((f"{name} profile", records, seconds))
+    report(f"load streams ({default.dialect.name})", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compare the validated transform path against the fast one for trusted records."""
+
+import json
+import tempfile
+
+from benchmarks import DATA_FOLDER, SCALE, NullRepository, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.domain import model
+
+
+def main() -> None:
+    """Transform the scaled streams and reviews files with and without validation."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        records = scale_streams(f"{tmp}/streams.csv")
+        for fast in [False, True]:
+            seconds = timed(
+                service_layer.load_streams,
+                collector=adapters.CsvCollector(path=f"{tmp}/streams.csv"),
+                repo=NullRepository(model=model.Stream),
+                fast=fast,
+            )
+            results.append(
+                (f"streams ({'fast' if fast else 'validated'})", records, seconds)
+            )
+        reviews = json.loads((DATA_FOLDER / "vendor" / "reviews.json").read_text())
+        with open(f"{tmp}/reviews.json", "w") as f:
+            json.dump(reviews * SCALE, f)
+        for fast in [False, True]:
+            seconds = timed(
+                service_layer.load_reviews,
+                collector=adapters.JsonCollector(path=f"{tmp}/reviews.json"),
+                repo=NullRepository(model=model.Review),
+                fast=fast,
+            )
+            name = f"reviews ({'fast' if fast else 'validated'})"
+            results.append((name, len(reviews) * SCALE, seconds))
+    report("transform records", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare polls of a landing directory loading its files and finding them unchanged."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from sqlmodel import SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters
+from strider_challenge.entrypoints import cli
+
+RULES = [("streams-*.csv", {"model": "stream", "collector": "csv", "fast": True})]
+
+
+def main() -> None:
+    """Ingest a landing directory with the scaled streams file twice."""
+    # the files are loaded by worker processes with the CLI's engine
+    os.environ["DATABASE_URL"] = DATABASE_URL
+    engine = create_engine(DATABASE_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        landing = Path(tmp)
+        records = scale_streams(str(landing / "streams-2021-12.csv"))
+        manifest = adapters.LandingManifest(str(landing / ".ingested.json"))
+        for name in ["new file (loaded)", "unchanged file (skipped)"]:
+            seconds = timed(cli._ingest_once, landing, RULES, manifest, 1)
+            results.append((name, records, seconds))
+    report(f"ingest streams ({engine.dialect.name})", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the in-memory interval index with the equivalent SQL overlap queries."""
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from benchmarks import DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, analytics, service_layer
+from strider_challenge.domain import model
+
+WINDOWS = 200
+
+
+def main() -> None:
+    """Load scaled streams and count the users streaming movies in random windows."""
+    engine = create_engine(DATABASE_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with tempfile.TemporaryDirectory() as tmp, Session(engine) as session:
+        records = scale_streams(f"{tmp}/streams.csv")
+        service_layer.load_streams(
+            adapters.CsvCollector(path=f"{tmp}/streams.csv"), session=session, fast=True
+        )
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        titles = session.exec(select(model.Stream.movie_title).distinct()).all()
+        generator = random.Random(0)
+        windows = []
+        for _ in range(WINDOWS):
+            start = datetime(2021, 12, 1) + timedelta(hours=generator.randrange(744))
+            windows.append(
+                (generator.choice(titles), start, start + timedelta(hours=5))
+            )
+
+        started = time.perf_counter()
+        index = analytics.build_stream_interval_index(session)
+        build_seconds = time.perf_counter() - started
+        assert [index.count(*w) for w in windows] == [
+            analytics.count_users_streaming(session, *w) for w in windows
+        ]
+        results = [
+            (
+                f"sql ({WINDOWS} windows)",
+                records,
+                timed(
+                    lambda: [
+                        analytics.count_users_streaming(session, *w) for w in windows
+                    ]
+                ),
+            ),
+            ("index build", records, build_seconds),
+            (
+                f"index ({WINDOWS} windows)",
+                records,
+                timed(lambda: [index.count(*w) for w in windows]),
+            ),
+            (
+                "sql (1 window)",
+                records,
+                timed(analytics.count_users_streaming, session, *windows[0]),
+            ),
+            (
+                "movie index build (1 window)",
+                records,
+                timed(
+                    lambda: analytics.build_stream_interval_index(
+                        session, windows[0][0]
+                    ).count(*windows[0])
+                ),
+            ),
+        ]
+    report("overlap queries (records are the streams)", results)
+
+
+if __name__ == "__main__":
+    main()
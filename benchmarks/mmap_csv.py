@@ -0,0 +1,47 @@
+"""Compare reading streams with the memory-mapped csv reader and with `csv.reader`."""
+
+import multiprocessing
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks import report, scale_streams
+from strider_challenge import adapters
+
+
+def _read(collector: adapters.CsvCollector) -> tuple[float, int]:
+    # runs in a fresh process, so the peak resident memory is only this read's
+    start = time.perf_counter()
+    for _ in collector.iter_batches(10_000):
+        pass
+    seconds = time.perf_counter() - start
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+
+def main() -> None:
+    """Read the scaled streams file with each collector, in its own process."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/streams.csv"
+        records = scale_streams(path)
+        cases = [
+            ("csv.reader", adapters.CsvCollector(path=path)),
+            ("mmap", adapters.MmapCsvCollector(path=path)),
+            (
+                "mmap (2 fields)",
+                adapters.MmapCsvCollector(
+                    path=path, fields=["movie_title", "user_email"]
+                ),
+            ),
+        ]
+        for name, collector in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                seconds, rss = executor.submit(_read, collector).result()
+            results.append((f"{name}, {rss} MB rss", records, seconds))
+    report("read streams csv (peak resident memory of each reader)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Compare sequential loads of streams with the asyncio pipeline and its writers."""
+
+import tempfile
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.adapters import repository
+
+WRITERS = [0, 1, 2, 4]
+
+
+def main() -> None:
+    """Load the scaled streams file in sequence and with a number of writers."""
+    engine = create_engine(DATABASE_URL)
+    concurrent = engine.dialect.name in repository.CONCURRENT_WRITE_DIALECTS
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        records = scale_streams(f"{tmp}/streams.csv")
+        for writers in [w for w in WRITERS if concurrent or w <= 1]:
+            SQLModel.metadata.drop_all(engine)
+            SQLModel.metadata.create_all(engine)
+            with Session(engine) as session:
+                seconds = timed(
+                    service_layer.load_streams,
+                    collector=adapters.CsvCollector(path=f"{tmp}/streams.csv"),
+                    session=session,
+                    fast=True,
+                    writers=writers,
+                )
+            name = f"pipeline, {writers} writer(s)" if writers else "sequential"
+            results.append((name, records, seconds))
+    report(f"load streams ({engine.dialect.name})", results)
+
+
+if __name__ == "__main__":
+    main()
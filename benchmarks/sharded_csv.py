@@ -0,0 +1,29 @@
+"""Measure how parsing and transforming streams scales with parallel csv shards."""
+
+import os
+import tempfile
+
+from benchmarks import NullRepository, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.domain import model
+
+
+def main() -> None:
+    """Load the scaled streams file with an increasing number of workers."""
+    cpus = os.cpu_count() or 1
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        records = scale_streams(f"{tmp}/streams.csv")
+        for workers in sorted({1, 2, 4, cpus}):
+            seconds = timed(
+                service_layer.load_streams,
+                collector=adapters.CsvCollector(path=f"{tmp}/streams.csv"),
+                repo=NullRepository(model=model.Stream),
+                workers=workers,
+            )
+            results.append((f"{workers} worker(s)", records, seconds))
+    report(f"parse and transform streams ({cpus} cpus)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare loads of an unchanged file with and without the snapshot cache."""
+
+import tempfile
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATABASE_URL, NullRepository, report, scale_streams, timed
+from strider_challenge import adapters, service_layer
+from strider_challenge.domain import model
+
+
+def main() -> None:
+    """Load the scaled streams file again, transforming it or reading its snapshot."""
+    engine = create_engine(DATABASE_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/streams.csv"
+        records = scale_streams(path)
+        cache = adapters.SnapshotCache(f"{tmp}/cache")
+        cases = [
+            ("extract and transform", None, NullRepository(model.Stream)),
+            ("extract, transform and cache", cache, NullRepository(model.Stream)),
+            ("read snapshot", cache, NullRepository(model.Stream)),
+        ]
+        for name, snapshots, repo in cases:
+            seconds = timed(
+                service_layer.load_streams,
+                collector=adapters.CsvCollector(path=path),
+                repo=repo,
+                cache=snapshots,
+            )
+            results.append((name, records, seconds))
+        with Session(engine) as session:
+            service_layer.load_streams(
+                collector=adapters.CsvCollector(path=path),
+                session=session,
+                cache=cache,
+                checkpoints=adapters.LoadCheckpoints(session, model.Stream, path),
+            )
+            seconds = timed(
+                service_layer.load_streams,
+                collector=adapters.CsvCollector(path=path),
+                session=session,
+                cache=cache,
+                checkpoints=adapters.LoadCheckpoints(session, model.Stream, path),
+            )
+            results.append(("loaded file (skipped)", records, seconds))
+    report("load streams again (without writes, except the skipped load)", results)
+
+
+if __name__ == "__main__":
+    main()
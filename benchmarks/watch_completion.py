@@ -0,0 +1,57 @@
+"""Compare the watch completion table with the equivalent SQL join of the streams."""
+
+import tempfile
+import time
+from datetime import date, datetime
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks import DATA_FOLDER, DATABASE_URL, report, scale_streams, timed
+from strider_challenge import adapters, analytics, service_layer
+
+START, END = date(2021, 12, 1), date(2021, 12, 31)
+
+
+def main() -> None:
+    """Load scaled streams and count the users watching half a movie in December."""
+    engine = create_engine(DATABASE_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with tempfile.TemporaryDirectory() as tmp, Session(engine) as session:
+        records = scale_streams(f"{tmp}/streams.csv")
+        service_layer.load_streams(
+            adapters.CsvCollector(path=f"{tmp}/streams.csv"), session=session, fast=True
+        )
+        service_layer.load_movies(
+            adapters.CsvCollector(path=str(DATA_FOLDER / "internal" / "movies.csv")),
+            session=session,
+        )
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        started = time.perf_counter()
+        adapters.WatchCompletions(session).refresh(START, END)
+        refresh_seconds = time.perf_counter() - started
+        results = [
+            (
+                "sql join",
+                records,
+                timed(
+                    analytics.count_users_watching_at_least,
+                    session,
+                    0.5,
+                    datetime.combine(START, datetime.min.time()),
+                    datetime.combine(END, datetime.max.time()),
+                ),
+            ),
+            ("completion refresh", records, refresh_seconds),
+            (
+                "completion query",
+                records,
+                timed(analytics.count_users_completing, session, 0.5, START, END),
+            ),
+        ]
+    report("watch completion (records are the streams)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,16 @@ setup(
     license=about["__license__"],
     url=about["__url__"],
     packages=find_packages(
-        exclude=["tests", "pipenv", "env", "venv", "htmlcov", ".pytest_cache", "pip"]
+        exclude=[
+            "tests",
+            "benchmarks",
+            "pipenv",
+            "env",
+            "venv",
+            "htmlcov",
+            ".pytest_cache",
+            "pip",
+        ]
     ),
     long_description=long_description,
     python_requires=">=3.7, <4",
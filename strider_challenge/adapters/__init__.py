@@ -1,10 +1,51 @@
-from strider_challenge.adapters.collector import Collector, CsvCollector, JsonCollector
-from strider_challenge.adapters.repository import AbstractRepository, SqlRepository
+from strider_challenge.adapters.checkpoint import LoadCheckpoints, fingerprint
+from strider_challenge.adapters.collector import (
+    Collector,
+    CsvCollector,
+    JsonCollector,
+    MmapCsvCollector,
+    compression,
+)
+from strider_challenge.adapters.completion import WatchCompletions
+from strider_challenge.adapters.dead_letter import DeadLetters
+from strider_challenge.adapters.dedup import Deduplicator, DigestTable
+from strider_challenge.adapters.engine import EngineProfile, get_engine
+from strider_challenge.adapters.landing import LandingManifest
+from strider_challenge.adapters.migration import migrate
+from strider_challenge.adapters.repository import (
+    AbstractRepository,
+    CopyRepository,
+    HistoryRepository,
+    RebuildRepository,
+    SqlRepository,
+)
+from strider_challenge.adapters.rollup import StreamRollups
+from strider_challenge.adapters.snapshot import Snapshot, SnapshotCache
+from strider_challenge.adapters.statistics import StreamSketches
 
 __all__ = [
     "Collector",
     "CsvCollector",
     "JsonCollector",
+    "MmapCsvCollector",
+    "compression",
     "AbstractRepository",
+    "CopyRepository",
+    "HistoryRepository",
+    "RebuildRepository",
     "SqlRepository",
+    "LoadCheckpoints",
+    "fingerprint",
+    "StreamRollups",
+    "StreamSketches",
+    "WatchCompletions",
+    "DeadLetters",
+    "Deduplicator",
+    "DigestTable",
+    "Snapshot",
+    "SnapshotCache",
+    "LandingManifest",
+    "migrate",
+    "EngineProfile",
+    "get_engine",
 ]
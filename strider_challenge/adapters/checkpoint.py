@@ -0,0 +1,139 @@
+import os
+from hashlib import sha1
+from typing import Sequence, Type
+
+from sqlalchemy.inspection import inspect
+from sqlmodel import Field, Session, SQLModel
+
+# bytes hashed from the start and the end of a file for its fingerprint
+FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+
+
+def fingerprint(path: str) -> str:
+    """Identify the version of a file without reading all of it.
+
+    The size and modification time are hashed with the first and last megabyte of the
+    content, which is cheap even for multi-GB files and changes when the file is
+    replaced or appended to.
+
+    Args:
+        path: file path.
+
+    Returns:
+        sha1 hash.
+
+    """
+    stat = os.stat(path)
+    digest = sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+        f.seek(max(stat.st_size - FINGERPRINT_SAMPLE_SIZE, 0))
+        digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+class LoadCheckpoint(SQLModel, table=True):
+    """Progress of the last load of a source file into a table.
+
+    Attributes:
+        key: table name and source fingerprint, like `stream/<sha1>`.
+        position: where the committed records end in the source (byte offset for csv
+            files, element index for json files).
+        records: number of records committed up to the position.
+
+    """
+
+    key: str = Field(primary_key=True)
+    position: int
+    records: int
+
+
+class LoadCheckpoints:
+    """Record the progress of a load, so a failed load can be resumed.
+
+    The checkpoint of each batch is written in the repository's session before the
+    batch is added, so both are committed together: the checkpoint never gets ahead of
+    (or behind) the records committed in the table. Checkpoints are kept by source
+    fingerprint, so a changed file is loaded from the start, and by the options of the
+    load, so a load writing more than the records is never resumed from (or skipped
+    after) one that didn't.
+
+    Attributes:
+        session: session shared with the repository.
+        source: table name and source fingerprint.
+        key: source, and digest of the options of the load if any.
+        resume: whether the load continues from the stored checkpoint.
+
+    """
+
+    def __init__(
+        self, session: Session, model: Type[SQLModel], path: str, resume: bool = False
+    ):
+        self.session = session
+        self.source = f"{inspect(model).local_table.name}/{fingerprint(path)}"
+        self.key = self.source
+        self.resume = resume
+        self._records = 0
+
+    def scope(self, options: Sequence[str]) -> None:
+        """Keep the checkpoints apart from the loads with other options.
+
+        Args:
+            options: what the load writes besides the records, like its listeners.
+
+        """
+        if options:
+            digest = sha1("/".join(sorted(options)).encode("utf-8")).hexdigest()
+            self.key = f"{self.source}/{digest}"
+        else:
+            self.key = self.source
+
+    @property
+    def records(self) -> int:
+        """Number of records of the source committed so far, from its beginning.
+
+        When resuming, it's the number of records before the start position, so the
+        records read from there are numbered like in the source.
+
+        """
+        return self._records
+
+    def start(self) -> int | None:
+        """Position where the load starts.
+
+        Returns:
+            position of the stored checkpoint when resuming, None to start from the
+            beginning.
+
+        """
+        checkpoint = self.session.get(LoadCheckpoint, self.key)
+        if not self.resume or checkpoint is None:
+            return None
+        self._records = checkpoint.records
+        return checkpoint.position
+
+    def completed(self, position: int | None) -> bool:
+        """Whether a previous load of the source was committed up to a position.
+
+        Args:
+            position: position after the last batch of the source.
+
+        Returns:
+            True if the stored checkpoint is at the position.
+
+        """
+        checkpoint = self.session.get(LoadCheckpoint, self.key)
+        return checkpoint is not None and checkpoint.position == position
+
+    def save(self, position: int, records: int) -> None:
+        """Stage the checkpoint after a batch, to be committed with it.
+
+        Args:
+            position: where the batch ends in the source.
+            records: number of records in the batch.
+
+        """
+        self._records += records
+        self.session.merge(
+            LoadCheckpoint(key=self.key, position=position, records=self._records)
+        )
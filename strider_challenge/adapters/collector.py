@@ -1,7 +1,147 @@
+import bz2
+import contextlib
 import csv
+import gzip
+import io
 import json
+import lzma
+import mmap
+import os
+import queue
+import re
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Sequence
+from itertools import islice
+from operator import itemgetter
+from typing import Any, BinaryIO, Callable, Iterator, Sequence, TextIO
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+# lines read at a time when streaming the records of a memory-mapped file
+DEFAULT_LINES_PER_READ = 1000
+# decompressed bytes read at a time by the decompression thread
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# decompressed chunks the decompression thread can get ahead of the parsing
+DEFAULT_READ_AHEAD = 8
+
+DECOMPRESSORS: dict[str, Callable[[str], Any]] = {
+    ".gz": gzip.GzipFile,
+    ".bz2": bz2.BZ2File,
+    ".xz": lzma.LZMAFile,
+}
+MAGIC_NUMBERS = {
+    b"\x1f\x8b": ".gz",
+    b"BZh": ".bz2",
+    b"\xfd7zXZ\x00": ".xz",
+}
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def compression(path: str) -> str | None:
+    """Detect the compression of a file, from its extension or its magic number.
+
+    Args:
+        path: file path.
+
+    Returns:
+        extension of the compression (like `.gz`), None for plain files.
+
+    """
+    extension = os.path.splitext(path)[1]
+    if extension in DECOMPRESSORS:
+        return extension
+    with open(path, "rb") as f:
+        head = f.read(max(len(magic) for magic in MAGIC_NUMBERS))
+    return next((e for m, e in MAGIC_NUMBERS.items() if head.startswith(m)), None)
+
+
+class _ThreadedDecompression(io.RawIOBase):
+    """Raw binary reader over a compressed file, decompressed in a background thread.
+
+    The thread decompresses the file in chunks into a bounded queue, while the reads
+    take the chunks from it. zlib, bz2 and lzma release the GIL while decompressing,
+    so decompression overlaps with the parsing of the records in the reading thread.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        decompressor: Callable[[str], Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: int = DEFAULT_READ_AHEAD,
+    ):
+        self._chunks: queue.Queue[bytes | Exception] = queue.Queue(read_ahead)
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._decompress, args=(path, decompressor, chunk_size), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: bytes | Exception) -> bool:
+        # tells the thread to give up when the reader was closed before the end
+        self._chunks.put(item)
+        return not self._stopped.is_set()
+
+    def _decompress(
+        self, path: str, decompressor: Callable[[str], Any], chunk_size: int
+    ) -> None:
+        try:
+            with decompressor(path) as f:
+                while chunk := f.read(chunk_size):
+                    if not self._put(chunk):
+                        return
+        except Exception as error:
+            self._put(error)
+            return
+        self._put(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if not self._pending and not self._eof:
+            chunk = self._chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            self._pending, self._eof = memoryview(chunk), not chunk
+        size = min(len(buffer), len(self._pending))
+        memoryview(buffer)[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        self._stopped.set()
+        # a slot is freed for the thread's last put, in case the queue was full
+        with contextlib.suppress(queue.Empty):
+            self._chunks.get_nowait()
+        self._thread.join()
+        super().close()
+
+
+def _open_binary(path: str) -> BinaryIO:
+    extension = compression(path)
+    if extension is None:
+        return open(path, "rb")
+    raw = _ThreadedDecompression(path, DECOMPRESSORS[extension])
+    return io.BufferedReader(raw)
+
+
+def _open_text(path: str) -> TextIO:
+    if compression(path) is None:
+        return open(path)
+    return io.TextIOWrapper(_open_binary(path))
+
+
+def _skip(f: BinaryIO, size: int) -> None:
+    # decompressed streams can't seek, so they are read up to the position
+    if f.seekable():
+        f.seek(size, io.SEEK_CUR)
+        return
+    while size > 0 and (chunk := f.read(min(size, DEFAULT_CHUNK_SIZE))):
+        size -= len(chunk)
 
 
 class Collector(ABC):
@@ -11,17 +151,153 @@ class Collector(ABC):
     def collect(self) -> Sequence[dict[str, Any]]:
         """Child class should implement the collection logic and return a json dict."""
 
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the records one at a time.
+
+        Child classes can override it to stream the records from the source instead of
+        collecting all of them at once.
+
+        Returns:
+            iterator over the records.
+
+        """
+        return iter(self.collect())
+
+    def iter_batches(self, batch_size: int) -> Iterator[list[dict[str, Any]]]:
+        """Iterate over bounded chunks of records.
+
+        Args:
+            batch_size: max number of records in each chunk.
+
+        Returns:
+            iterator over chunks of records.
+
+        """
+        records = self.iter_records()
+        while batch := list(islice(records, batch_size)):
+            yield batch
+
+    def iter_positioned_batches(
+        self, batch_size: int
+    ) -> Iterator[tuple[list[dict[str, Any]], int]]:
+        """Iterate over bounded chunks of records, with the position after each chunk.
+
+        A position can be given to `resume` to continue with the records after the
+        chunk. By default positions are the number of records read, child classes can
+        use other positions (like byte offsets).
+
+        Args:
+            batch_size: max number of records in each chunk.
+
+        Returns:
+            iterator over chunks of records and positions.
+
+        """
+        position = 0
+        for batch in self.iter_batches(batch_size):
+            position += len(batch)
+            yield batch, position
+
+    def resume(self, position: int) -> "Collector":
+        """Collector over the records after a position from `iter_positioned_batches`.
+
+        Child classes can override it to seek the position in the source, by default
+        the records before the position are read and skipped.
+
+        Args:
+            position: where to continue.
+
+        Returns:
+            collector over the remaining records.
+
+        """
+        return _ResumedCollector(self, position)
+
+    def split(self, shard_size: int) -> Sequence["Collector"]:
+        """Split the collector in independent collectors over parts of the source.
+
+        Child classes can override it to allow parallel processing of the parts, by
+        default the collector can't be split.
+
+        Args:
+            shard_size: approximate size of each part, in bytes.
+
+        Returns:
+            collectors for each part of the source.
+
+        """
+        return [self]
+
+
+class _ResumedCollector(Collector):
+    """Records of a collector after the first `skip` ones."""
+
+    def __init__(self, collector: Collector, skip: int):
+        self.collector = collector
+        self.skip = skip
+
+    def collect(self) -> Sequence[dict[str, Any]]:
+        return list(self.iter_records())
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        return islice(self.collector.iter_records(), self.skip, None)
+
+    def iter_positioned_batches(
+        self, batch_size: int
+    ) -> Iterator[tuple[list[dict[str, Any]], int]]:
+        for batch, position in super().iter_positioned_batches(batch_size):
+            yield batch, self.skip + position
+
+    def resume(self, position: int) -> Collector:
+        return self.collector.resume(position)
+
+
+class _ByteRange(io.RawIOBase):
+    """Raw binary reader over the [start, end) byte range of a file."""
+
+    def __init__(self, f: BinaryIO, start: int, end: int | None):
+        _skip(f, start)
+        self.f = f
+        self.remaining = None if end is None else end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer)
+        if self.remaining is not None:
+            view = view[: self.remaining]
+        read: int = self.f.readinto(view)  # type: ignore
+        if self.remaining is not None:
+            self.remaining -= read
+        return read
+
+    def close(self) -> None:
+        self.f.close()
+        super().close()
+
 
 class CsvCollector(Collector):
     """Collect records from csv files.
 
+    Files compressed with gzip, bz2 or xz (detected from the extension or the magic
+    number) are decompressed while they are read, in a background thread. Offsets are
+    in the decompressed content.
+
     Attributes:
         path: from where to read the file.
+        start: byte offset where to start reading the rows, if greater than zero, the
+            offset must be at the start of a line and the header is still read from the
+            first line of the file.
+        end: byte offset where to stop reading the rows (exclusive), the end of the file
+            if not set.
 
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, start: int = 0, end: int | None = None):
         self.path = path
+        self.start = start
+        self.end = end
 
     def collect(self) -> Sequence[dict[str, Any]]:
         """Run the collector.
@@ -30,17 +306,308 @@ class CsvCollector(Collector):
             collection of records in file.
 
         """
-        with open(self.path) as f:
+        return list(self.iter_records())
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream the rows from the file, keeping only one row in memory at a time.
+
+        Returns:
+            iterator over the records in file.
+
+        """
+        header = self._read_header() if self.start else None
+        with self._open() as f:
             reader = csv.reader(f, skipinitialspace=True)
-            header = next(reader)
-            return [dict(zip(header, row)) for row in reader]
+            header = header or next(reader)
+            for row in reader:
+                yield dict(zip(header, row))
+
+    def iter_positioned_batches(
+        self, batch_size: int
+    ) -> Iterator[tuple[list[dict[str, Any]], int]]:
+        """Stream chunks of rows, with the byte offset after each chunk.
+
+        The file is read line by line in binary mode to track the offsets. A line
+        leaving a quoted value open (an odd number of quotes so far) continues on the
+        next one, so rows with line breaks in quoted values are kept whole and chunks
+        always end between rows.
+
+        Args:
+            batch_size: max number of rows in each chunk.
+
+        Returns:
+            iterator over chunks of records and byte offsets.
+
+        """
+        header = self._read_header()
+        with _open_binary(self.path) as f:
+            position = len(f.readline())
+            if self.start:
+                _skip(f, self.start - position)
+                position = self.start
+            while True:
+                lines: list[str] = []
+                rows, quotes = 0, 0
+                while quotes % 2 or (
+                    rows < batch_size and (self.end is None or position < self.end)
+                ):
+                    line = f.readline()
+                    if not line:
+                        break
+                    position += len(line)
+                    lines.append(line.decode())
+                    quotes += line.count(b'"')
+                    rows += not quotes % 2
+                if not lines:
+                    return
+                reader = csv.reader(lines, skipinitialspace=True)
+                yield [dict(zip(header, row)) for row in reader], position
+
+    def resume(self, position: int) -> "CsvCollector":
+        """Collector over the rows after a byte offset from `iter_positioned_batches`.
+
+        Args:
+            position: byte offset where to continue, at the start of a line.
+
+        Returns:
+            collector over the remaining rows.
+
+        """
+        return self._range(position, self.end)
+
+    def split(self, shard_size: int) -> Sequence["CsvCollector"]:
+        """Split the file rows in byte ranges aligned to the start of the lines.
+
+        This assumes no quoted value in the file has line breaks. Compressed files
+        can't be read from an offset without decompressing everything before it, so
+        they aren't split.
+
+        Args:
+            shard_size: approximate size of each byte range.
+
+        Returns:
+            collectors for each byte range, all reading the header from the file.
+
+        """
+        if compression(self.path) is not None:
+            return [self]
+        with open(self.path, "rb") as f:
+            end = os.path.getsize(self.path) if self.end is None else self.end
+            bounds = [self.start or len(f.readline())]
+            while bounds[-1] < end:
+                f.seek(bounds[-1] + shard_size - 1)
+                f.readline()
+                bounds.append(min(f.tell(), end))
+        return [self._range(s, e) for s, e in zip(bounds, bounds[1:])]
+
+    def _range(self, start: int, end: int | None) -> "CsvCollector":
+        return CsvCollector(self.path, start, end)
+
+    def _read_header(self) -> list[str]:
+        with _open_text(self.path) as f:
+            return next(csv.reader(f, skipinitialspace=True))
+
+    def _open(self) -> TextIO:
+        if not self.start and self.end is None:
+            return _open_text(self.path)
+        raw = _ByteRange(_open_binary(self.path), self.start, self.end)
+        return io.TextIOWrapper(io.BufferedReader(raw))
+
+
+def _split_quoted(line: str) -> list[str]:
+    return next(csv.reader([line], skipinitialspace=True))
+
+
+def _picker(columns: list[int]) -> Callable[[list[str]], Sequence[str]]:
+    if len(columns) == 1:
+        return lambda values: (values[columns[0]],)
+    return itemgetter(*columns)
+
+
+class MmapCsvCollector(CsvCollector):
+    """Collect records from well-formed csv files through a memory map.
+
+    Meant for files with a fixed layout, like the internal `streams.csv`: no line
+    breaks in quoted values and no spaces after the delimiters. Line boundaries are
+    scanned in the mapped file, and each batch of lines is decoded in a single call
+    and split on the delimiter, keeping only the needed fields, without going through
+    the text layer (only the lines with quoted values go through the csv module). The
+    pages of each batch are released after it's read, so the resident memory doesn't
+    grow with the file. Compressed files can't be mapped.
+
+    Attributes:
+        path: from where to read the file.
+        start: byte offset where to start reading the rows (at the start of a line).
+        end: byte offset where to stop reading the rows (exclusive), the end of the file
+            if not set.
+        fields: columns kept in the records, all of them if not set.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        start: int = 0,
+        end: int | None = None,
+        fields: Sequence[str] | None = None,
+    ):
+        super().__init__(path, start, end)
+        self.fields = fields
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream the rows from the mapped file.
+
+        Returns:
+            iterator over the records in file.
+
+        """
+        for batch in self.iter_batches(DEFAULT_LINES_PER_READ):
+            yield from batch
+
+    def iter_batches(self, batch_size: int) -> Iterator[list[dict[str, Any]]]:
+        """Iterate over bounded chunks of rows.
+
+        Args:
+            batch_size: max number of rows in each chunk.
+
+        Returns:
+            iterator over chunks of records.
+
+        """
+        return (batch for batch, _ in self.iter_positioned_batches(batch_size))
+
+    def iter_positioned_batches(
+        self, batch_size: int
+    ) -> Iterator[tuple[list[dict[str, Any]], int]]:
+        """Stream chunks of rows, with the byte offset after each chunk.
+
+        Args:
+            batch_size: max number of rows in each chunk.
+
+        Returns:
+            iterator over chunks of records and byte offsets.
+
+        """
+        if compression(self.path) is not None:
+            raise ValueError(f"Compressed files can't be memory-mapped: {self.path}")
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            header_line = buffer[: buffer.find(b"\n") + 1].decode()
+            newline = "\r\n" if header_line.endswith("\r\n") else "\n"
+            header = header_line.rstrip("\r\n").split(",")
+            names = list(self.fields or header)
+            pick = _picker([header.index(name) for name in names])
+            position = self.start or len(header_line.encode())
+            end = len(buffer) if self.end is None else self.end
+            while position < end:
+                stop = position
+                for _ in range(batch_size):
+                    stop = buffer.find(b"\n", stop, end) + 1 or end
+                    if stop == end:
+                        break
+                lines = buffer[position:stop].decode().split(newline)
+                # only the lines with quoted values are split by the csv module
+                batch = [
+                    dict(
+                        zip(
+                            names,
+                            pick(
+                                _split_quoted(line) if '"' in line else line.split(",")
+                            ),
+                        )
+                    )
+                    for line in lines
+                    if line
+                ]
+                if hasattr(mmap, "MADV_DONTNEED"):
+                    page = position - position % mmap.PAGESIZE
+                    buffer.madvise(mmap.MADV_DONTNEED, page, stop - page)
+                yield batch, stop
+                position = stop
+
+    def _range(self, start: int, end: int | None) -> "MmapCsvCollector":
+        return MmapCsvCollector(self.path, start, end, self.fields)
+
+
+class _JsonArrayReader:
+    """Incrementally decode the elements of a json top-level array.
+
+    The file is read in fixed-size buffers and each element is decoded with
+    `json.JSONDecoder.raw_decode` as soon as it is complete, so only the element being
+    decoded (and not the whole document) is kept in memory. A document that is not an
+    array is decoded at once and yielded as a single element.
+
+    """
+
+    def __init__(self, f: TextIO, buffer_size: int):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.position, self.eof = "", 0, False
+
+    def _read(self, size: int) -> None:
+        chunk, position = self.f.read(size), self.position
+        self.eof = not chunk
+        self.buffer, self.position = self.buffer[position:] + chunk, 0
+
+    def _peek(self) -> str:
+        while True:
+            match = _WHITESPACE.match(self.buffer, self.position)
+            self.position = match.end()  # type: ignore
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                return ""
+            self._read(self.buffer_size)
+
+    def _decode(self) -> Any:
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # a value ending at the buffer's edge (like a number) may be partial
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # grow the reads with the pending element to avoid quadratic re-decoding
+            self._read(max(self.buffer_size, len(self.buffer) - self.position))
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._peek() != "[":
+            self._read(-1)
+            yield json.loads(self.buffer)
+            return
+        self.position += 1
+        delimiter = "]" if self._peek() == "]" else ","
+        while delimiter == ",":
+            self._peek()
+            yield self._decode()
+            delimiter = self._peek()
+            self.position += 1
+            if delimiter not in (",", "]"):
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", self.buffer, self.position - 1
+                )
 
 
 class JsonCollector(Collector):
-    """Collect records from json files."""
+    """Collect records from json files.
 
-    def __init__(self, path: str):
+    Files compressed with gzip, bz2 or xz (detected from the extension or the magic
+    number) are decompressed while they are read, in a background thread.
+
+    Attributes:
+        path: from where to read the file.
+        buffer_size: how many characters to read at a time when streaming the records.
+
+    """
+
+    def __init__(self, path: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
         self.path = path
+        self.buffer_size = buffer_size
 
     def collect(self) -> Sequence[dict[str, Any]]:
         """Run the collector.
@@ -49,6 +616,16 @@ class JsonCollector(Collector):
             collection of records in file.
 
         """
-        with open(self.path) as f:
+        with _open_text(self.path) as f:
             json_data = json.loads(f.read())
         return json_data if isinstance(json_data, list) else [json_data]
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream the elements of the file's top-level array one at a time.
+
+        Returns:
+            iterator over the records in file.
+
+        """
+        with _open_text(self.path) as f:
+            yield from _JsonArrayReader(f, self.buffer_size)
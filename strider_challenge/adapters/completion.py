@@ -0,0 +1,109 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.inspection import inspect
+from sqlmodel import Session
+
+from strider_challenge.adapters.repository import DEFAULT_BATCH_SIZE, _chunks
+from strider_challenge.domain import model
+from strider_challenge.domain.completion import (
+    Completions,
+    MovieDurations,
+    max_by_group,
+)
+
+
+class WatchCompletions:
+    """Compute the watch completion table from the stream and movie tables.
+
+    The movie table is read once into a lookup array, and the streams are read in
+    chunks of `batch_size` rows, where the ratios and their greatest value by day,
+    user and movie are computed with NumPy. Each refresh only recomputes the days in
+    its window, so later runs can update the table incrementally (like the last days
+    after a new load), while thresholds are applied when the table is queried.
+
+    Attributes:
+        session: session used to read the streams and write the completions.
+        batch_size: number of streams computed at a time and max number of rows
+            written by a single statement.
+
+    """
+
+    def __init__(self, session: Session, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+
+    def _chunk_completions(
+        self, durations: MovieDurations, start: date, end: date
+    ) -> list[Completions]:
+        statement = select(
+            model.Stream.start_at,
+            model.Stream.user_email,
+            model.Stream.movie_title,
+            model.Stream.duration_seconds,
+        ).where(
+            and_(
+                model.Stream.start_at >= datetime.combine(start, time()),
+                model.Stream.start_at < datetime.combine(end + timedelta(1), time()),
+            )
+        )
+        result = self.session.execute(
+            statement.execution_options(yield_per=self.batch_size)
+        )
+        chunks = []
+        for rows in result.partitions():
+            starts, users, movies, seconds = zip(*rows)
+            titles = np.array(movies, dtype=str)
+            chunks.append(
+                max_by_group(
+                    np.array([s.toordinal() for s in starts], dtype=np.int64),
+                    np.array(users, dtype=str),
+                    titles,
+                    durations.ratios(titles, np.array(seconds, dtype=np.float64)),
+                )
+            )
+        return chunks
+
+    def refresh(self, start: date, end: date) -> int:
+        """Recompute the completions of the streams started in a window of days.
+
+        Args:
+            start: first day.
+            end: last day.
+
+        Returns:
+            number of completion rows written.
+
+        """
+        movie_rows = self.session.execute(
+            select(model.Movie.title, model.Movie.duration_mins)
+        ).all()
+        durations = MovieDurations(
+            [row.title for row in movie_rows], [row.duration_mins for row in movie_rows]
+        )
+        chunks = self._chunk_completions(durations, start, end)
+        table = inspect(model.WatchCompletion).local_table
+        self.session.execute(
+            delete(table).where(and_(table.c.day >= start, table.c.day <= end))
+        )
+        rows = []
+        if chunks:
+            days, users, movies, ratios = max_by_group(
+                *(np.concatenate(column) for column in zip(*chunks))
+            )
+            rows = [
+                {
+                    "day": date.fromordinal(day),
+                    "user_email": user,
+                    "movie_title": movie,
+                    "completion": ratio,
+                }
+                for day, user, movie, ratio in zip(
+                    days.tolist(), users.tolist(), movies.tolist(), ratios.tolist()
+                )
+            ]
+        for chunk in _chunks(rows, self.batch_size):
+            self.session.execute(insert(table), chunk)
+        self.session.commit()
+        return len(rows)
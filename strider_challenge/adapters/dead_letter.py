@@ -0,0 +1,80 @@
+import json
+from typing import Any
+
+# share of the records that may be rejected before a load is aborted
+DEFAULT_MAX_ERROR_RATE = 0.01
+
+
+class DeadLetters:
+    """Keep the records that failed to transform in a json lines file.
+
+    Each line has the index of the record in the source (its row or element index,
+    also when the load was resumed), the record as extracted and the error, so the
+    records can be fixed and loaded again without reprocessing the whole source. Lines
+    are appended, so the file accumulates across loads, except for the lines already in
+    it (same index and record), like the ones of a load retried or resumed after a
+    failure.
+
+    Attributes:
+        path: path of the json lines file.
+        max_error_rate: share of the records read that may be rejected, the load is
+            aborted when it's exceeded.
+        rejected: how many records were rejected through this sink, including the
+            ones already in the file.
+
+    """
+
+    def __init__(self, path: str, max_error_rate: float = DEFAULT_MAX_ERROR_RATE):
+        self.path = path
+        self.max_error_rate = max_error_rate
+        self.rejected = 0
+        self._written: set[tuple[int, str]] | None = None
+
+    @staticmethod
+    def _key(index: int, record: dict[str, Any]) -> tuple[int, str]:
+        return index, json.dumps(record, sort_keys=True, default=str)
+
+    def _read_written(self) -> set[tuple[int, str]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return set()
+        return {self._key(line["index"], line["record"]) for line in lines}
+
+    def add(self, entries: list[tuple[int, dict[str, Any], str]]) -> None:
+        """Append rejected records to the file.
+
+        Args:
+            entries: index, record and error message of each rejected record.
+
+        """
+        if not entries:
+            return
+        if self._written is None:
+            self._written = self._read_written()
+        with open(self.path, "a", encoding="utf-8") as f:
+            for index, record, error in entries:
+                key = self._key(index, record)
+                if key in self._written:
+                    continue
+                self._written.add(key)
+                line = {"index": index, "record": record, "error": error}
+                f.write(json.dumps(line, default=str) + "\n")
+        self.rejected += len(entries)
+
+    def check(self, records: int) -> None:
+        """Abort the load if too many of the records read were rejected.
+
+        Args:
+            records: how many records were read so far.
+
+        Raises:
+            ValueError: if the share of rejected records exceeds the max error rate.
+
+        """
+        if self.rejected > self.max_error_rate * records:
+            raise ValueError(
+                f"{self.rejected} of {records} records were rejected, more than the "
+                f"max error rate of {self.max_error_rate:.2%} (see {self.path})."
+            )
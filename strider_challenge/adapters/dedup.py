@@ -0,0 +1,105 @@
+from typing import Any, Sequence
+
+import numpy as np
+from sqlmodel import SQLModel
+
+from strider_challenge.adapters.repository import _digest
+
+
+class DigestTable:
+    """Digests of the last record written with each key, in fixed-size integers.
+
+    The keys are kept as their 64-bit hashes, sorted in a numpy array, next to a 64-bit
+    digest (of the key and the content) of their last record, so the memory doesn't
+    depend on the size of the keys or the records: 16 bytes for each key, up to
+    `capacity` keys. Once full, the keys not in the table yet aren't added, their
+    records are never taken as repeated.
+
+    Attributes:
+        capacity: max number of keys.
+        keys: sorted hashes of the keys.
+        digests: digest of the last record of each key.
+
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.keys = np.empty(0, dtype=np.int64)
+        self.digests = np.empty(0, dtype=np.uint64)
+
+    def update(self, keys: Sequence[Any], digests: Sequence[str]) -> list[bool]:
+        """Keep the digests of the records, telling the ones already kept.
+
+        Args:
+            keys: key of each record, distinct.
+            digests: sha1 hex digest of each record.
+
+        Returns:
+            whether each record has the digest kept for its key.
+
+        """
+        if not keys:
+            return []
+        hashes = np.array([hash(k) for k in keys], dtype=np.int64)
+        values = np.array([int(d[:16], 16) for d in digests], dtype=np.uint64)
+        positions = np.searchsorted(self.keys, hashes)
+        known = np.zeros(len(keys), dtype=bool)
+        if self.keys.size:
+            matched = np.minimum(positions, self.keys.size - 1)
+            known = self.keys[matched] == hashes
+            found = known & (self.digests[matched] == values)
+            self.digests[matched[known]] = values[known]
+        else:
+            found = known
+        new = np.flatnonzero(~known)[: max(self.capacity - self.keys.size, 0)]
+        # inserted in key order, so the keys stay sorted
+        new = new[np.argsort(hashes[new])]
+        self.keys = np.insert(self.keys, positions[new], hashes[new])
+        self.digests = np.insert(self.digests, positions[new], values[new])
+        return list(found.tolist())
+
+
+class Deduplicator:
+    """Drop repeated records from the batches of a load before they are written.
+
+    In each batch, only the last record with a key is kept (last writer wins, like the
+    upserts). With a digest table, records with the same key and content as the last
+    record written with their key by an earlier batch are dropped too, as writing them
+    again changes nothing. A record set back to an older version is written, and so
+    are the records of the keys left out of a full table.
+
+    Attributes:
+        key: name of the key attribute of the records.
+        digest_table: table with the digests of the last records kept for each key.
+        dropped: how many records were dropped.
+
+    """
+
+    def __init__(self, key: str, digest_table: DigestTable | None = None):
+        self.key = key
+        self.digest_table = digest_table
+        self.dropped = 0
+
+    def __call__(
+        self, records: Sequence[SQLModel | dict[str, Any]]
+    ) -> list[SQLModel | dict[str, Any]]:
+        """Drop the repeated records of a batch.
+
+        Args:
+            records: transformed records, as model instances or plain rows.
+
+        Returns:
+            records to write.
+
+        """
+        latest = {
+            r[self.key] if isinstance(r, dict) else getattr(r, self.key): r
+            for r in records
+        }
+        kept = list(latest.values())
+        if self.digest_table and kept:
+            rows = (r if isinstance(r, dict) else r.dict() for r in kept)
+            seen = self.digest_table.update(list(latest), [_digest(r) for r in rows])
+            kept = [r for r, repeated in zip(kept, seen) if not repeated]
+        self.dropped += len(records) - len(kept)
+        return kept
@@ -0,0 +1,117 @@
+import os
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.future import Engine
+from sqlmodel import create_engine
+
+
+class EngineProfile(BaseModel):
+    """Tuning of the engine and the loads for a kind of workload.
+
+    Attributes:
+        name: profile name.
+        batch_size: how many records loads process and commit at a time.
+        sqlite_pragmas: pragmas set on each new SQLite connection.
+        postgresql_settings: settings set on each new PostgreSQL connection.
+        pool_size: connections kept in the pool (for PostgreSQL, SQLite file databases
+            open a connection for each session).
+        max_overflow: connections opened beyond the pool size when all are in use.
+
+    """
+
+    name: str
+    batch_size: int
+    sqlite_pragmas: dict[str, str] = {}
+    postgresql_settings: dict[str, str] = {}
+    pool_size: int = 5
+    max_overflow: int = 10
+
+
+# Loads: the WAL journal appends commits instead of rewriting pages, without syncing to
+# disk (an OS crash can lose the last commits, which loads recover by resuming), with a
+# 256MB page cache and fewer, larger batches. Commits on PostgreSQL don't wait for the
+# WAL flush either, and the pool has room for concurrent writers.
+BULK = EngineProfile(
+    name="bulk",
+    batch_size=50_000,
+    sqlite_pragmas={
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": "-262144",
+        "temp_store": "MEMORY",
+    },
+    postgresql_settings={"synchronous_commit": "off"},
+    pool_size=8,
+    max_overflow=8,
+)
+
+# Queries: reads go through a memory-mapped database file on SQLite, and PostgreSQL
+# skips JIT compiling the short analytical queries.
+INTERACTIVE = EngineProfile(
+    name="interactive",
+    batch_size=10_000,
+    sqlite_pragmas={"mmap_size": "268435456", "temp_store": "MEMORY"},
+    postgresql_settings={"jit": "off"},
+    pool_size=2,
+    max_overflow=2,
+)
+
+PROFILES = {profile.name: profile for profile in [BULK, INTERACTIVE]}
+
+_ENGINES: dict[tuple[int, str, str], Engine] = {}
+
+
+def _engine_options(url: str, profile: EngineProfile) -> dict[str, Any]:
+    if make_url(url).get_backend_name() == "postgresql":
+        return {
+            "pool_size": profile.pool_size,
+            "max_overflow": profile.max_overflow,
+            "pool_pre_ping": True,
+        }
+    return {}
+
+
+def _connection_statements(url: str, profile: EngineProfile) -> list[str]:
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return [f"PRAGMA {k}={v}" for k, v in profile.sqlite_pragmas.items()]
+    if backend == "postgresql":
+        return [f"SET {k} TO {v}" for k, v in profile.postgresql_settings.items()]
+    return []
+
+
+def get_engine(url: str, profile: EngineProfile = INTERACTIVE) -> Engine:
+    """Get the engine for a database with a tuning profile, creating it once.
+
+    Engines are kept by process, database url and profile, so every command in a
+    process shares the same connection pool, and processes forked from it (like the
+    load workers) create their own instead of sharing the parent's connections. The
+    profile's pragmas (SQLite) or settings (PostgreSQL) are set on each new connection.
+
+    Args:
+        url: database url.
+        profile: tuning profile.
+
+    Returns:
+        engine.
+
+    """
+    key = (os.getpid(), url, profile.name)
+    if key not in _ENGINES:
+        engine = create_engine(url, **_engine_options(url, profile))
+        statements = _connection_statements(url, profile)
+
+        @event.listens_for(engine, "connect")
+        def _tune(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.close()
+            # PostgreSQL settings set in a transaction are lost if it's rolled back
+            dbapi_connection.commit()
+
+        _ENGINES[key] = engine
+    return _ENGINES[key]
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+from contextlib import suppress
+from typing import Iterable
+
+from strider_challenge.adapters.checkpoint import fingerprint
+
+
+class LandingManifest:
+    """Fingerprints of the files of a landing directory that were already loaded.
+
+    The manifest is a json file mapping each loaded file path to the fingerprint of
+    the version that was loaded (see `fingerprint`), so checking a file costs a stat
+    and hashing its first and last megabyte. It is rewritten to a temporary file and
+    renamed after each loaded file, so an interrupted ingestion never loses (or
+    corrupts) the files already marked.
+
+    Attributes:
+        path: path of the manifest file.
+        fingerprints: fingerprint of the loaded version of each file.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.fingerprints: dict[str, str] = json.load(f)
+        except FileNotFoundError:
+            self.fingerprints = {}
+
+    def changed(self, paths: Iterable[str]) -> list[tuple[str, str]]:
+        """Files that are new or changed since they were marked as loaded.
+
+        Args:
+            paths: file paths.
+
+        Returns:
+            path and current fingerprint of each new or changed file.
+
+        """
+        changed = []
+        for path in paths:
+            # files can be removed from the directory while it's scanned
+            with suppress(FileNotFoundError):
+                current = fingerprint(path)
+                if self.fingerprints.get(path) != current:
+                    changed.append((path, current))
+        return changed
+
+    def mark(self, path: str, version: str) -> None:
+        """Mark the version of a file as loaded, writing the manifest.
+
+        Args:
+            path: file path.
+            version: fingerprint of the loaded version.
+
+        """
+        self.fingerprints[path] = version
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.fingerprints, f, indent=4, sort_keys=True)
+            os.replace(temporary, self.path)
+        finally:
+            with suppress(FileNotFoundError):
+                os.remove(temporary)
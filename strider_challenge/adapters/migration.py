@@ -0,0 +1,125 @@
+from typing import Any, Callable, Sequence, Type
+
+from sqlalchemy import Column, MetaData, Table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.future import Engine
+from sqlalchemy.inspection import inspect
+from sqlmodel import Session, SQLModel, select
+
+from strider_challenge.adapters.repository import DEFAULT_BATCH_SIZE, RebuildRepository
+
+# columns derived from the others, computed for the rows stored before they existed
+DERIVED_COLUMNS: dict[str, dict[str, Callable[[dict[str, Any]], Any]]] = {
+    "stream": {
+        "duration_seconds": lambda row: (
+            row["end_at"] - row["start_at"]
+        ).total_seconds(),
+    },
+}
+
+
+def _python_type(column: Column[Any]) -> type | None:
+    try:
+        python_type: type = column.type.python_type
+        return python_type
+    except NotImplementedError:  # like sqlmodel's AutoString
+        return None
+
+
+def _cast(python_type: type | None, value: Any) -> Any:
+    # only the numeric columns are cast (like a size stored as text), the other values
+    # are returned by the driver with their column's type
+    if value is None or python_type not in (int, float):
+        return value
+    return python_type(value)
+
+
+def _rebuild(session: Session, model: Type[SQLModel], batch_size: int) -> None:
+    table: Table = inspect(model).local_table
+    pk = inspect(model).primary_key[0].name
+    stored = Table(table.name, MetaData(), autoload_with=session.connection())
+    columns = [stored.c[c.name] for c in table.columns if c.name in stored.c]
+    types = {c.name: _python_type(c) for c in table.columns if c.name in stored.c}
+    derived = DERIVED_COLUMNS.get(table.name, {})
+    repo = RebuildRepository(model=model, session=session, batch_size=batch_size)
+    last = None
+    while True:
+        # pages by primary key, the stored table is read while the shadow is written
+        statement = select(*columns).order_by(stored.c[pk]).limit(batch_size)
+        if last is not None:
+            statement = statement.where(stored.c[pk] > last)
+        rows = session.connection().execute(statement).mappings().all()
+        if not rows:
+            break
+        # plain rows keep the stored values, the model would compute the ids again
+        # (from timestamps the database may return without their offset)
+        records = [{k: _cast(types[k], v) for k, v in row.items()} for row in rows]
+        for record in records:
+            for column, compute in derived.items():
+                if column not in stored.c:
+                    record[column] = compute(record)
+        repo.add(records)
+        last = rows[-1][pk]
+    repo.finalize()
+
+
+# index names of a table, read from the catalogs as the reflection of SQLite and
+# PostgreSQL skips the expression indexes (like `lower(review.book_title)`)
+INDEX_QUERIES = {
+    "sqlite": "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t",
+    "postgresql": "SELECT indexname FROM pg_indexes WHERE tablename = :t",
+}
+
+
+def _index_names(connection: Connection, table: str) -> set[str]:
+    query = INDEX_QUERIES.get(connection.dialect.name)
+    if query is None:
+        return {str(i["name"]) for i in inspect(connection).get_indexes(table)}
+    return set(connection.execute(text(query), {"t": table}).scalars())
+
+
+def migrate(
+    engine: Engine,
+    models: Sequence[Type[SQLModel]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> list[str]:
+    """Bring the existing tables of models created by earlier versions up to date.
+
+    Creating the tables (`SQLModel.metadata.create_all`) skips the tables that already
+    exist, even if their columns and indexes changed since. Tables missing some of
+    their model's columns are rebuilt from their stored rows, with their scalar values
+    cast to the current types of their columns and the derived columns (like the
+    duration of the streams, see `DERIVED_COLUMNS`) computed from the stored values,
+    and swapped in like a bulk rebuild, with all their indexes. The stored keys are
+    kept as they are. The indexes missing from the other tables are created.
+
+    Args:
+        engine: database engine.
+        models: models whose tables are migrated.
+        batch_size: how many rows are read and written at a time.
+
+    Returns:
+        description of each change, empty if the tables were up to date.
+
+    """
+    changes = []
+    with Session(engine) as session:
+        for model_ in models:
+            connection = session.connection()
+            table: Table = inspect(model_).local_table
+            inspector = inspect(connection)
+            if not inspector.has_table(table.name):
+                continue
+            stored = {c["name"] for c in inspector.get_columns(table.name)}
+            missing = [c.name for c in table.columns if c.name not in stored]
+            if missing:
+                _rebuild(session, model_, batch_size)
+                changes.append(f"rebuilt {table.name} (added {', '.join(missing)})")
+                continue
+            indexes = _index_names(connection, table.name)
+            for index in sorted(table.indexes, key=lambda i: str(i.name)):
+                if index.name not in indexes:
+                    index.create(bind=connection)
+                    changes.append(f"created index {index.name}")
+            session.commit()
+    return changes
@@ -1,14 +1,92 @@
 import abc
-from typing import Sequence, Type
+import copy
+import io
+import json
+import uuid
+from datetime import datetime
+from hashlib import sha1
+from itertools import islice
+from typing import Any, Callable, Iterator, Sequence, Type, TypeVar
 
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
 from sqlalchemy.inspection import inspect
-from sqlmodel import Session, SQLModel, select
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.visitors import replacement_traverse
+from sqlmodel import Field, Session, SQLModel, select
 from sqlmodel.sql.expression import Select, SelectOfScalar
 
 # supress warnings 😔 from issue: https://github.com/tiangolo/sqlmodel/issues/189
 SelectOfScalar.inherit_cache = True  # type: ignore
 Select.inherit_cache = True  # type: ignore
 
+T = TypeVar("T")
+
+# records can be given as model instances or as plain rows (dicts of column values)
+Record = SQLModel | dict[str, Any]
+
+DEFAULT_BATCH_SIZE = 500
+
+# marker for null values in the csv streamed with `COPY`, non-null values are quoted
+COPY_NULL = "\\N"
+
+# dialects supporting the `INSERT ... ON CONFLICT (pk) DO UPDATE` upsert statement
+UPSERT_DIALECTS: dict[str, Callable[[Table], Insert]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# dialects whose tables can be written by concurrent sessions, SQLite locks the whole
+# database for each write so its writers would only wait on (or time out on) each other
+CONCURRENT_WRITE_DIALECTS = {"postgresql"}
+
+# dialects that can rename indexes and constraints, so the indexes of a rebuilt table
+# are built before it's swapped in, other dialects build them in the swap transaction
+INDEX_RENAME_DIALECTS = {"postgresql"}
+
+
+def _chunks(items: list[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _digest(row: dict[str, Any]) -> str:
+    return sha1(
+        json.dumps(row, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class RecordDigest(SQLModel, table=True):
+    """Content digest of the last version written for each record.
+
+    Attributes:
+        key: table name and record reference, like `author/Josh Johnston`.
+        digest: sha1 of the record's content.
+
+    """
+
+    key: str = Field(primary_key=True)
+    digest: str
+
 
 class AbstractRepository(abc.ABC):
     """Base abstract repository pattern adapter."""
@@ -17,14 +95,14 @@ class AbstractRepository(abc.ABC):
         self.model = model
 
     @abc.abstractmethod
-    def _add(self, records: Sequence[SQLModel]) -> None:
+    def _add(self, records: Sequence[Record]) -> None:
         """Child class should implement add command logic."""
 
-    def add(self, records: Sequence[SQLModel]) -> None:
+    def add(self, records: Sequence[Record]) -> None:
         """Add records to the repository.
 
         Args:
-            records: input records to add.
+            records: input records to add, as model instances or plain rows.
 
         """
         self._add(records)
@@ -45,29 +123,579 @@ class AbstractRepository(abc.ABC):
         """
         return self._get(reference)
 
+    def finalize(self) -> None:
+        """Finish a load, called once after all its records were added.
+
+        Child classes that need to see the whole input (like a full snapshot) can
+        override it, by default it does nothing.
+
+        """
+
+    def abort(self) -> None:
+        """Give up a failed load, called instead of `finalize` when it fails.
+
+        Child classes staging the records of a load (like a snapshot table) can
+        override it to clean them up, by default it does nothing.
+
+        """
+
 
 class SqlRepository(AbstractRepository):
-    """Repository adapter implementation from sql-based databases."""
+    """Repository adapter implementation from sql-based databases.
+
+    Attributes:
+        model: model class (table) handled by the repository.
+        session: session used to run the statements.
+        pk: name of the primary key column, inferred from the model if not given.
+        batch_size: max number of records written by a single statement.
+        skip_unchanged: if True, content digests of the written records are kept in
+            the `RecordDigest` table and records whose digest did not change since
+            the last write are not sent to the database again. Otherwise the digests
+            of the written records are deleted, as they no longer match the table.
+
+    """
 
-    def __init__(self, model: Type[SQLModel], session: Session, pk: str | None = None):
+    def __init__(
+        self,
+        model: Type[SQLModel],
+        session: Session,
+        pk: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        skip_unchanged: bool = False,
+    ):
         super().__init__(model)
         self.session = session
         self.pk = pk or inspect(model).primary_key[0].name
+        self.batch_size = batch_size
+        self.skip_unchanged = skip_unchanged
+        self.table: Table = inspect(model).local_table
+        # whether the table had any digest, checked on the first write of the load
+        self._digested: bool | None = None
 
-    def _add(self, records: Sequence[SQLModel]) -> None:
-        """This method implements a upsert logic for the add query.
+    def _add(self, records: Sequence[Record]) -> None:
+        """This method implements a bulk upsert logic for the add query.
 
         If the reference does not exist it creates for the first time. If already exist,
-        it will update the features.
+        it will update the features. When the same reference appears more than once,
+        the last record wins. Records are written in batches with a single
+        `INSERT ... ON CONFLICT` statement for each batch on dialects that support it,
+        other dialects fallback to a bulk lookup followed by bulk inserts and updates.
 
         """
-        for record in records:
-            new_record = self._get(reference=getattr(record, self.pk)) or record
-            for key, value in record.dict().items():
-                setattr(new_record, key, value)
-            self.session.add(new_record)
+        rows = self._to_rows(records)
+        if self.skip_unchanged:
+            rows = self._write_changed_digests(rows)
+        else:
+            self._forget_digests(rows)
+        self._write(rows)
         self.session.commit()
 
+    def fork(self) -> "SqlRepository":
+        """Copy of the repository with a session of its own, to write concurrently.
+
+        Returns:
+            repository, its session must be closed by the caller.
+
+        Raises:
+            ValueError: if the database can't be written concurrently.
+
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in CONCURRENT_WRITE_DIALECTS:
+            raise ValueError(f"{dialect} databases can't be written concurrently.")
+        forked = copy.copy(self)
+        forked.session = Session(self.session.get_bind())
+        return forked
+
+    def _to_rows(self, records: Sequence[Record]) -> list[dict[str, Any]]:
+        rows = (r if isinstance(r, dict) else r.dict() for r in records)
+        return list({row[self.pk]: row for row in rows}.values())
+
+    def _write_changed_digests(
+        self, rows: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Write the digests for new or changed rows, returning only those rows.
+
+        Stored digests are fetched in bulk for each chunk of incoming rows.
+
+        """
+        digests = {f"{self.table.name}/{r[self.pk]}": _digest(r) for r in rows}
+        stored: dict[str, str] = {}
+        for keys in _chunks(list(digests), self.batch_size):
+            statement = select(RecordDigest.key, RecordDigest.digest).where(
+                RecordDigest.key.in_(keys)  # type: ignore
+            )
+            stored.update(self.session.exec(statement).all())
+        changed = [
+            (row, key, digest)
+            for row, (key, digest) in zip(rows, digests.items())
+            if stored.get(key) != digest
+        ]
+        SqlRepository(
+            model=RecordDigest, session=self.session, batch_size=self.batch_size
+        )._write([{"key": key, "digest": digest} for _, key, digest in changed])
+        return [row for row, _, _ in changed]
+
+    def _forget_digests(self, rows: list[dict[str, Any]]) -> None:
+        """Delete the digests of rows written without comparing them.
+
+        Otherwise a later load skipping unchanged records would compare against the
+        version of a previous load, and skip a record that was since overwritten. The
+        digests are only looked up once: tables never loaded with `skip_unchanged`
+        (like the streams) have none, and their writes issue no deletes.
+
+        """
+        if self._digested is None:
+            prefix = RecordDigest.key.startswith(  # type: ignore
+                f"{self.table.name}/", autoescape=True
+            )
+            statement = select(RecordDigest.key).where(prefix).limit(1)
+            self._digested = self.session.exec(statement).first() is not None
+        if not self._digested:
+            return
+        keys = [f"{self.table.name}/{r[self.pk]}" for r in rows]
+        for chunk in _chunks(keys, self.batch_size):
+            self.session.execute(
+                delete(RecordDigest).where(RecordDigest.key.in_(chunk))  # type: ignore
+            )
+
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        upsert = UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        for chunk in _chunks(rows, self.batch_size):
+            if upsert:
+                self.session.execute(self._build_upsert(upsert, chunk))
+            else:
+                self._merge(chunk)
+
+    def _build_upsert(
+        self, insert: Callable[[Table], Insert], rows: list[dict[str, Any]]
+    ) -> Insert:
+        return self._on_conflict_update(insert(self.table).values(rows))
+
+    def _on_conflict_update(self, statement: Insert) -> Insert:
+        columns = [c.name for c in self.table.columns if c.name != self.pk]
+        if not columns:
+            return statement.on_conflict_do_nothing(  # type: ignore
+                index_elements=[self.pk]
+            )
+        excluded = statement.excluded  # type: ignore
+        return statement.on_conflict_do_update(  # type: ignore
+            index_elements=[self.pk],
+            set_={column: excluded[column] for column in columns},
+        )
+
+    def _merge(self, rows: list[dict[str, Any]]) -> None:
+        pk_column = getattr(self.model, self.pk)
+        statement = select(pk_column).where(pk_column.in_([r[self.pk] for r in rows]))
+        existing = set(self.session.exec(statement).all())
+        self.session.bulk_update_mappings(
+            self.model, [r for r in rows if r[self.pk] in existing]
+        )
+        self.session.bulk_insert_mappings(
+            self.model, [r for r in rows if r[self.pk] not in existing]
+        )
+
     def _get(self, reference: str) -> SQLModel | None:
         statement = select(self.model).where(getattr(self.model, self.pk) == reference)
         return self.session.exec(statement).first()
+
+
+def _to_copy_value(value: Any) -> str:
+    if value is None:
+        return COPY_NULL
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _to_copy_buffer(columns: list[str], rows: list[dict[str, Any]]) -> io.StringIO:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_to_copy_value(row[c]) for c in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _copy(connection: Connection, table: Table, rows: list[dict[str, Any]]) -> None:
+    """Stream rows into a PostgreSQL table with `COPY FROM STDIN`."""
+    columns = [c.name for c in table.columns]
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    statement = (
+        f'COPY "{table.name}" ({quoted}) FROM STDIN '
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+    cursor = connection.connection.cursor()
+    buffer = _to_copy_buffer(columns, rows)
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        cursor.copy_expert(statement, buffer)
+    else:  # pg8000
+        cursor.execute(statement, stream=buffer)
+
+
+class CopyRepository(SqlRepository):
+    """Repository adapter for bulk loads on PostgreSQL using `COPY FROM STDIN`.
+
+    Each `add` streams the records into a temporary staging table with `COPY` and then
+    merges them into the target table with one `INSERT ... SELECT ... ON CONFLICT`
+    statement, keeping the same upsert semantics as `SqlRepository`. Works with the
+    `pg8000` and `psycopg2` drivers.
+
+    """
+
+    def _staging_table(self) -> Table:
+        # timestamps are staged with time zone so the merge casts them the same way
+        # the driver does for the parameters of a regular insert
+        columns = [
+            Column(
+                c.name,
+                DateTime(timezone=True) if isinstance(c.type, DateTime) else c.type,
+            )
+            for c in self.table.columns
+        ]
+        return Table(
+            f"{self.table.name}__staging",
+            MetaData(),
+            *columns,
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+
+    def _build_merge(self, staging: Table) -> Insert:
+        columns = [c.name for c in self.table.columns]
+        return self._on_conflict_update(
+            postgresql.insert(self.table).from_select(
+                columns, select(*[staging.c[c] for c in columns])
+            )
+        )
+
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        staging = self._staging_table()
+        connection = self.session.connection()
+        staging.create(bind=connection)
+        _copy(connection, staging, rows)
+        connection.execute(self._build_merge(staging))
+
+
+class HistoryRepository(SqlRepository):
+    """Repository adapter keeping every version of the records (SCD type 2).
+
+    The model's table works as the current view: it's upserted as usual, indexed by the
+    primary key and never loses records, even when they are deleted from the source.
+    Every version is also kept in a `<table>_history` table with `valid_from`,
+    `valid_to` and `is_deleted` columns, indexed by reference and `valid_to`.
+
+    Each load must deliver the whole dataset (a snapshot). Added records are staged in
+    a `<table>__snapshot_<id>` table, named for each load and dropped when it finishes
+    or fails, and, on `finalize`, the versions are maintained with set operations
+    between the snapshot and the open versions: changed records are closed and get a
+    new version, new records get their first version, and records missing from the
+    snapshot are closed with a tombstone version (`is_deleted`). An empty snapshot
+    tombstones every record. As each load takes its snapshot as the whole dataset, the
+    loads of a model must run one at a time.
+
+    """
+
+    def __init__(
+        self,
+        model: Type[SQLModel],
+        session: Session,
+        pk: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        skip_unchanged: bool = False,
+    ):
+        super().__init__(model, session, pk, batch_size, skip_unchanged)
+        metadata = MetaData()
+        columns = [c.name for c in self.table.columns]
+        self.history = Table(
+            f"{self.table.name}_history",
+            metadata,
+            Column("version", Integer, primary_key=True, autoincrement=True),
+            *[Column(c.name, c.type, nullable=c.nullable) for c in self.table.columns],
+            Column("digest", String, nullable=False),
+            Column("valid_from", DateTime, nullable=False),
+            Column("valid_to", DateTime, nullable=True),
+            Column("is_deleted", Boolean, nullable=False),
+            Index(f"ix_{self.table.name}_history_current", self.pk, "valid_to"),
+        )
+        self.snapshot = self._snapshot_table()
+        self.columns = columns
+        self.loaded_at: datetime | None = None
+
+    def fork(self) -> "SqlRepository":
+        """History loads stage the whole snapshot in a single session.
+
+        Raises:
+            ValueError: always, history repositories can't be forked.
+
+        """
+        raise ValueError("History repositories can't be written concurrently.")
+
+    def _snapshot_table(self) -> Table:
+        return Table(
+            f"{self.table.name}__snapshot_{uuid.uuid4().hex[:12]}",
+            MetaData(),
+            *[
+                Column(c.name, c.type, primary_key=c.name == self.pk)
+                for c in self.table.columns
+            ],
+            Column("digest", String, nullable=False),
+        )
+
+    def _begin(self) -> datetime:
+        if not self.loaded_at:
+            connection = self.session.connection()
+            self.loaded_at = datetime.utcnow()
+            self.snapshot = self._snapshot_table()
+            self.history.create(bind=connection, checkfirst=True)
+            self.snapshot.create(bind=connection)
+        return self.loaded_at
+
+    def _add(self, records: Sequence[Record]) -> None:
+        rows = self._to_rows(records)
+        self._begin()
+        connection = self.session.connection()
+        for chunk in _chunks(rows, self.batch_size):
+            connection.execute(
+                delete(self.snapshot).where(
+                    self.snapshot.c[self.pk].in_([r[self.pk] for r in chunk])
+                )
+            )
+            connection.execute(
+                insert(self.snapshot), [{**r, "digest": _digest(r)} for r in chunk]
+            )
+        super()._add(records)
+
+    def finalize(self) -> None:
+        """Close, tombstone and create the versions from the staged snapshot."""
+        now = self._begin()
+        history, snapshot = self.history, self.snapshot
+        reference, snapshot_reference = history.c[self.pk], snapshot.c[self.pk]
+        is_open = history.c.valid_to.is_(None)
+        in_snapshot = exists().where(snapshot_reference == reference)
+        versioned = [*self.columns, "digest", "valid_from", "is_deleted"]
+        # records missing from the snapshot: tombstone and close the open versions
+        missing = and_(is_open, history.c.is_deleted.is_(False), ~in_snapshot)
+        statements = [
+            insert(history).from_select(
+                versioned,
+                select(  # type: ignore
+                    *[history.c[c] for c in [*self.columns, "digest"]],
+                    literal(now, DateTime),
+                    literal(True, Boolean),
+                ).where(missing),
+            ),
+            update(history).where(missing).values(valid_to=now),
+            # changed (or deleted and then recreated) records: close open versions
+            update(history)
+            .where(
+                is_open,
+                reference.in_(
+                    select(snapshot_reference)
+                    .join(history, and_(snapshot_reference == reference, is_open))
+                    .where(
+                        or_(
+                            history.c.digest != snapshot.c.digest,
+                            history.c.is_deleted.is_(True),
+                        )
+                    )
+                ),
+            )
+            .values(valid_to=now),
+            # new and changed records: create the open versions
+            insert(history).from_select(
+                versioned,
+                select(  # type: ignore
+                    *[snapshot.c[c] for c in [*self.columns, "digest"]],
+                    literal(now, DateTime),
+                    literal(False, Boolean),
+                ).where(
+                    ~exists().where(and_(reference == snapshot_reference, is_open))
+                ),
+            ),
+        ]
+        connection = self.session.connection()
+        for statement in statements:
+            connection.execute(statement)
+        self.snapshot.drop(bind=connection)
+        self.session.commit()
+        self.loaded_at = None
+
+    def abort(self) -> None:
+        """Drop the snapshot staged by a failed load."""
+        self.session.rollback()
+        if self.loaded_at:
+            self.snapshot.drop(bind=self.session.connection(), checkfirst=True)
+            self.session.commit()
+            self.loaded_at = None
+
+    def get_history(self, reference: str) -> list[dict[str, Any]]:
+        """Retrieve all versions of a specific record, from oldest to newest.
+
+        Args:
+            reference: key to find the record.
+
+        Returns:
+            versions of the record.
+
+        """
+        statement = (
+            select(self.history)  # type: ignore
+            .where(self.history.c[self.pk] == reference)
+            .order_by(self.history.c.version)
+        )
+        return [
+            dict(row) for row in self.session.connection().execute(statement).mappings()
+        ]
+
+
+class RebuildRepository(SqlRepository):
+    """Repository adapter replacing the whole table, for initial and full reloads.
+
+    Added records are appended to an unindexed `<table>__shadow` table with a load
+    sequence, without any lookup. On `finalize`, the last version of each record is
+    copied to a `<table>__rebuilt` table in a single set-based pass (in primary key
+    order, so its primary key index is built by appending), its secondary indexes are
+    built and it replaces the model's table in one transaction. Readers see the
+    previous table until the swap is committed, never a half loaded one.
+
+    Each load must deliver the whole dataset: records missing from it are not in the
+    rebuilt table.
+
+    """
+
+    def __init__(
+        self,
+        model: Type[SQLModel],
+        session: Session,
+        pk: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        skip_unchanged: bool = False,
+    ):
+        if skip_unchanged:
+            raise ValueError(
+                "Rebuilds replace the whole table and can't skip unchanged records."
+            )
+        super().__init__(model, session, pk, batch_size)
+        self.columns = [c.name for c in self.table.columns]
+        self.dialect = session.get_bind().dialect.name
+        self.shadow = Table(
+            f"{self.table.name}__shadow",
+            MetaData(),
+            *[Column(c.name, c.type) for c in self.table.columns],
+            Column("load_sequence", Integer, nullable=False),
+            # on PostgreSQL the shadow table is not written to the WAL, it's dropped
+            # after the rebuild anyway
+            prefixes=["UNLOGGED"] if self.dialect == "postgresql" else [],
+        )
+        self.sequence: int | None = None
+
+    def fork(self) -> "SqlRepository":
+        """Rebuilds number the records of the whole load in a single session.
+
+        Raises:
+            ValueError: always, rebuild repositories can't be forked.
+
+        """
+        raise ValueError("Rebuild repositories can't be written concurrently.")
+
+    def _add(self, records: Sequence[Record]) -> None:
+        rows = self._to_rows(records)
+        connection = self.session.connection()
+        if self.sequence is None:
+            self.sequence = 0
+            self.shadow.drop(bind=connection, checkfirst=True)
+            self.shadow.create(bind=connection)
+        rows = [
+            {**row, "load_sequence": self.sequence + i} for i, row in enumerate(rows)
+        ]
+        self.sequence += len(rows)
+        if self.dialect == "postgresql":
+            _copy(connection, self.shadow, rows)
+        elif rows:
+            # a single statement compiled once, executed for each row by the driver
+            connection.execute(insert(self.shadow), rows)
+        self.session.commit()
+
+    def _rebuilt_table(self) -> Table:
+        # a new table for each rebuild, as its indexes are attached to it when created
+        return Table(
+            f"{self.table.name}__rebuilt",
+            MetaData(),
+            *[
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in self.table.columns
+            ],
+        )
+
+    def _rebuilt_index(self, index: Index, rebuilt: Table) -> Index:
+        # the expressions (like `lower(book_title)`) refer to the columns of the rebuilt
+        # table instead of the model's
+        def adapt(element: Any) -> Column[Any] | None:
+            if isinstance(element, Column) and element.table is self.table:
+                return rebuilt.c[element.name]
+            return None
+
+        return Index(
+            f"{index.name}__rebuilt",
+            *[replacement_traverse(e, {}, adapt) for e in index.expressions],
+            unique=index.unique,
+            **index.dialect_kwargs,
+        )
+
+    def finalize(self) -> None:
+        """Deduplicate the shadow table, index it and swap it in."""
+        if self.sequence is None:
+            return
+        shadow, rebuilt = self.shadow, self._rebuilt_table()
+        connection = self.session.connection()
+        rebuilt.drop(bind=connection, checkfirst=True)
+        rebuilt.create(bind=connection)
+        latest = select(func.max(shadow.c.load_sequence)).group_by(  # type: ignore
+            shadow.c[self.pk]
+        )
+        connection.execute(
+            insert(rebuilt).from_select(
+                self.columns,
+                select(*[shadow.c[c] for c in self.columns])
+                .where(shadow.c.load_sequence.in_(latest))
+                .order_by(shadow.c[self.pk]),
+            )
+        )
+        shadow.drop(bind=connection)
+        renames = connection.dialect.name in INDEX_RENAME_DIALECTS
+        if renames:
+            for index in self.table.indexes:
+                self._rebuilt_index(index, rebuilt).create(bind=connection)
+        self.session.commit()
+        self._swap(renames)
+        self.session.commit()
+        self.sequence = None
+
+    def _swap(self, renames: bool) -> None:
+        connection = self.session.connection()
+        quote = connection.dialect.identifier_preparer.quote
+        table, rebuilt = self.table.name, f"{self.table.name}__rebuilt"
+        if connection.dialect.name == "sqlite":
+            # pysqlite only opens transactions for DML, the DDL would be autocommitted
+            connection.exec_driver_sql("BEGIN")
+        self.table.drop(bind=connection, checkfirst=True)
+        connection.exec_driver_sql(
+            f"ALTER TABLE {quote(rebuilt)} RENAME TO {quote(table)}"
+        )
+        # the digests of the replaced table no longer match its records
+        digests = RecordDigest.key.startswith(  # type: ignore
+            f"{table}/", autoescape=True
+        )
+        connection.execute(delete(RecordDigest).where(digests))
+        if not renames:
+            for index in self.table.indexes:
+                index.create(bind=connection)
+            return
+        connection.exec_driver_sql(
+            f"ALTER TABLE {quote(table)} RENAME CONSTRAINT {quote(rebuilt + '_pkey')} "
+            f"TO {quote(table + '_pkey')}"
+        )
+        for index in self.table.indexes:
+            connection.exec_driver_sql(
+                f"ALTER INDEX {quote(str(index.name) + '__rebuilt')} "
+                f"RENAME TO {quote(str(index.name))}"
+            )
@@ -0,0 +1,187 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Sequence, Type
+
+from sqlalchemy import Date, Table, and_, cast, delete, func, insert, true, update
+from sqlalchemy.inspection import inspect
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session, SQLModel, select
+
+from strider_challenge.adapters.repository import (
+    DEFAULT_BATCH_SIZE,
+    UPSERT_DIALECTS,
+    _chunks,
+)
+from strider_challenge.domain import model
+
+# measures summed in the rollups, with the rollup models and their dimension column
+MEASURES = ["streams", "size_mb", "duration_seconds"]
+ROLLUPS: dict[Type[SQLModel], str] = {
+    model.DailyMovieStreams: "movie_title",
+    model.DailyUserStreams: "user_email",
+}
+
+
+class StreamRollups:
+    """Maintain the daily rollups of the streams incrementally, one batch at a time.
+
+    Each batch must be applied before it's written to the stream table, in the same
+    session (so both are committed together), and only the batch is read: the
+    contribution of each new stream is added to the rollup rows of its day, while the
+    streams already in the table only contribute the change of their size. The stream
+    id hashes the movie, user and timestamps, so no other attribute can change, and
+    loading the same records again doesn't count them twice.
+
+    Streams written without the rollups (loaded before them, or without `--rollups`)
+    are never counted by the batches, `refresh` rebuilds the rollups of a window of
+    days from the stream table.
+
+    Attributes:
+        session: session used to read the stream table and write the rollups.
+        batch_size: max number of rows read or written by a single statement.
+
+    """
+
+    def __init__(self, session: Session, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+
+    def apply(self, rows: Sequence[dict[str, Any]]) -> None:
+        """Add the contribution of a batch of stream rows to the rollups.
+
+        Args:
+            rows: stream rows about to be written, the last row wins for repeated ids.
+
+        """
+        latest = {row["id"]: row for row in rows}
+        stored = self._stored_sizes(list(latest))
+        changes = [
+            (row, self._change(row, stored.get(row["id"]))) for row in latest.values()
+        ]
+        changes = [(row, change) for row, change in changes if any(change.values())]
+        for rollup_cls, dimension in ROLLUPS.items():
+            deltas: dict[tuple[date, str], dict[str, Any]] = {}
+            for row, change in changes:
+                key = (row["start_at"].date(), row[dimension])
+                delta = deltas.setdefault(
+                    key,
+                    {"day": key[0], dimension: key[1], **dict.fromkeys(MEASURES, 0)},
+                )
+                for measure in MEASURES:
+                    delta[measure] += change[measure]
+            self._increment(rollup_cls, dimension, list(deltas.values()))
+
+    @staticmethod
+    def _change(row: dict[str, Any], stored_size: float | None) -> dict[str, Any]:
+        if stored_size is None:
+            return {
+                "streams": 1,
+                "size_mb": row["size_mb"],
+                "duration_seconds": row["duration_seconds"],
+            }
+        return {
+            "streams": 0,
+            "size_mb": row["size_mb"] - stored_size,
+            "duration_seconds": 0.0,
+        }
+
+    def _stored_sizes(self, ids: list[str]) -> dict[str, float]:
+        stored: dict[str, float] = {}
+        for chunk in _chunks(ids, self.batch_size):
+            statement = select(model.Stream.id, model.Stream.size_mb).where(
+                model.Stream.id.in_(chunk)  # type: ignore
+            )
+            stored.update(self.session.exec(statement).all())
+        return stored
+
+    def _increment(
+        self, rollup_cls: Type[SQLModel], dimension: str, rows: list[dict[str, Any]]
+    ) -> None:
+        table = inspect(rollup_cls).local_table
+        upsert = UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        for chunk in _chunks(rows, self.batch_size):
+            if upsert:
+                statement = upsert(table).values(chunk)
+                self.session.execute(self._build_increment(statement, dimension))
+            else:
+                self._update_or_insert(table, dimension, chunk)
+
+    @staticmethod
+    def _build_increment(statement: Insert, dimension: str) -> Insert:
+        excluded = statement.excluded  # type: ignore
+        return statement.on_conflict_do_update(  # type: ignore
+            index_elements=["day", dimension],
+            set_={m: statement.table.c[m] + excluded[m] for m in MEASURES},
+        )
+
+    def _update_or_insert(
+        self, table: Table, dimension: str, rows: list[dict[str, Any]]
+    ) -> None:
+        for row in rows:
+            statement = (
+                update(table)
+                .where(
+                    and_(
+                        table.c.day == row["day"], table.c[dimension] == row[dimension]
+                    )
+                )
+                .values({m: table.c[m] + row[m] for m in MEASURES})
+            )
+            if not self.session.execute(statement).rowcount:  # type: ignore
+                self.session.execute(insert(table).values(row))
+
+    def refresh(self, start: date | None = None, end: date | None = None) -> int:
+        """Rebuild the rollups of the streams started in a window of days.
+
+        The rollup rows of the window are deleted and aggregated again from the stream
+        table, with one set-based statement for each rollup.
+
+        Args:
+            start: first day, from the first stream if not set.
+            end: last day, up to the last stream if not set.
+
+        Returns:
+            number of rollup rows written.
+
+        """
+        stream = inspect(model.Stream).local_table
+        day = self._day(stream.c.start_at)
+        window = [true()]
+        if start:
+            window.append(stream.c.start_at >= datetime.combine(start, time()))
+        if end:
+            window.append(
+                stream.c.start_at < datetime.combine(end + timedelta(1), time())
+            )
+        written = 0
+        for rollup_cls, dimension in ROLLUPS.items():
+            table = inspect(rollup_cls).local_table
+            days = [true()]
+            if start:
+                days.append(table.c.day >= start)
+            if end:
+                days.append(table.c.day <= end)
+            self.session.execute(delete(table).where(and_(*days)))
+            aggregate = (
+                select(  # type: ignore
+                    day,
+                    stream.c[dimension],
+                    func.count(),
+                    func.sum(stream.c.size_mb),
+                    func.sum(stream.c.duration_seconds),
+                )
+                .where(and_(*window))
+                .group_by(day, stream.c[dimension])
+            )
+            result = self.session.execute(
+                insert(table).from_select(["day", dimension, *MEASURES], aggregate)
+            )
+            written += result.rowcount  # type: ignore
+        self.session.commit()
+        return written
+
+    def _day(self, column: ColumnElement[Any]) -> ColumnElement[Any]:
+        # SQLite stores dates as iso strings, a cast would take the leading number
+        if self.session.get_bind().dialect.name == "sqlite":
+            return func.date(column)
+        return cast(column, Date)
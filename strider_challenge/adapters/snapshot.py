@@ -0,0 +1,169 @@
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from contextlib import suppress
+from hashlib import sha1
+from typing import Any, Iterator
+
+from strider_challenge.adapters.checkpoint import fingerprint
+
+# max total size of the snapshots kept in a cache directory
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# number of records read and position after them in the source (-1 for none)
+HEADER = struct.Struct("<qq")
+FRAME = struct.Struct("<I")
+
+# number of records read, transformed rows, position after them in the source and
+# rejected records
+CachedBatch = tuple[int, list[dict[str, Any]], int | None, list[Any]]
+
+
+def _encode(batch: CachedBatch) -> bytes:
+    # rows are stored by column, the keys aren't repeated and similar values are
+    # compressed together
+    count, rows, position, rejected = batch
+    columns = list(rows[0]) if rows else []
+    values = [[row[c] for row in rows] for c in columns]
+    data = pickle.dumps((count, columns, values, position, rejected), protocol=5)
+    return zlib.compress(data, 1)
+
+
+def _decode(data: bytes) -> CachedBatch:
+    count, columns, values, position, rejected = pickle.loads(zlib.decompress(data))
+    rows = [dict(zip(columns, row)) for row in zip(*values)]
+    return count, rows, position, rejected
+
+
+class Snapshot:
+    """Transformed batches of a source file, as stored in the cache.
+
+    Attributes:
+        path: path of the snapshot file.
+        records: number of records read from the source.
+        position: position after the last batch in the source, if the batches were
+            positioned.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.records, position = HEADER.unpack(f.read(HEADER.size))
+        self.position = None if position < 0 else position
+
+    def __iter__(self) -> Iterator[CachedBatch]:
+        """Read the batches back, one at a time."""
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size)
+            while header := f.read(FRAME.size):
+                (size,) = FRAME.unpack(header)
+                yield _decode(f.read(size))
+
+
+class SnapshotCache:
+    """Cache of the transformed batches of source files, keyed by their fingerprint.
+
+    A load writes the batches of its source to a snapshot as they are transformed, and
+    the next loads of the same file (same size, modification time and content
+    samples, see `fingerprint`) transformed the same way (same transform version) read
+    them back instead of extracting and transforming the records again. Each batch is
+    stored by column, pickled and compressed. A snapshot is only visible once all of
+    its batches were written, so a failed load never leaves a partial one. The least
+    recently used snapshots are evicted when the directory grows beyond its max size.
+
+    Attributes:
+        directory: where the snapshots are kept.
+        max_bytes: max total size of the snapshots.
+
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, table: str, path: str, version: str = "") -> str:
+        """Key of the snapshot of a source file loaded into a table.
+
+        Args:
+            table: name of the table.
+            path: source file path.
+            version: identity of the transform of the records (like its converter and
+                the model's columns), snapshots of other versions aren't read back.
+
+        Returns:
+            key.
+
+        """
+        transform = sha1(version.encode("utf-8")).hexdigest()[:12]
+        return f"{table}-{transform}-{fingerprint(path)}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.snapshot")
+
+    def get(self, key: str) -> Snapshot | None:
+        """Snapshot of a key, marking it as recently used.
+
+        Args:
+            key: snapshot key.
+
+        Returns:
+            snapshot, or None if it's not in the cache.
+
+        """
+        path = self._path(key)
+        try:
+            os.utime(path)
+            return Snapshot(path)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, batches: Iterator[CachedBatch]) -> Iterator[CachedBatch]:
+        """Write batches to the snapshot of a key while they are consumed.
+
+        Args:
+            key: snapshot key.
+            batches: transformed batches of the whole source.
+
+        Returns:
+            the same batches, the snapshot is stored once all of them are consumed.
+
+        """
+        records, position = 0, -1
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(records, position))
+                for batch in batches:
+                    data = _encode(batch)
+                    f.write(FRAME.pack(len(data)))
+                    f.write(data)
+                    records += batch[0]
+                    position = position if batch[2] is None else batch[2]
+                    yield batch
+                f.seek(0)
+                f.write(HEADER.pack(records, position))
+            os.replace(temporary, self._path(key))
+        finally:
+            with suppress(FileNotFoundError):
+                os.remove(temporary)
+        self._evict()
+
+    def _evict(self) -> None:
+        snapshots = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".snapshot"):
+                # snapshots can be evicted by loads running at the same time
+                with suppress(FileNotFoundError):
+                    stat = entry.stat()
+                    snapshots.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in snapshots)
+        for _, size, path in sorted(snapshots):
+            if total <= self.max_bytes:
+                break
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
@@ -0,0 +1,149 @@
+import json
+from typing import Any, Sequence
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from strider_challenge.adapters.repository import DEFAULT_BATCH_SIZE, _chunks
+from strider_challenge.domain import model
+from strider_challenge.domain.sketch import DEFAULT_K, QuantileSketch
+
+# stream's attributes summarized by the statistics
+MEASURES = ["size_mb", "duration_seconds"]
+
+
+class StreamSketches:
+    """Maintain running sums and quantile sketches of the streams, one batch at a time.
+
+    Each batch must be applied before it's written to the stream table, in the same
+    session (so both are committed together). Only the streams that aren't in the
+    table yet are summarized, so loading the same records again doesn't count them
+    twice. A stream reloaded with another size only changes the total: values can't be
+    removed from the minimum, maximum and quantile sketch, which keep its first size.
+    Every batch is summarized in a sketch of its own, which is merged into the stored
+    one, so loads running in parallel combine their sketches in the same table.
+
+    Streams written without the sketches (loaded before them, or without
+    `--sketches`) are never summarized by the batches, `refresh` rebuilds the
+    statistics from the stream table, with the current sizes.
+
+    Attributes:
+        session: session used to read the stream table and write the statistics.
+        batch_size: max number of ids read by a single statement, and number of
+            streams read at a time by a refresh.
+        k: accuracy of the quantile sketches (see `QuantileSketch`).
+
+    """
+
+    def __init__(
+        self, session: Session, batch_size: int = DEFAULT_BATCH_SIZE, k: int = DEFAULT_K
+    ):
+        self.session = session
+        self.batch_size = batch_size
+        self.k = k
+
+    def apply(self, rows: Sequence[dict[str, Any]]) -> None:
+        """Add the new streams of a batch of rows to the statistics.
+
+        Args:
+            rows: stream rows about to be written.
+
+        """
+        latest = {row["id"]: row for row in rows}
+        stored = self._stored_rows(list(latest))
+        new = [row for id_, row in latest.items() if id_ not in stored]
+        for measure in MEASURES:
+            values = [row[measure] for row in new]
+            change = sum(
+                row[measure] - getattr(stored[id_], measure)
+                for id_, row in latest.items()
+                if id_ in stored
+            )
+            if values or change:
+                self._merge(measure, values, change)
+
+    def _stored_rows(self, ids: list[str]) -> dict[str, Any]:
+        stored: dict[str, Any] = {}
+        for chunk in _chunks(ids, self.batch_size):
+            statement = select(
+                model.Stream.id, *[getattr(model.Stream, m) for m in MEASURES]
+            ).where(
+                model.Stream.id.in_(chunk)  # type: ignore
+            )
+            stored.update((row.id, row) for row in self.session.exec(statement))
+        return stored
+
+    def _merge(self, measure: str, values: list[float], change: float) -> None:
+        statement = (
+            select(model.StreamStatistics)
+            .where(model.StreamStatistics.measure == measure)
+            .with_for_update()
+        )
+        statistics = self.session.exec(statement).first()
+        sketch = QuantileSketch(k=self.k)
+        sketch.update(values)
+        if statistics is None:
+            if not values:
+                # nothing summarized yet, only a refresh can start from the table
+                return
+            statistics = model.StreamStatistics(
+                measure=measure,
+                count=0,
+                total=0.0,
+                minimum=min(values),
+                maximum=max(values),
+                sketch=json.dumps(sketch.to_dict()),
+            )
+        elif values:
+            stored = QuantileSketch.from_dict(json.loads(statistics.sketch))
+            stored.merge(sketch)
+            statistics.minimum = min(statistics.minimum, *values)
+            statistics.maximum = max(statistics.maximum, *values)
+            statistics.sketch = json.dumps(stored.to_dict())
+        statistics.count += len(values)
+        statistics.total += sum(values) + change
+        self.session.add(statistics)
+
+    def refresh(self) -> int:
+        """Rebuild the statistics from all the streams in the stream table.
+
+        The streams are read once, `batch_size` at a time, and the stored statistics
+        are replaced in a single transaction.
+
+        Returns:
+            number of streams summarized.
+
+        """
+        sketches = {measure: QuantileSketch(k=self.k) for measure in MEASURES}
+        summaries: dict[str, list[float]] = {}
+        count = 0
+        statement = select(*[getattr(model.Stream, m) for m in MEASURES])
+        result = self.session.execute(
+            statement.execution_options(yield_per=self.batch_size)
+        )
+        for rows in result.partitions():
+            count += len(rows)
+            for measure, values in zip(MEASURES, zip(*rows)):
+                sketches[measure].update(values)
+                total, minimum, maximum = summaries.get(
+                    measure, [0.0, min(values), max(values)]
+                )
+                summaries[measure] = [
+                    total + sum(values),
+                    min(minimum, *values),
+                    max(maximum, *values),
+                ]
+        self.session.execute(delete(model.StreamStatistics))
+        for measure, (total, minimum, maximum) in summaries.items():
+            self.session.add(
+                model.StreamStatistics(
+                    measure=measure,
+                    count=count,
+                    total=total,
+                    minimum=minimum,
+                    maximum=maximum,
+                    sketch=json.dumps(sketches[measure].to_dict()),
+                )
+            )
+        self.session.commit()
+        return count
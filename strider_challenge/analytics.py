@@ -0,0 +1,356 @@
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Type
+
+from sqlalchemy import BigInteger, and_, cast, distinct, exists, func, select
+from sqlmodel import Session, SQLModel
+
+from strider_challenge.domain.interval import IntervalIndex
+from strider_challenge.domain.model import (
+    Author,
+    Book,
+    DailyMovieStreams,
+    DailyUserStreams,
+    Movie,
+    Review,
+    Stream,
+    StreamStatistics,
+    WatchCompletion,
+)
+from strider_challenge.domain.sketch import QuantileSketch
+
+# reads timestamps as milliseconds since the epoch, for the dialects whose drivers
+# parse integers much faster than timestamps
+EPOCH_MILLIS_DIALECTS: dict[str, Callable[[Any], Any]] = {
+    "postgresql": lambda column: cast(func.extract("epoch", column) * 1000, BigInteger)
+}
+
+
+def _overlaps(session: Session, start: datetime, end: datetime) -> Any:
+    # a stream is in progress at some point of the window if it starts before the
+    # window ends and ends after the window starts. No stream starts before the window
+    # minus the longest duration, which bounds the range read from the start_at, end_at
+    # index on both sides
+    longest = session.execute(select(func.max(Stream.duration_seconds))).scalar()
+    return and_(
+        Stream.start_at >= start - timedelta(seconds=longest or 0),
+        Stream.start_at <= end,
+        Stream.end_at >= start,
+    )
+
+
+def share_of_streamed_movies_based_on_books(session: Session) -> float:
+    """Share of the streamed movies that are based on books.
+
+    Args:
+        session: session to query the models.
+
+    Returns:
+        number between 0 and 1.
+
+    """
+    streamed = select(distinct(Movie.title)).join(
+        Stream, Stream.movie_title == Movie.title
+    )
+    reviewed = select(func.lower(Review.movie_title))
+    count_streamed = session.execute(
+        select(func.count()).select_from(streamed.subquery())
+    ).scalar_one()
+    count_based_on_books = session.execute(
+        select(func.count()).select_from(
+            streamed.where(func.lower(Movie.title).in_(reviewed)).subquery()
+        )
+    ).scalar_one()
+    return count_based_on_books / count_streamed if count_streamed else 0.0
+
+
+def count_users_streaming(
+    session: Session, movie_title: str, start: datetime, end: datetime
+) -> int:
+    """Count the users with a stream of a movie in progress during a time window.
+
+    Args:
+        session: session to query the models.
+        movie_title: title of the movie.
+        start: start of the window.
+        end: end of the window.
+
+    Returns:
+        number of distinct users.
+
+    """
+    statement = select(func.count(distinct(Stream.user_email))).where(
+        Stream.movie_title == movie_title, _overlaps(session, start, end)
+    )
+    count: int = session.execute(statement).scalar_one()
+    return count
+
+
+def build_stream_interval_index(
+    session: Session, movie_title: str | None = None
+) -> IntervalIndex:
+    """Build an in-memory index of the streams' intervals by movie.
+
+    The index answers the same question as `count_users_streaming` for any movie and
+    window without querying the database, which pays off when many windows are
+    queried (`index.count(movie_title, start, end)`).
+
+    Args:
+        session: session to query the models.
+        movie_title: if set, only the streams of this movie are indexed (read through
+            the movie title index).
+
+    Returns:
+        index with the users of the streams of each movie.
+
+    """
+    to_millis = EPOCH_MILLIS_DIALECTS.get(session.get_bind().dialect.name)
+    if to_millis is None:
+        statement = select(
+            Stream.movie_title, Stream.user_email, Stream.start_at, Stream.end_at
+        )
+    else:
+        statement = select(
+            Stream.movie_title,
+            Stream.user_email,
+            to_millis(Stream.start_at),
+            to_millis(Stream.end_at),
+        )
+    if movie_title is not None:
+        statement = statement.where(Stream.movie_title == movie_title)
+    return IntervalIndex.build(
+        session.execute(statement).all(), epoch_millis=to_millis is not None
+    )
+
+
+def count_streamed_movies_based_on_books_by_nationality(
+    session: Session, nationality: str, start: datetime, end: datetime
+) -> int:
+    """Count the movies based on books by authors of a nationality streamed in a window.
+
+    Args:
+        session: session to query the models.
+        nationality: authors' nationality (like `singaporeans`).
+        start: start of the window.
+        end: end of the window.
+
+    Returns:
+        number of distinct movies.
+
+    """
+    books = (
+        select(func.lower(Book.title))
+        .join(Author, func.lower(Author.name) == func.lower(Book.author))
+        .where(Author.nationality == nationality)
+    )
+    reviewed = select(func.lower(Review.movie_title)).where(
+        func.lower(Review.book_title).in_(books)
+    )
+    # checks each movie for any stream in the window, stopping at the first one found
+    streamed = exists().where(
+        and_(Stream.movie_title == Movie.title, _overlaps(session, start, end))
+    )
+    statement = select(func.count(Movie.title)).where(
+        func.lower(Movie.title).in_(reviewed), streamed
+    )
+    count: int = session.execute(statement).scalar_one()
+    return count
+
+
+def average_stream_duration(session: Session) -> float:
+    """Average duration of the streams.
+
+    Args:
+        session: session to query the models.
+
+    Returns:
+        duration in seconds.
+
+    """
+    average = session.execute(select(func.avg(Stream.duration_seconds))).scalar_one()
+    return float(average or 0.0)
+
+
+def median_stream_size(session: Session) -> float:
+    """Median size of the streams.
+
+    The middle rows are read in order from the stream's size_mb index, which works the
+    same in any database (no percentile function needed).
+
+    Args:
+        session: session to query the models.
+
+    Returns:
+        size in megabytes.
+
+    """
+    count = session.execute(select(func.count()).select_from(Stream)).scalar_one()
+    if not count:
+        return 0.0
+    middle = (
+        select(Stream.size_mb)
+        .order_by(Stream.size_mb)
+        .offset((count - 1) // 2)
+        .limit(2 - count % 2)
+    )
+    sizes: list[float] = session.execute(middle).scalars().all()
+    return sum(sizes) / len(sizes)
+
+
+def running_stream_average(session: Session, measure: str) -> float:
+    """Average of a measure of the streams, from the running sums.
+
+    Read from the statistics maintained by the stream loads (with sketches), so it
+    takes a single row instead of a scan of the streams.
+
+    Args:
+        session: session to query the models.
+        measure: stream's attribute (`size_mb` or `duration_seconds`).
+
+    Returns:
+        average of the measure.
+
+    """
+    statistics = session.get(StreamStatistics, measure)
+    return statistics.total / statistics.count if statistics else 0.0
+
+
+def approximate_stream_quantile(
+    session: Session, measure: str, quantile: float
+) -> float:
+    """Approximate quantile of a measure of the streams, from the quantile sketch.
+
+    Read from the statistics maintained by the stream loads (with sketches), so it
+    takes a single row instead of a sort of the streams. The rank of the answer is off
+    by about 1% of the streams at most.
+
+    Args:
+        session: session to query the models.
+        measure: stream's attribute (`size_mb` or `duration_seconds`).
+        quantile: between 0 and 1 (0.5 for the median).
+
+    Returns:
+        value of the measure at the quantile.
+
+    """
+    statistics = session.get(StreamStatistics, measure)
+    if statistics is None:
+        return 0.0
+    sketch = QuantileSketch.from_dict(json.loads(statistics.sketch))
+    return sketch.quantile(quantile) or 0.0
+
+
+def count_users_watching_at_least(
+    session: Session, ratio: float, start: datetime, end: datetime
+) -> int:
+    """Count the users that watched at least a share of a movie in a time window.
+
+    Args:
+        session: session to query the models.
+        ratio: share of the movie's duration watched in a stream, between 0 and 1.
+        start: start of the window.
+        end: end of the window.
+
+    Returns:
+        number of distinct users.
+
+    """
+    statement = (
+        select(func.count(distinct(Stream.user_email)))
+        .join(Movie, Movie.title == Stream.movie_title)
+        .where(
+            _overlaps(session, start, end),
+            Stream.duration_seconds >= Movie.duration_mins * 60 * ratio,
+        )
+    )
+    count: int = session.execute(statement).scalar_one()
+    return count
+
+
+def count_users_completing(
+    session: Session, ratio: float, start: date, end: date
+) -> int:
+    """Count the users that watched at least a share of a movie in a window of days.
+
+    Read from the watch completion table (see `adapters.WatchCompletions`), where each
+    stream counts in the day it started, instead of joining the streams with the
+    movies. The table must have been refreshed for the window.
+
+    Args:
+        session: session to query the models.
+        ratio: share of the movie's duration watched in a stream, between 0 and 1.
+        start: first day.
+        end: last day.
+
+    Returns:
+        number of distinct users.
+
+    """
+    statement = select(func.count(distinct(WatchCompletion.user_email))).where(
+        WatchCompletion.day >= start,
+        WatchCompletion.day <= end,
+        WatchCompletion.completion >= ratio,
+    )
+    count: int = session.execute(statement).scalar_one()
+    return count
+
+
+def _daily_streams(
+    session: Session, rollup_cls: Type[SQLModel], dimension: str, start: date, end: date
+) -> list[dict[str, Any]]:
+    rollup = rollup_cls.__table__  # type: ignore
+    statement = (
+        select(rollup)
+        .where(rollup.c.day >= start, rollup.c.day <= end, rollup.c.streams > 0)
+        .order_by(rollup.c.day, rollup.c[dimension])
+    )
+    return [
+        {
+            "day": row["day"],
+            dimension: row[dimension],
+            "streams": row["streams"],
+            "size_gb": row["size_mb"] / 1000,
+            "average_duration_seconds": row["duration_seconds"] / row["streams"],
+        }
+        for row in session.execute(statement).mappings()
+    ]
+
+
+def daily_movie_streams(
+    session: Session, start: date, end: date
+) -> list[dict[str, Any]]:
+    """Number, total size and average duration of the streams of each movie by day.
+
+    Read from the daily rollup maintained by the stream loads, so it doesn't scan the
+    streams.
+
+    Args:
+        session: session to query the models.
+        start: first day.
+        end: last day.
+
+    Returns:
+        rows with day, movie_title, streams, size_gb and average_duration_seconds.
+
+    """
+    return _daily_streams(session, DailyMovieStreams, "movie_title", start, end)
+
+
+def daily_user_streams(
+    session: Session, start: date, end: date
+) -> list[dict[str, Any]]:
+    """Number, total size and average duration of the streams of each user by day.
+
+    Read from the daily rollup maintained by the stream loads, so it doesn't scan the
+    streams.
+
+    Args:
+        session: session to query the models.
+        start: first day.
+        end: last day.
+
+    Returns:
+        rows with day, user_email, streams, size_gb and average_duration_seconds.
+
+    """
+    return _daily_streams(session, DailyUserStreams, "user_email", start, end)
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta, timezone
+from hashlib import sha1
+from typing import Any, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from strider_challenge.domain import converters
+
+# layout of the timestamps in the internal files, like 2021-12-06T19:30:19.099+0100
+TIMESTAMP_SIZE = 28
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18, 20, 21, 22, 24, 25, 26, 27]
+_SEPARATORS = {4: b"-", 7: b"-", 10: b"T", 13: b":", 16: b":", 19: b"."}
+_SIGN = 23
+
+# layout of `str(datetime)`, like 2021-12-06 19:30:19.099000+01:00, used in the ids
+_STR_SIZE = 32
+_STR_MOVES = {range(0, 23): range(0, 23), range(23, 26): range(26, 29)}
+_STR_MOVES[range(26, 28)] = range(30, 32)
+_STR_CONSTANTS = {10: b" ", 23: b"0", 24: b"0", 25: b"0", 29: b":"}
+
+Chars = npt.NDArray[np.uint8]
+Ints = npt.NDArray[np.int64]
+
+
+def _number(chars: Chars, positions: range) -> Ints:
+    digits = chars[:, positions].astype(np.int64) - ord("0")
+    weights = 10 ** np.arange(len(positions) - 1, -1, -1, dtype=np.int64)
+    return digits @ weights
+
+
+def _to_chars(values: Sequence[str]) -> Chars | None:
+    try:
+        array = np.array(values, dtype=f"S{TIMESTAMP_SIZE}")
+    except UnicodeEncodeError:
+        return None
+    chars = array.view(np.uint8).reshape(-1, TIMESTAMP_SIZE)
+    lengths_ok = all(len(v) == TIMESTAMP_SIZE for v in values)
+    digits_ok = (
+        (chars[:, _DIGITS] >= ord("0")) & (chars[:, _DIGITS] <= ord("9"))
+    ).all()
+    separators_ok = all((chars[:, i] == ord(c)).all() for i, c in _SEPARATORS.items())
+    sign_ok = np.isin(chars[:, _SIGN], [ord("+"), ord("-")]).all()
+    return chars if lengths_ok and digits_ok and separators_ok and sign_ok else None
+
+
+def _offsets(chars: Chars) -> Ints:
+    offsets = 60 * _number(chars, range(24, 26)) + _number(chars, range(26, 28))
+    return np.where(chars[:, _SIGN] == ord("-"), -offsets, offsets)
+
+
+def _to_utc(chars: Chars) -> npt.NDArray[np.datetime64]:
+    local = np.ascontiguousarray(chars[:, :23]).view("S23").ravel()
+    offsets = _offsets(chars).astype("timedelta64[m]")
+    utc: npt.NDArray[np.datetime64] = local.astype("datetime64[ms]") - offsets
+    return utc
+
+
+def _to_datetimes(chars: Chars) -> list[datetime]:
+    offsets = _offsets(chars)
+    zones = {
+        offset: timezone(timedelta(minutes=offset)) if offset else timezone.utc
+        for offset in np.unique(offsets).tolist()
+    }
+    return list(
+        map(
+            datetime,
+            _number(chars, range(0, 4)).tolist(),
+            _number(chars, range(5, 7)).tolist(),
+            _number(chars, range(8, 10)).tolist(),
+            _number(chars, range(11, 13)).tolist(),
+            _number(chars, range(14, 16)).tolist(),
+            _number(chars, range(17, 19)).tolist(),
+            (1000 * _number(chars, range(20, 23))).tolist(),
+            [zones[offset] for offset in offsets.tolist()],
+        )
+    )
+
+
+def _to_str_bytes(chars: Chars) -> list[bytes]:
+    """Build the utf-8 bytes of `str(datetime)` for each timestamp, without datetimes.
+
+    The characters are moved to their places in a fixed-width matrix, whole columns at
+    a time. As in `str(datetime)`, the fraction is omitted when it is zero and a zero
+    offset is always positive.
+
+    """
+    out = np.zeros((len(chars), _STR_SIZE), dtype=np.uint8)
+    for source, target in _STR_MOVES.items():
+        out[:, target] = chars[:, source]
+    for i, c in _STR_CONSTANTS.items():
+        out[:, i] = ord(c)
+    zero_offset = (chars[:, 24:28] == ord("0")).all(axis=1)
+    out[zero_offset, 26] = ord("+")
+    no_fraction = (chars[:, 20:23] == ord("0")).all(axis=1)
+    shifted = np.zeros((no_fraction.sum(), _STR_SIZE), dtype=np.uint8)
+    shifted[:, :19] = out[no_fraction, :19]
+    shifted[:, 19:25] = out[no_fraction, 26:]
+    out[no_fraction] = shifted
+    # trailing null bytes are dropped from the items of bytes arrays
+    return out.view(f"S{_STR_SIZE}").ravel().tolist()
+
+
+def transform_streams(records: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Transform a batch of Stream's raw records into rows, processing it as columns.
+
+    The timestamps are parsed in bulk from arrays of bytes (as are the durations),
+    the sizes are cast to floats in bulk, and the ids are hashed in a single loop over
+    columns of bytes that were encoded beforehand, so no model (or even datetime
+    string) is built per record. Batches with timestamps in other formats are converted
+    record by record.
+
+    Args:
+        records: raw records, with the columns of the internal streams file.
+
+    Returns:
+        rows of the Stream model, equal to the `.dict()` of the validated models.
+
+    Raises:
+        ValueError: if a size is not a number or a timestamp is not a valid date.
+
+    """
+    starts = _to_chars([r["start_at"] for r in records]) if records else None
+    ends = _to_chars([r["end_at"] for r in records]) if records else None
+    if starts is None or ends is None:
+        return [converters.STREAM_CONVERTER(r) for r in records]
+    titles = [str(r["movie_title"]) for r in records]
+    emails = [str(r["user_email"]) for r in records]
+    sizes = np.asarray([r["size_mb"] for r in records], dtype=np.float64).tolist()
+    durations = (_to_utc(ends) - _to_utc(starts)) / np.timedelta64(1, "s")
+    ids = [
+        sha1(b"".join(parts)).hexdigest()
+        for parts in zip(
+            [t.encode("utf-8") for t in titles],
+            [e.encode("utf-8") for e in emails],
+            _to_str_bytes(starts),
+            _to_str_bytes(ends),
+        )
+    ]
+    return [
+        {
+            "id": id_,
+            "movie_title": title,
+            "user_email": email,
+            "size_mb": size,
+            "start_at": start_at,
+            "end_at": end_at,
+            "duration_seconds": duration,
+        }
+        for id_, title, email, size, start_at, end_at, duration in zip(
+            ids,
+            titles,
+            emails,
+            sizes,
+            _to_datetimes(starts),
+            _to_datetimes(ends),
+            durations.tolist(),
+        )
+    ]
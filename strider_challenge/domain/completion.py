@@ -0,0 +1,72 @@
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+Ints = npt.NDArray[np.int64]
+Floats = npt.NDArray[np.float64]
+Strs = npt.NDArray[np.str_]
+Completions = tuple[Ints, Strs, Strs, Floats]
+
+
+class MovieDurations:
+    """Lookup array of the movies' durations, to compute the completion of streams.
+
+    Attributes:
+        titles: movie titles, sorted.
+        seconds: duration of each movie in seconds, in the same order as the titles.
+
+    """
+
+    def __init__(self, titles: Iterable[str], minutes: Iterable[int]):
+        unsorted_titles = np.array(list(titles), dtype=str)
+        order = np.argsort(unsorted_titles)
+        self.titles = unsorted_titles[order]
+        self.seconds = 60 * np.array(list(minutes), dtype=np.float64)[order]
+
+    def ratios(self, movie_titles: Strs, durations: Floats) -> Floats:
+        """Share of the movie watched in each stream.
+
+        Args:
+            movie_titles: title of the movie watched in each stream.
+            durations: duration of each stream in seconds.
+
+        Returns:
+            ratios (may be greater than 1), NaN for the movies that aren't known.
+
+        """
+        if not len(self.titles):
+            return np.full(len(movie_titles), np.nan)
+        positions = np.searchsorted(self.titles, movie_titles).clip(
+            max=len(self.titles) - 1
+        )
+        found = self.titles[positions] == movie_titles
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(found, durations / self.seconds[positions], np.nan)
+
+
+def max_by_group(days: Ints, users: Strs, movies: Strs, ratios: Floats) -> Completions:
+    """Keep the greatest ratio of each day, user and movie.
+
+    The rows are sorted by the group and the ratio, and the last row of each group is
+    kept, all in vectorized operations. Rows without a ratio (NaN) are dropped.
+
+    Args:
+        days: day of each stream (as ordinals).
+        users: user of each stream.
+        movies: movie of each stream.
+        ratios: completion ratio of each stream.
+
+    Returns:
+        days, users, movies and ratios with one row per group.
+
+    """
+    user_codes = np.unique(users, return_inverse=True)[1]
+    movie_codes = np.unique(movies, return_inverse=True)[1]
+    order = np.lexsort((ratios, movie_codes, user_codes, days))
+    order = order[~np.isnan(ratios[order])]
+    keys = np.stack([days[order], user_codes[order], movie_codes[order]])
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = (keys[:, 1:] != keys[:, :-1]).any(axis=0)
+    kept = order[last]
+    return days[kept], users[kept], movies[kept], ratios[kept]
@@ -0,0 +1,165 @@
+from datetime import datetime
+from typing import Any, Callable, Type
+
+from pydantic.datetime_parse import parse_datetime
+from sqlmodel import SQLModel
+
+from strider_challenge.domain import model
+
+Row = dict[str, Any]
+
+COERCIONS: dict[type, Callable[[Any], Any]] = {
+    str: str,
+    int: int,
+    float: float,
+    datetime: parse_datetime,
+}
+
+
+def _derive_stream(row: Row) -> Row:
+    return {
+        "id": model.build_stream_id(
+            row["movie_title"], row["user_email"], row["start_at"], row["end_at"]
+        ),
+        "duration_seconds": (row["end_at"] - row["start_at"]).total_seconds(),
+    }
+
+
+def _derive_review(row: Row) -> Row:
+    return {"id": model.build_review_id(row["text"], row["rating"], row["movie_title"])}
+
+
+DERIVED_FIELDS: dict[type, tuple[tuple[str, ...], Callable[[Row], Row]]] = {
+    model.Stream: (("id", "duration_seconds"), _derive_stream),
+    model.Review: (("id",), _derive_review),
+}
+
+
+class Converter:
+    """Convert trusted records into rows of a model with plain type coercion.
+
+    The coercion for each field is resolved once, from the model's fields, instead of
+    running the model's validation for every record. Values are coerced the same way
+    pydantic does for the well-formed inputs (datetimes are parsed with pydantic's own
+    parser), so the rows are equal to the `.dict()` of the validated models, including
+    the fields the models compute themselves (like the ids).
+
+    Attributes:
+        model_cls: model of the rows.
+        fields: name, whether it's nullable and coercion of each field.
+        derive: computes the derived fields of the model from the row, if any.
+
+    """
+
+    def __init__(self, model_cls: Type[SQLModel]):
+        self.model_cls = model_cls
+        derived: tuple[str, ...] = ()
+        self.derive: Callable[[Row], Row] | None = None
+        if model_cls in DERIVED_FIELDS:
+            derived, self.derive = DERIVED_FIELDS[model_cls]
+        self.fields = [
+            (name, field.allow_none, COERCIONS[field.type_])
+            for name, field in model_cls.__fields__.items()
+            if name not in derived
+        ]
+
+    def __call__(self, record: Row) -> Row:
+        """Convert a record.
+
+        Args:
+            record: mapping with the model's attributes.
+
+        Returns:
+            row with the coerced attributes.
+
+        """
+        row = {
+            name: (
+                None if nullable and record.get(name) is None else coerce(record[name])
+            )
+            for name, nullable, coerce in self.fields
+        }
+        if self.derive:
+            row.update(self.derive(row))
+        return row
+
+
+MOVIE_CONVERTER = Converter(model.Movie)
+STREAM_CONVERTER = Converter(model.Stream)
+USER_CONVERTER = Converter(model.User)
+AUTHOR_CONVERTER = Converter(model.Author)
+BOOK_CONVERTER = Converter(model.Book)
+REVIEW_CONVERTER = Converter(model.Review)
+
+
+def build_author_row(record: Row) -> Row | None:
+    """Transform Author's raw record into a row, working on the plain dict.
+
+    Args:
+        record: raw record, as in `raw.AuthorRaw`.
+
+    Returns:
+        row of the model, None if the author has no name.
+
+    """
+    metadata = record["metadata"]
+    if metadata.get("name"):
+        return AUTHOR_CONVERTER(
+            {
+                "name": metadata["name"],
+                "birth_date": metadata.get("birth_date"),
+                "died_at": metadata.get("died_at"),
+                "nationality": [
+                    n.get("slug")
+                    for n in record.get("nationalities", [])
+                    if n.get("slug") not in ["", None]
+                ].pop(),
+            }
+        )
+    return None
+
+
+def build_book_row(record: Row) -> Row:
+    """Transform Book's raw record into a row, working on the plain dict.
+
+    Args:
+        record: raw record, as in `raw.BookRaw`.
+
+    Returns:
+        row of the model.
+
+    """
+    return BOOK_CONVERTER(
+        {
+            "title": record["name"],
+            "pages": record["pages"],
+            "author": record["author"],
+            "publisher": record["publisher"],
+        }
+    )
+
+
+def build_review_row(record: Row) -> Row:
+    """Transform Review's raw record into a row, working on the plain dict.
+
+    Args:
+        record: raw record, as in `raw.ReviewRaw`.
+
+    Returns:
+        row of the model.
+
+    """
+    return REVIEW_CONVERTER(
+        {
+            "text": record["content"]["text"],
+            "rating": record["rating"]["rate"],
+            "movie_title": [
+                movie["title"]
+                for movie in record["movies"]
+                if movie["title"] not in [None, "", "end"]
+            ].pop(),
+            "book_title": [book["metadata"]["title"] for book in record["books"]][
+                :1
+            ].pop(),
+        }
+    )
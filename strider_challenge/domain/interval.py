@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+Interval = tuple[str, str, datetime, datetime]
+
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def _to_ms(value: datetime) -> np.datetime64:
+    # timestamps are compared in wall time, as in the database's (timezone naive)
+    # columns
+    return np.datetime64(value.replace(tzinfo=None), "ms")
+
+
+def _to_ms_array(values: Sequence[datetime]) -> npt.NDArray[np.datetime64]:
+    # subtracting datetimes in python is much faster than numpy's casting of them
+    millis = np.fromiter(
+        ((v.replace(tzinfo=None) - _EPOCH) // _MILLISECOND for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return millis.view("datetime64[ms]")
+
+
+def _from_ms_array(values: Sequence[int]) -> npt.NDArray[np.datetime64]:
+    return np.array(values, dtype=np.int64).view("datetime64[ms]")
+
+
+class _Intervals:
+    def __init__(
+        self,
+        starts: npt.NDArray[np.datetime64],
+        ends: npt.NDArray[np.datetime64],
+        values: npt.NDArray[np.int64],
+    ):
+        self.starts = starts
+        self.ends = ends
+        self.values = values
+        self.max_ends = np.maximum.accumulate(ends)
+
+
+class IntervalIndex:
+    """Index of time intervals by key, answering which intervals overlap a window.
+
+    The intervals of each key are kept in arrays sorted by their start, together with
+    the running max of their ends (the augmentation of an interval tree, flattened).
+    The intervals starting after the window ends are cut by a binary search over the
+    starts, and the ones that all end before the window starts by a binary search over
+    the running max of the ends, so only the intervals in between are checked, in a
+    single vectorized comparison.
+
+    Attributes:
+        labels: distinct values attached to the intervals (like user emails).
+
+    """
+
+    def __init__(self, intervals: dict[str, _Intervals], labels: npt.NDArray[np.str_]):
+        self._intervals = intervals
+        self.labels = labels
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[Interval | tuple[str, str, int, int]],
+        epoch_millis: bool = False,
+    ) -> "IntervalIndex":
+        """Build the index.
+
+        Args:
+            rows: key, value, start and end of each interval (like the movie title,
+                user email, start_at and end_at of the streams).
+            epoch_millis: whether starts and ends are given as milliseconds since the
+                epoch (in wall time), instead of datetimes.
+
+        Returns:
+            index.
+
+        """
+        columns = list(zip(*rows))
+        if not columns:
+            return cls({}, np.array([], dtype=str))
+        keys, values, starts, ends = columns
+        key_labels, key_codes = np.unique(np.array(keys), return_inverse=True)
+        labels, value_codes = np.unique(np.array(values), return_inverse=True)
+        to_array = _from_ms_array if epoch_millis else _to_ms_array
+        start_array, end_array = to_array(starts), to_array(ends)
+        order = np.lexsort((start_array, key_codes))
+        boundaries = np.flatnonzero(np.diff(key_codes[order])) + 1
+        intervals = {
+            str(key_labels[key_codes[group[0]]]): _Intervals(
+                start_array[group], end_array[group], value_codes[group]
+            )
+            for group in np.split(order, boundaries)
+        }
+        return cls(intervals, labels)
+
+    def overlapping(self, key: str, start: datetime, end: datetime) -> list[str]:
+        """Values of the intervals of a key that overlap a window.
+
+        Args:
+            key: key of the intervals (like a movie title).
+            start: start of the window.
+            end: end of the window.
+
+        Returns:
+            distinct values (like user emails), sorted.
+
+        """
+        intervals = self._intervals.get(key)
+        if intervals is None:
+            return []
+        first = np.searchsorted(intervals.max_ends, _to_ms(start), side="left")
+        last = np.searchsorted(intervals.starts, _to_ms(end), side="right")
+        if first >= last:
+            return []
+        overlaps = intervals.ends[first:last] >= _to_ms(start)
+        codes = np.unique(intervals.values[first:last][overlaps])
+        return [str(label) for label in self.labels[codes]]
+
+    def count(self, key: str, start: datetime, end: datetime) -> int:
+        """Count the distinct values of the intervals of a key that overlap a window.
+
+        Args:
+            key: key of the intervals (like a movie title).
+            start: start of the window.
+            end: end of the window.
+
+        Returns:
+            number of distinct values.
+
+        """
+        return len(self.overlapping(key, start, end))
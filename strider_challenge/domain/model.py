@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from hashlib import sha1
 from typing import Any
 
+from sqlalchemy import Index, func
 from sqlmodel import Field, SQLModel
 
 from strider_challenge.domain import raw
@@ -109,9 +110,26 @@ class Review(SQLModel, table=True):
 
     def __init__(self, **data: Any):
         super().__init__(**data)
-        self.id = sha1(
-            f"{self.text}{self.rating}{self.movie_title}".encode("utf-8")
-        ).hexdigest()
+        self.id = build_review_id(self.text, self.rating, self.movie_title)
+
+
+# the books are matched case-insensitively with the reviews, which come in upper case
+Index("ix_review_book_title", func.lower(Review.book_title))
+
+
+def build_review_id(text: str, rating: int, movie_title: str) -> str:
+    """Build the unique reference to a review event.
+
+    Args:
+        text: text of the review.
+        rating: score given in the review.
+        movie_title: name of the movie reviewed.
+
+    Returns:
+        sha1 hash of the attributes.
+
+    """
+    return sha1(f"{text}{rating}{movie_title}".encode("utf-8")).hexdigest()
 
 
 def build_review(review_raw: raw.ReviewRaw) -> Review:
@@ -181,20 +199,121 @@ class Stream(SQLModel, table=True):
         size_mb: size of the stream in megabytes.
         start_at: start time of the stream.
         end_at: end time of the stream.
+        duration_seconds: duration of the stream. Automatically computed from the
+            start_at and end_at attributes.
 
     """
 
+    __table_args__ = (Index("ix_stream_start_at_end_at", "start_at", "end_at"),)
+
     id: str = Field(primary_key=True, default=None)
-    movie_title: str
+    movie_title: str = Field(index=True)
     user_email: str
-    size_mb: str
+    size_mb: float = Field(index=True)
     start_at: datetime
     end_at: datetime
+    duration_seconds: float = Field(default=None, index=True)
 
     def __init__(self, **data: Any):
         super().__init__(**data)
-        self.id = sha1(
-            f"{self.movie_title}{self.user_email}{self.start_at}{self.end_at}".encode(
-                "utf-8"
-            )
-        ).hexdigest()
+        self.id = build_stream_id(
+            self.movie_title, self.user_email, self.start_at, self.end_at
+        )
+        self.duration_seconds = (self.end_at - self.start_at).total_seconds()
+
+
+def build_stream_id(
+    movie_title: str, user_email: str, start_at: datetime, end_at: datetime
+) -> str:
+    """Build the unique reference to a stream event.
+
+    Args:
+        movie_title: title of the movie watched in the stream.
+        user_email: email for the user that watched the stream.
+        start_at: start time of the stream.
+        end_at: end time of the stream.
+
+    Returns:
+        sha1 hash of the attributes.
+
+    """
+    return sha1(
+        f"{movie_title}{user_email}{start_at}{end_at}".encode("utf-8")
+    ).hexdigest()
+
+
+class DailyMovieStreams(SQLModel, table=True):
+    """Daily rollup of the streams of each movie.
+
+    Attributes:
+        day: day in which the streams started.
+        movie_title: title of the movie watched in the streams.
+        streams: number of streams.
+        size_mb: total size of the streams in megabytes.
+        duration_seconds: total duration of the streams.
+
+    """
+
+    day: date = Field(primary_key=True)
+    movie_title: str = Field(primary_key=True)
+    streams: int
+    size_mb: float
+    duration_seconds: float
+
+
+class DailyUserStreams(SQLModel, table=True):
+    """Daily rollup of the streams of each user.
+
+    Attributes:
+        day: day in which the streams started.
+        user_email: email for the user that watched the streams.
+        streams: number of streams.
+        size_mb: total size of the streams in megabytes.
+        duration_seconds: total duration of the streams.
+
+    """
+
+    day: date = Field(primary_key=True)
+    user_email: str = Field(primary_key=True)
+    streams: int
+    size_mb: float
+    duration_seconds: float
+
+
+class StreamStatistics(SQLModel, table=True):
+    """Running summary of a measure of the streams.
+
+    Attributes:
+        measure: stream's attribute summarized (like `size_mb`).
+        count: number of streams.
+        total: sum of the measure.
+        minimum: smallest value of the measure.
+        maximum: largest value of the measure.
+        sketch: serialized quantile sketch of the measure (json).
+
+    """
+
+    measure: str = Field(primary_key=True)
+    count: int
+    total: float
+    minimum: float
+    maximum: float
+    sketch: str
+
+
+class WatchCompletion(SQLModel, table=True):
+    """Greatest share of a movie watched by a user in a stream started in a day.
+
+    Attributes:
+        day: day in which the streams started.
+        user_email: email for the user that watched the streams.
+        movie_title: title of the movie watched in the streams.
+        completion: greatest stream duration over the movie's duration (may be
+            greater than 1).
+
+    """
+
+    day: date = Field(primary_key=True)
+    user_email: str = Field(primary_key=True)
+    movie_title: str = Field(primary_key=True)
+    completion: float
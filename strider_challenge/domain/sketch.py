@@ -0,0 +1,132 @@
+import math
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Iterable
+
+DEFAULT_K = 200
+
+
+class QuantileSketch:
+    """Mergeable KLL sketch for approximate quantiles of a stream of numbers.
+
+    Values are kept in a hierarchy of compactors, where each item in the compactor of
+    level `h` stands for `2 ** h` values. When a compactor is full it's sorted and half
+    of its items (the even or the odd positions, alternating between compactions) are
+    promoted to the next level. Memory is bounded by around `3 * k` items, and the
+    rank error of the quantiles is around `1.7 / k` (about 1% for the default `k`).
+    Sketches built from different parts of the data can be merged, with the same
+    error bounds as a sketch built from all of it.
+
+    Attributes:
+        k: size of the top compactor, trading memory for accuracy.
+        count: how many values the sketch has seen.
+        compactors: items kept at each level.
+        coin: which positions the next compaction keeps (alternates between 0 and 1).
+
+    """
+
+    def __init__(
+        self,
+        k: int = DEFAULT_K,
+        count: int = 0,
+        compactors: list[list[float]] | None = None,
+        coin: int = 0,
+    ):
+        self.k = k
+        self.count = count
+        self.compactors = compactors or [[]]
+        self.coin = coin
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items.sort()
+                # an odd item out stays in the level, so the weights are kept
+                kept = items.pop() if len(items) % 2 else None
+                self.compactors[level + 1].extend(items[self.coin :: 2])  # noqa: E203
+                self.compactors[level] = [] if kept is None else [kept]
+                self.coin = 1 - self.coin
+            level += 1
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add values to the sketch.
+
+        Args:
+            values: numbers to add.
+
+        """
+        for value in values:
+            self.compactors[0].append(value)
+            self.count += 1
+            if len(self.compactors[0]) >= self._capacity(0):
+                self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add all the values seen by another sketch to this sketch.
+
+        Args:
+            other: sketch to merge into this one.
+
+        """
+        for level, items in enumerate(other.compactors):
+            if level == len(self.compactors):
+                self.compactors.append([])
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, q: float) -> float | None:
+        """Approximate value at a given quantile.
+
+        Args:
+            q: quantile, between 0 and 1 (0.5 for the median).
+
+        Returns:
+            value, None if the sketch is empty.
+
+        """
+        weighted = sorted(
+            (value, 2**level)
+            for level, items in enumerate(self.compactors)
+            for value in items
+        )
+        if not weighted:
+            return None
+        cumulative = list(accumulate(weight for _, weight in weighted))
+        rank = q * cumulative[-1]
+        return weighted[min(bisect_left(cumulative, rank), len(weighted) - 1)][0]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the sketch.
+
+        Returns:
+            json-serializable state of the sketch.
+
+        """
+        return {
+            "k": self.k,
+            "count": self.count,
+            "compactors": self.compactors,
+            "coin": self.coin,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict[str, Any]) -> "QuantileSketch":
+        """Deserialize a sketch.
+
+        Args:
+            state: state returned by `to_dict`.
+
+        Returns:
+            sketch.
+
+        """
+        return cls(**state)
@@ -1,29 +1,42 @@
+import json
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
 from enum import Enum
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import typer
+from pydantic import BaseModel
 from sqlalchemy.future import Engine as _FutureEngine
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
 
-from strider_challenge import service_layer
+from strider_challenge import adapters, analytics, service_layer
+from strider_challenge.adapters.dead_letter import DEFAULT_MAX_ERROR_RATE
+from strider_challenge.adapters.engine import PROFILES
+from strider_challenge.adapters.snapshot import DEFAULT_MAX_BYTES
+from strider_challenge.domain import model as domain_model
 
 app = typer.Typer()
+query_app = typer.Typer(help="Run analytical queries over the loaded models.")
+app.add_typer(query_app, name="query")
 
 
 def _build_connection_string() -> str:
     return os.environ.get("DATABASE_URL", "sqlite:///database.db")
 
 
-def _build_engine() -> _FutureEngine:
-    return create_engine(_build_connection_string())
+class ProfileEnum(str, Enum):
+    """Possible choices for engine tuning profiles."""
 
+    bulk = "bulk"
+    interactive = "interactive"
 
-@app.command()
-def init_db() -> None:
-    """Initialize the database with all models declared in domain."""
-    SQLModel.metadata.create_all(_build_engine())
+
+def _build_engine(profile: ProfileEnum = ProfileEnum.interactive) -> _FutureEngine:
+    return adapters.get_engine(_build_connection_string(), PROFILES[profile.value])
 
 
 class ModelEnum(str, Enum):
@@ -37,7 +50,7 @@ class ModelEnum(str, Enum):
     review = "review"
 
 
-MODEL_ENUM_MAP = {
+MODEL_ENUM_MAP: dict[ModelEnum, Callable[..., service_layer.LoadReport]] = {
     ModelEnum.movie: service_layer.load_movies,
     ModelEnum.stream: service_layer.load_streams,
     ModelEnum.user: service_layer.load_users,
@@ -47,24 +60,196 @@ MODEL_ENUM_MAP = {
 }
 
 
+MODEL_CLS_MAP = {
+    ModelEnum.movie: domain_model.Movie,
+    ModelEnum.stream: domain_model.Stream,
+    ModelEnum.user: domain_model.User,
+    ModelEnum.author: domain_model.Author,
+    ModelEnum.book: domain_model.Book,
+    ModelEnum.review: domain_model.Review,
+}
+
+
+@app.command()
+def init_db() -> None:
+    """Initialize the database with all models declared in domain.
+
+    Tables created by earlier versions are migrated: the ones missing columns are
+    rebuilt from their rows (like `stream`, before its typed size and its duration) and
+    the missing indexes are created.
+
+    """
+    engine = _build_engine(ProfileEnum.bulk)
+    SQLModel.metadata.create_all(engine)
+    for change in adapters.migrate(engine, list(MODEL_CLS_MAP.values())):
+        typer.echo(change)
+
+
 class CollectorEnum(str, Enum):
     """Possible choice for collectors."""
 
     csv = "csv"
     json = "json"
+    mmap = "mmap"
 
 
 COLLECTOR_ENUM_MAP = {
-    CollectorEnum.csv: service_layer.adapters.CsvCollector,
-    CollectorEnum.json: service_layer.adapters.JsonCollector,
+    CollectorEnum.csv: adapters.CsvCollector,
+    CollectorEnum.json: adapters.JsonCollector,
+    CollectorEnum.mmap: adapters.MmapCsvCollector,
 }
 
 
+class RepositoryEnum(str, Enum):
+    """Possible choices for repositories."""
+
+    sql = "sql"
+    copy = "copy"
+    history = "history"
+
+
+REPOSITORY_ENUM_MAP = {
+    RepositoryEnum.sql: adapters.SqlRepository,
+    RepositoryEnum.copy: adapters.CopyRepository,
+    RepositoryEnum.history: adapters.HistoryRepository,
+}
+
+
+def _check_load_options(
+    model: ModelEnum,
+    repository: RepositoryEnum,
+    skip_unchanged: bool,
+    rollups: bool,
+    sketches: bool,
+    resume: bool,
+    writers: int,
+    bulk_rebuild: bool,
+    cache_dir: Optional[Path],
+) -> None:
+    if (rollups or sketches) and model != ModelEnum.stream:
+        raise typer.BadParameter(
+            "Rollups and sketches are only maintained for the stream model."
+        )
+    if resume and repository == RepositoryEnum.history:
+        raise typer.BadParameter(
+            "History loads need the whole snapshot and can't be resumed."
+        )
+    if resume and writers > 1:
+        raise typer.BadParameter(
+            "Loads with more than one writer aren't checkpointed and can't be resumed."
+        )
+    if bulk_rebuild and (
+        repository != RepositoryEnum.sql
+        or skip_unchanged
+        or resume
+        or rollups
+        or sketches
+    ):
+        raise typer.BadParameter(
+            "Bulk rebuilds replace the whole table at the end of the load, they "
+            "can't be combined with other repositories, skipping unchanged records, "
+            "resuming, rollups or sketches."
+        )
+    if cache_dir and writers:
+        raise typer.BadParameter(
+            "Snapshots are read and written in order, they can't be cached for loads "
+            "with writers."
+        )
+
+
+def _run_load(
+    model: ModelEnum,
+    collector: CollectorEnum,
+    config: Optional[Path],
+    repository: RepositoryEnum,
+    skip_unchanged: bool,
+    workers: int,
+    fast: bool,
+    rollups: bool,
+    sketches: bool,
+    resume: bool,
+    dead_letters: Optional[Path],
+    max_error_rate: float,
+    writers: int,
+    profile: ProfileEnum,
+    bulk_rebuild: bool,
+    dedup_capacity: int,
+    cache_dir: Optional[Path],
+    cache_max_mb: int,
+) -> service_layer.LoadReport:
+    _check_load_options(
+        model,
+        repository,
+        skip_unchanged,
+        rollups,
+        sketches,
+        resume,
+        writers,
+        bulk_rebuild,
+        cache_dir,
+    )
+    with Session(_build_engine(profile)) as session:
+        service = MODEL_ENUM_MAP[model]
+        collector_cls = COLLECTOR_ENUM_MAP[collector]
+        repo_cls = (
+            adapters.RebuildRepository
+            if bulk_rebuild
+            else REPOSITORY_ENUM_MAP[repository]
+        )
+        repo = repo_cls(
+            model=MODEL_CLS_MAP[model], session=session, skip_unchanged=skip_unchanged
+        )
+        kwargs: dict[str, Any] = {}
+        if rollups:
+            kwargs["rollups"] = adapters.StreamRollups(session)
+        if sketches:
+            kwargs["sketches"] = adapters.StreamSketches(session)
+        if repository != RepositoryEnum.history and writers <= 1 and not bulk_rebuild:
+            kwargs["checkpoints"] = adapters.LoadCheckpoints(
+                session, MODEL_CLS_MAP[model], str(config), resume=resume
+            )
+        if dedup_capacity:
+            kwargs["digest_table"] = adapters.DigestTable(dedup_capacity)
+        if cache_dir:
+            kwargs["cache"] = adapters.SnapshotCache(
+                str(cache_dir), max_bytes=cache_max_mb * 1024 * 1024
+            )
+        if dead_letters:
+            kwargs["dead_letters"] = adapters.DeadLetters(
+                str(dead_letters), max_error_rate=max_error_rate
+            )
+        report = service(
+            collector=collector_cls(path=str(config)),
+            repo=repo,
+            workers=workers,
+            fast=fast,
+            writers=writers,
+            batch_size=PROFILES[profile.value].batch_size,
+            **kwargs,
+        )
+    return report
+
+
 @app.command()
 def load(
     model: ModelEnum = typer.Option(ModelEnum.movie),
     collector: CollectorEnum = typer.Option(CollectorEnum.csv),
     config: Optional[Path] = typer.Option(None),
+    repository: RepositoryEnum = typer.Option(RepositoryEnum.sql),
+    skip_unchanged: bool = typer.Option(False),
+    workers: int = typer.Option(1),
+    fast: bool = typer.Option(False),
+    rollups: bool = typer.Option(False),
+    sketches: bool = typer.Option(False),
+    resume: bool = typer.Option(False),
+    dead_letters: Optional[Path] = typer.Option(None),
+    max_error_rate: float = typer.Option(DEFAULT_MAX_ERROR_RATE),
+    writers: int = typer.Option(0),
+    profile: ProfileEnum = typer.Option(ProfileEnum.bulk),
+    bulk_rebuild: bool = typer.Option(False),
+    dedup_capacity: int = typer.Option(0),
+    cache_dir: Optional[Path] = typer.Option(None),
+    cache_max_mb: int = typer.Option(DEFAULT_MAX_BYTES // 1024 // 1024),
 ) -> None:
     """Extract, transform, and load records into a specific model repository.
 
@@ -72,12 +257,587 @@ def load(
         model: what model to populate.
         collector: what collector to use.
         config: arg for the collector (path to file).
+        repository: what repository to use (copy is only available for PostgreSQL,
+            history keeps all versions of the records and expects a full snapshot).
+        skip_unchanged: only write records that are new or changed since last load.
+        workers: how many processes parse and transform csv files in parallel shards.
+        fast: skip the models' validation for trusted files, validating only a sample.
+        rollups: update the daily rollups of the streams (only for the stream model).
+        sketches: update the running sums and quantile sketches of the streams (only
+            for the stream model).
+        resume: continue from the last batch committed by a previous load of the same
+            file, instead of starting over (not available for history loads).
+        dead_letters: json lines file where the records that fail to transform are
+            written, instead of aborting the load.
+        max_error_rate: share of the records that may be dead-lettered before the
+            load is aborted.
+        writers: if greater than zero, extract, transform and write at the same time
+            in a pipeline, with this many writers (more than one only for PostgreSQL
+            and loads without checkpoints, rollups or sketches).
+        profile: engine tuning profile (bulk relaxes durability and loads in larger
+            batches, interactive is the one used by queries).
+        bulk_rebuild: load the whole dataset into an unindexed copy of the table,
+            then index it and swap it in (records missing from the file are removed).
+        dedup_capacity: if greater than zero, max number of keys of a digest table
+            (16 bytes per key) dropping the records repeated across batches (records
+            repeated in a batch are always dropped).
+        cache_dir: directory keeping snapshots of the transformed records of the
+            loaded files, so loading an unchanged file again skips the extract and
+            transform (and the whole load if it was already loaded to the end).
+        cache_max_mb: max size of the snapshots in the cache directory, the least
+            recently used are evicted first.
+
+    """
+    report = _run_load(
+        model,
+        collector,
+        config,
+        repository,
+        skip_unchanged,
+        workers,
+        fast,
+        rollups,
+        sketches,
+        resume,
+        dead_letters,
+        max_error_rate,
+        writers,
+        profile,
+        bulk_rebuild,
+        dedup_capacity,
+        cache_dir,
+        cache_max_mb,
+    )
+    if report.skipped:
+        typer.echo(f"{config} was already loaded to the end the same way, skipped")
+
+
+class ManifestEntry(BaseModel):
+    """Entry of a `load-all` manifest, with the same options as the `load` command.
+
+    Attributes:
+        model: what model to populate.
+        collector: what collector to use.
+        config: arg for the collector (path to file).
+        repository: what repository to use.
+        skip_unchanged: only write records that are new or changed since last load.
+        workers: how many processes parse and transform csv files in parallel shards.
+        fast: skip the models' validation for trusted files, validating only a sample.
+        rollups: update the daily rollups of the streams (only for the stream model).
+        sketches: update the running sums and quantile sketches of the streams (only
+            for the stream model).
+        resume: continue from the last batch committed by a previous load of the same
+            file, instead of starting over (not available for history loads).
+        dead_letters: json lines file where the records that fail to transform are
+            written, instead of aborting the load.
+        max_error_rate: share of the records that may be dead-lettered before the
+            load is aborted.
+        writers: if greater than zero, extract, transform and write at the same time
+            in a pipeline, with this many writers (more than one only for PostgreSQL
+            and loads without checkpoints, rollups or sketches).
+        profile: engine tuning profile (bulk relaxes durability and loads in larger
+            batches, interactive is the one used by queries).
+        bulk_rebuild: load the whole dataset into an unindexed copy of the table,
+            then index it and swap it in (records missing from the file are removed).
+        dedup_capacity: if greater than zero, max number of keys of a digest table
+            (16 bytes per key) dropping the records repeated across batches (records
+            repeated in a batch are always dropped).
+        cache_dir: directory keeping snapshots of the transformed records of the
+            loaded files, so loading an unchanged file again skips the extract and
+            transform (and the whole load if it was already loaded to the end).
+        cache_max_mb: max size of the snapshots in the cache directory, the least
+            recently used are evicted first.
+        depends_on: models that must finish loading before this entry starts.
+
+    """
+
+    model: ModelEnum
+    collector: CollectorEnum
+    config: Path
+    repository: RepositoryEnum = RepositoryEnum.sql
+    skip_unchanged: bool = False
+    workers: int = 1
+    fast: bool = False
+    rollups: bool = False
+    sketches: bool = False
+    resume: bool = False
+    dead_letters: Optional[Path] = None
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE
+    writers: int = 0
+    profile: ProfileEnum = ProfileEnum.bulk
+    bulk_rebuild: bool = False
+    dedup_capacity: int = 0
+    cache_dir: Optional[Path] = None
+    cache_max_mb: int = DEFAULT_MAX_BYTES // 1024 // 1024
+    depends_on: list[ModelEnum] = []
+
+
+def _run_manifest_entry(entry: ManifestEntry) -> tuple[service_layer.LoadReport, float]:
+    start = time.perf_counter()
+    report = _run_load(
+        entry.model,
+        entry.collector,
+        entry.config,
+        entry.repository,
+        entry.skip_unchanged,
+        entry.workers,
+        entry.fast,
+        entry.rollups,
+        entry.sketches,
+        entry.resume,
+        entry.dead_letters,
+        entry.max_error_rate,
+        entry.writers,
+        entry.profile,
+        entry.bulk_rebuild,
+        entry.dedup_capacity,
+        entry.cache_dir,
+        entry.cache_max_mb,
+    )
+    return report, time.perf_counter() - start
+
+
+def _skip_dependents(
+    entries: list[ManifestEntry], pending: list[int], failed: dict[int, str]
+) -> None:
+    # skipped entries fail their own dependents in turn
+    skipped = True
+    while skipped:
+        models = {entries[j].model for j in failed}
+        skipped = False
+        for i in list(pending):
+            if models & set(entries[i].depends_on):
+                pending.remove(i)
+                failed[i] = "skipped, a load it depends on failed"
+                skipped = True
+
+
+def _ready(
+    entries: list[ManifestEntry], pending: list[int], running: list[int], serial: bool
+) -> list[int]:
+    blocked = {entries[i].model for i in [*pending, *running]}
+    busy = {entries[i].model for i in running}
+    ready = []
+    for i in pending:
+        if not blocked & set(entries[i].depends_on) and not (
+            serial and entries[i].model in busy
+        ):
+            ready.append(i)
+        if serial:
+            busy.add(entries[i].model)
+    return ready
+
+
+def _run_entries(
+    entries: list[ManifestEntry],
+    workers: int,
+    on_done: Callable[[int, tuple[service_layer.LoadReport, float]], None],
+    serial: bool = False,
+) -> dict[int, str]:
+    # entries start once the entries of the models they depend on are finished, and
+    # when serial, once the earlier entries of their own model are finished too (failed
+    # or not, a bad file doesn't hold back the later ones); the entries depending on a
+    # model with a failed entry are skipped, the others go on
+    pending = list(range(len(entries)))
+    running: dict[Future[tuple[service_layer.LoadReport, float]], int] = {}
+    failed: dict[int, str] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            _skip_dependents(entries, pending, failed)
+            for i in _ready(entries, pending, list(running.values()), serial):
+                pending.remove(i)
+                running[executor.submit(_run_manifest_entry, entries[i])] = i
+            if not running:
+                if not pending:
+                    break
+                raise typer.BadParameter("Circular dependencies in manifest entries.")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed[i] = f"{type(e).__name__}: {e}"
+                    typer.echo(f"{entries[i].config} failed: {failed[i]}", err=True)
+                else:
+                    on_done(i, result)
+    return failed
+
+
+def _echo_results(
+    entries: list[ManifestEntry],
+    results: dict[int, tuple[service_layer.LoadReport, float]],
+    failed: dict[int, str],
+    start: float,
+) -> None:
+    typer.echo(
+        f"{'model':<10}{'config':<40}{'records':>10}{'rejected':>10}"
+        f"{'duplicates':>12}{'seconds':>10}{'rec/s':>10}"
+    )
+    for i, (report, seconds) in sorted(results.items()):
+        typer.echo(
+            f"{entries[i].model.value:<10}{str(entries[i].config):<40}"
+            f"{report.records:>10}{report.rejected:>10}{report.duplicates:>12}"
+            f"{seconds:>10.2f}{report.records / seconds:>10.0f}"
+            + ("  skipped" if report.skipped else "")
+        )
+    for i, error in sorted(failed.items()):
+        typer.echo(f"{entries[i].model.value:<10}{str(entries[i].config):<40}{error}")
+    typer.echo(f"total wall time: {time.perf_counter() - start:.2f}s")
+
+
+@app.command()
+def load_all(
+    manifest: Path = typer.Option(...),
+    workers: int = typer.Option(os.cpu_count() or 1),
+) -> None:
+    """Run all loads declared in a manifest file concurrently.
+
+    The manifest is a json list of entries with `model`, `collector` and `config` keys
+    (and optionally `repository`, `skip_unchanged`, `workers`, `fast`, `rollups`,
+    `sketches`, `resume`, `dead_letters`, `max_error_rate`, `writers`, `profile`,
+    `bulk_rebuild`, `dedup_capacity`, `cache_dir`, `cache_max_mb` and `depends_on`).
+    Each load runs in a worker process with its own connection pool, and entries only
+    start after all the entries for the models in their `depends_on` are finished.
+    A failed load doesn't stop the others, but the entries depending on its model are
+    skipped. Wall time, throughput, rejected and duplicated records for each load (or
+    its error) are reported at the end, and the command fails if any load failed.
+
+    Args:
+        manifest: path to the manifest file.
+        workers: how many loads to run at the same time.
+
+    """
+    entries = [ManifestEntry(**e) for e in json.loads(manifest.read_text())]
+    results: dict[int, tuple[service_layer.LoadReport, float]] = {}
+    start = time.perf_counter()
+    failed = _run_entries(entries, workers, results.__setitem__)
+    _echo_results(entries, results, failed, start)
+    if failed:
+        raise typer.Exit(1)
+
+
+def _ingest_rules(rules: Path) -> list[tuple[str, dict[str, Any]]]:
+    parsed = []
+    for rule in json.loads(rules.read_text()):
+        options = {k: v for k, v in rule.items() if k != "pattern"}
+        # validate the options before any file is loaded
+        ManifestEntry(config=Path(rule["pattern"]), **options)
+        parsed.append((rule["pattern"], options))
+    return parsed
+
+
+def _ingest_once(
+    directory: Path,
+    rules: list[tuple[str, dict[str, Any]]],
+    manifest: adapters.LandingManifest,
+    workers: int,
+) -> dict[int, str]:
+    matched = {}
+    for file in sorted(os.scandir(directory), key=lambda f: f.name):
+        # hidden files are skipped, like the ones still being copied by some tools
+        if file.name.startswith(".") or not file.is_file():
+            continue
+        for pattern, options in rules:
+            if fnmatch(file.name, pattern):
+                matched[file.path] = options
+                break
+    changed = manifest.changed(matched)
+    if not changed:
+        typer.echo("no new or changed files")
+        return {}
+    entries = [ManifestEntry(config=Path(p), **matched[p]) for p, _ in changed]
+    results: dict[int, tuple[service_layer.LoadReport, float]] = {}
+
+    def _done(i: int, result: tuple[service_layer.LoadReport, float]) -> None:
+        results[i] = result
+        manifest.mark(*changed[i])
+
+    start = time.perf_counter()
+    # each loaded file is marked as soon as it's done, the failed ones are retried
+    failed = _run_entries(entries, workers, _done, serial=True)
+    _echo_results(entries, results, failed, start)
+    return failed
+
+
+@app.command()
+def ingest(
+    directory: Path = typer.Option(...),
+    rules: Path = typer.Option(...),
+    manifest: Optional[Path] = typer.Option(None),
+    workers: int = typer.Option(os.cpu_count() or 1),
+    watch: bool = typer.Option(False),
+    interval: float = typer.Option(60.0),
+) -> None:
+    """Load the new or changed files of a landing directory into their models.
+
+    The rules are a json list of entries with a `pattern` key, a glob matched against
+    the file names, and the options of a `load-all` manifest entry (except `config`).
+    Each file is loaded with the first rule matching its name, and files matching no
+    rule are ignored. The fingerprint of each loaded file is kept in the manifest, so
+    unchanged files are skipped at the cost of a stat and a hash of their first and
+    last megabyte. The loads run concurrently like `load-all`, except that the files of
+    a model are loaded one at a time, in name order (so later dumps win). A file that
+    fails to load isn't marked, so it's loaded again on the next pass, and doesn't
+    stop the other files (later files of its model included); the command fails if any
+    file failed.
+
+    Args:
+        directory: landing directory.
+        rules: path to the rules file.
+        manifest: path to the manifest of loaded files (defaults to `.ingested.json`
+            in the landing directory).
+        workers: how many loads to run at the same time.
+        watch: keep polling the directory instead of exiting after one pass (failed
+            loads are reported and retried on the next poll).
+        interval: seconds between polls when watching.
+
+    """
+    parsed = _ingest_rules(rules)
+    landing = adapters.LandingManifest(str(manifest or directory / ".ingested.json"))
+    while True:
+        try:
+            failed = _ingest_once(directory, parsed, landing, workers)
+        except Exception as e:
+            if not watch:
+                raise
+            typer.echo(f"ingestion failed, retrying on the next poll: {e}", err=True)
+        if not watch:
+            if failed:
+                raise typer.Exit(1)
+            break
+        time.sleep(interval)
+
+
+@app.command()
+def refresh_completions(
+    start: datetime = typer.Option(datetime(2021, 12, 1)),
+    end: datetime = typer.Option(datetime(2021, 12, 31)),
+) -> None:
+    """Recompute the watch completion table for the streams started in a window.
+
+    Args:
+        start: first day.
+        end: last day.
+
+    """
+    with Session(_build_engine(ProfileEnum.bulk)) as session:
+        rows = adapters.WatchCompletions(session).refresh(start.date(), end.date())
+    typer.echo(f"{rows} completions written")
+
+
+@app.command()
+def refresh_rollups(
+    start: Optional[datetime] = typer.Option(None),
+    end: Optional[datetime] = typer.Option(None),
+) -> None:
+    """Rebuild the daily rollups of the streams from the stream table.
+
+    Run it after loading streams without `--rollups`, as those streams are never
+    counted by later loads with it.
+
+    Args:
+        start: first day, from the first stream if not set.
+        end: last day, up to the last stream if not set.
+
+    """
+    with Session(_build_engine(ProfileEnum.bulk)) as session:
+        rows = adapters.StreamRollups(session).refresh(
+            start.date() if start else None, end.date() if end else None
+        )
+    typer.echo(f"{rows} rollup rows written")
+
+
+@app.command()
+def refresh_sketches() -> None:
+    """Rebuild the running sums and quantile sketches of the streams from the table.
+
+    Run it after loading streams without `--sketches`, as those streams are never
+    summarized by later loads with it, or to reflect the sizes changed by reloads in
+    the minimum, maximum and quantiles.
+
+    """
+    with Session(_build_engine(ProfileEnum.bulk)) as session:
+        streams = adapters.StreamSketches(session).refresh()
+    typer.echo(f"{streams} streams summarized")
+
+
+@query_app.command()
+def movies_based_on_books() -> None:
+    """Share of the streamed movies that are based on books."""
+    with Session(_build_engine()) as session:
+        share = analytics.share_of_streamed_movies_based_on_books(session)
+    typer.echo(f"{share:.2f}")
+
+
+@query_app.command()
+def users_streaming(
+    movie_title: str = typer.Option("Unforgiven"),
+    start: datetime = typer.Option(datetime(2021, 12, 25, 7)),
+    end: datetime = typer.Option(datetime(2021, 12, 25, 12)),
+) -> None:
+    """Count the users with a stream of a movie in progress during a time window.
+
+    Args:
+        movie_title: title of the movie.
+        start: start of the window.
+        end: end of the window.
 
     """
     with Session(_build_engine()) as session:
-        service = MODEL_ENUM_MAP[model]
-        collector_cls = COLLECTOR_ENUM_MAP[collector]
-        service(collector=collector_cls(path=str(config)), session=session)
+        count = analytics.count_users_streaming(session, movie_title, start, end)
+    typer.echo(count)
+
+
+@query_app.command()
+def overlap(
+    movie_title: str = typer.Option("Unforgiven"),
+    start: datetime = typer.Option(datetime(2021, 12, 25, 7)),
+    end: datetime = typer.Option(datetime(2021, 12, 25, 12)),
+) -> None:
+    """Count the users streaming a movie in a time window, from an interval index.
+
+    Args:
+        movie_title: title of the movie.
+        start: start of the window.
+        end: end of the window.
+
+    """
+    with Session(_build_engine()) as session:
+        index = analytics.build_stream_interval_index(session, movie_title)
+    typer.echo(index.count(movie_title, start, end))
+
+
+@query_app.command()
+def movies_by_nationality(
+    nationality: str = typer.Option("singaporeans"),
+    start: datetime = typer.Option(datetime(2021, 12, 1)),
+    end: datetime = typer.Option(datetime(2021, 12, 31, 23, 59, 59)),
+) -> None:
+    """Count the movies based on books by authors of a nationality streamed in a window.
+
+    Args:
+        nationality: authors' nationality.
+        start: start of the window.
+        end: end of the window.
+
+    """
+    with Session(_build_engine()) as session:
+        count = analytics.count_streamed_movies_based_on_books_by_nationality(
+            session, nationality, start, end
+        )
+    typer.echo(count)
+
+
+@query_app.command()
+def average_duration(approximate: bool = typer.Option(False)) -> None:
+    """Average duration of the streams, in seconds.
+
+    Args:
+        approximate: read the running sums kept by loads with sketches, instead of
+            scanning the streams.
+
+    """
+    with Session(_build_engine()) as session:
+        if approximate:
+            seconds = analytics.running_stream_average(session, "duration_seconds")
+        else:
+            seconds = analytics.average_stream_duration(session)
+    typer.echo(f"{seconds:.0f}")
+
+
+@query_app.command()
+def median_size(approximate: bool = typer.Option(False)) -> None:
+    """Median size of the streams, in gigabytes.
+
+    Args:
+        approximate: read the quantile sketch kept by loads with sketches, instead of
+            sorting the streams.
+
+    """
+    with Session(_build_engine()) as session:
+        if approximate:
+            size_mb = analytics.approximate_stream_quantile(session, "size_mb", 0.5)
+        else:
+            size_mb = analytics.median_stream_size(session)
+    typer.echo(f"{size_mb / 1000:.2f}")
+
+
+@query_app.command()
+def users_watching(
+    ratio: float = typer.Option(0.5),
+    start: datetime = typer.Option(datetime(2021, 12, 24)),
+    end: datetime = typer.Option(datetime(2021, 12, 31, 23, 59, 59)),
+) -> None:
+    """Count the users that watched at least a share of a movie in a time window.
+
+    Args:
+        ratio: share of the movie's duration watched in a stream.
+        start: start of the window.
+        end: end of the window.
+
+    """
+    with Session(_build_engine()) as session:
+        count = analytics.count_users_watching_at_least(session, ratio, start, end)
+    typer.echo(count)
+
+
+@query_app.command()
+def users_completing(
+    ratio: float = typer.Option(0.5),
+    start: datetime = typer.Option(datetime(2021, 12, 24)),
+    end: datetime = typer.Option(datetime(2021, 12, 31)),
+) -> None:
+    """Count the users that watched at least a share of a movie, from the completions.
+
+    Args:
+        ratio: share of the movie's duration watched in a stream.
+        start: first day.
+        end: last day.
+
+    """
+    with Session(_build_engine()) as session:
+        count = analytics.count_users_completing(
+            session, ratio, start.date(), end.date()
+        )
+    typer.echo(count)
+
+
+def _echo_rows(rows: list[dict[str, Any]]) -> None:
+    for row in rows:
+        typer.echo("\t".join(str(value) for value in row.values()))
+
+
+@query_app.command()
+def daily_movies(
+    start: datetime = typer.Option(datetime(2021, 12, 1)),
+    end: datetime = typer.Option(datetime(2021, 12, 31)),
+) -> None:
+    """Streams, total size and average duration of each movie by day, from the rollup.
+
+    Args:
+        start: first day.
+        end: last day.
+
+    """
+    with Session(_build_engine()) as session:
+        _echo_rows(analytics.daily_movie_streams(session, start.date(), end.date()))
+
+
+@query_app.command()
+def daily_users(
+    start: datetime = typer.Option(datetime(2021, 12, 1)),
+    end: datetime = typer.Option(datetime(2021, 12, 31)),
+) -> None:
+    """Streams, total size and average duration of each user by day, from the rollup.
+
+    Args:
+        start: first day.
+        end: last day.
+
+    """
+    with Session(_build_engine()) as session:
+        _echo_rows(analytics.daily_user_streams(session, start.date(), end.date()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Generic, Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+V = TypeVar("V")
+
+# how many items each queue holds before the stage feeding it waits
+DEFAULT_QUEUE_SIZE = 4
+
+
+class _Done:
+    """Marks the end of the items in a queue."""
+
+
+_DONE = _Done()
+
+
+class Pipeline(Generic[T, U, V]):
+    """Run the extract, transform and write stages of a load concurrently.
+
+    The stages are asyncio tasks connected by bounded queues, so a stage waits (back
+    pressure) when the next one falls behind, and the memory in use doesn't grow with
+    the input. The blocking work runs in executors: the items are extracted in a
+    thread, transformed in the given executor (like a process pool) with a number of
+    items in flight, and each writer writes in its own thread, so writers can use
+    their own connection. The transformed items are routed to the writers in the
+    order they were extracted. The wall time approaches the one of the slowest stage,
+    instead of the sum of all stages.
+
+    Attributes:
+        transform: transforms an extracted item.
+        route: splits a transformed item in one part for each writer (None for no
+            part), it runs in the event loop, in the order of the items.
+        writers: write the parts of the items, in order.
+        executor: where to run the transforms, a single thread if not set.
+        concurrency: how many items are transformed at the same time.
+        queue_size: how many items each queue holds.
+
+    """
+
+    def __init__(
+        self,
+        transform: Callable[[T], U],
+        route: Callable[[U], Sequence[V | None]],
+        writers: Sequence[Callable[[V], None]],
+        executor: Executor | None = None,
+        concurrency: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.transform = transform
+        self.route = route
+        self.writers = writers
+        self.executor = executor
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+
+    def run(self, items: Iterator[T]) -> None:
+        """Run the pipeline until all the items are written.
+
+        Args:
+            items: extracted items, the iterator can block (like reading a file).
+
+        """
+        asyncio.run(self._run(items))
+
+    async def _run(self, items: Iterator[T]) -> None:
+        extracted: asyncio.Queue[T | _Done] = asyncio.Queue(self.queue_size)
+        inboxes: list[asyncio.Queue[V | _Done]] = [
+            asyncio.Queue(self.queue_size) for _ in self.writers
+        ]
+        threads = [ThreadPoolExecutor(max_workers=1) for _ in range(len(inboxes) + 2)]
+        tasks = [
+            asyncio.create_task(self._extract(items, extracted, threads[0])),
+            asyncio.create_task(
+                self._transform(extracted, inboxes, self.executor or threads[1])
+            ),
+            *[
+                asyncio.create_task(self._write(inbox, writer, thread))
+                for inbox, writer, thread in zip(inboxes, self.writers, threads[2:])
+            ],
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # a failing stage cancels the others, which could be waiting on it forever
+            for task in tasks:
+                task.cancel()
+            for thread in threads:
+                thread.shutdown(cancel_futures=True)
+
+    async def _extract(
+        self, items: Iterator[T], outbox: "asyncio.Queue[T | _Done]", thread: Executor
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item: T | _Done = await loop.run_in_executor(thread, next, items, _DONE)
+            await outbox.put(item)
+            if isinstance(item, _Done):
+                return
+
+    async def _transform(
+        self,
+        inbox: "asyncio.Queue[T | _Done]",
+        outboxes: "list[asyncio.Queue[V | _Done]]",
+        executor: Executor,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        pending: deque[asyncio.Future[U]] = deque()
+        while True:
+            item = await inbox.get()
+            if isinstance(item, _Done):
+                break
+            pending.append(loop.run_in_executor(executor, self.transform, item))
+            if len(pending) >= self.concurrency:
+                await self._dispatch(await pending.popleft(), outboxes)
+        while pending:
+            await self._dispatch(await pending.popleft(), outboxes)
+        for outbox in outboxes:
+            await outbox.put(_DONE)
+
+    async def _dispatch(
+        self, item: U, outboxes: "list[asyncio.Queue[V | _Done]]"
+    ) -> None:
+        for outbox, part in zip(outboxes, self.route(item)):
+            if part is not None:
+                await outbox.put(part)
+
+    async def _write(
+        self,
+        inbox: "asyncio.Queue[V | _Done]",
+        writer: Callable[[V], None],
+        thread: Executor,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while not isinstance(part := await inbox.get(), _Done):
+            await loop.run_in_executor(thread, writer, part)
@@ -1,10 +1,61 @@
-from typing import Type
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from typing import Any, Callable, Iterator, NamedTuple, Sequence, Type
 
+from pydantic import BaseModel
+from sqlalchemy.inspection import inspect
 from sqlmodel import Session, SQLModel
 
-from strider_challenge import adapters
+from strider_challenge import __metadata__, adapters
 from strider_challenge.adapters import SqlRepository
-from strider_challenge.domain import model, raw
+from strider_challenge.domain import columnar, converters, model, raw
+from strider_challenge.pipeline import Pipeline
+
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_SHARD_SIZE = 4 * 1024 * 1024
+DEFAULT_VALIDATE_EVERY = 1000
+
+Transform = Callable[[dict[str, Any]], SQLModel | dict[str, Any] | None]
+BatchTransform = Callable[
+    [Sequence[dict[str, Any]]], Sequence[SQLModel | dict[str, Any] | None]
+]
+
+
+class _Rejected(NamedTuple):
+    """Record that failed to transform, with its offset in the batch and the error."""
+
+    offset: int
+    record: dict[str, Any]
+    error: str
+
+
+Listener = Callable[[list[dict[str, Any]]], None]
+
+# number of records read, transformed records, position after them in the source and
+# rejected records
+TransformedBatch = tuple[
+    int, Sequence[SQLModel | dict[str, Any]], int | None, list[_Rejected]
+]
+
+
+class LoadReport(BaseModel):
+    """Summary of a load.
+
+    Attributes:
+        records: how many records were extracted from the collector.
+        rejected: how many of them failed to transform and were dead-lettered.
+        duplicates: how many of them were dropped as repeated records.
+        skipped: whether the load was skipped, as the file was already loaded to the
+            end the same way.
+
+    """
+
+    records: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    skipped: bool = False
 
 
 def _build_repo(
@@ -19,62 +70,648 @@ def _build_repo(
     raise ValueError("Both repo and session cannot be None, one must be set.")
 
 
+class _RecordTransform:
+    """Transform a batch of records one record at a time."""
+
+    def __init__(self, transform: Transform):
+        self.transform = transform
+
+    def __call__(
+        self, batch: Sequence[dict[str, Any]]
+    ) -> list[SQLModel | dict[str, Any] | None]:
+        return [self.transform(record) for record in batch]
+
+
+class _SampledTransform:
+    """Fast transform of trusted records, checking a sample of them against validation.
+
+    Every `validate_every` records, the record is also transformed through the
+    validated path, and the load fails if the results differ. No record is validated
+    when `validate_every` is zero.
+
+    """
+
+    def __init__(
+        self, convert: BatchTransform, transform: Transform, validate_every: int
+    ):
+        self.convert = convert
+        self.transform = transform
+        self.validate_every = validate_every
+        self.count = 0
+
+    def __call__(
+        self, batch: Sequence[dict[str, Any]]
+    ) -> Sequence[SQLModel | dict[str, Any] | None]:
+        rows = self.convert(batch)
+        if self.validate_every:
+            first = (-self.count - 1) % self.validate_every
+            for i in range(first, len(batch), self.validate_every):
+                validated = self.transform(batch[i])
+                expected = _to_row(validated) if validated is not None else None
+                if rows[i] != expected:
+                    raise _SampleMismatch(
+                        f"Fast transform of record {self.count + i + 1} differs from "
+                        f"the validated one: {batch[i]}"
+                    )
+        self.count += len(batch)
+        return rows
+
+
+class _SampleMismatch(ValueError):
+    """Fast transform of a record that differs from the validated one."""
+
+
+class _IsolatedTransform:
+    """Transform a batch isolating the records that fail.
+
+    The batch is transformed as a whole first, and only when that fails it's retried
+    record by record, so the records that fail are returned as `_Rejected` in
+    place of their rows while the rest of the batch goes on. A mismatch of the sampled
+    fast transform isn't a bad record but a bad transform, so it fails the load.
+
+    """
+
+    def __init__(self, transform: BatchTransform):
+        self.transform = transform
+
+    def __call__(self, batch: Sequence[dict[str, Any]]) -> Sequence[Any]:
+        try:
+            return self.transform(batch)
+        except _SampleMismatch:
+            raise
+        except Exception:
+            pass
+        rows: list[Any] = []
+        for i, record in enumerate(batch):
+            try:
+                rows.extend(self.transform([record]))
+            except _SampleMismatch:
+                raise
+            except Exception as error:
+                rows.append(_Rejected(i, record, f"{type(error).__name__}: {error}"))
+        return rows
+
+
+def _split_rejected(
+    rows: Sequence[Any],
+) -> tuple[list[SQLModel | dict[str, Any]], list[_Rejected]]:
+    records: list[SQLModel | dict[str, Any]] = []
+    rejected: list[_Rejected] = []
+    for row in rows:
+        if isinstance(row, _Rejected):
+            rejected.append(row)
+        elif row is not None:
+            records.append(row)
+    return records, rejected
+
+
+def _select_transform(
+    transform: Transform, convert: BatchTransform, fast: bool
+) -> BatchTransform:
+    if fast:
+        return _SampledTransform(convert, transform, DEFAULT_VALIDATE_EVERY)
+    return _RecordTransform(transform)
+
+
+def _to_row(record: SQLModel | dict[str, Any]) -> dict[str, Any]:
+    return record if isinstance(record, dict) else record.dict()
+
+
+def _iter_batches(
+    collector: adapters.Collector, batch_size: int, positioned: bool
+) -> Iterator[tuple[list[dict[str, Any]], int | None]]:
+    if positioned:
+        return collector.iter_positioned_batches(batch_size)
+    return ((batch, None) for batch in collector.iter_batches(batch_size))
+
+
+def _transform_batch(
+    transform: BatchTransform, item: tuple[list[dict[str, Any]], int | None]
+) -> TransformedBatch:
+    # rows are returned as plain dicts, much cheaper to pickle between processes
+    batch, position = item
+    records, rejected = _split_rejected(transform(batch))
+    return len(batch), [_to_row(r) for r in records], position, rejected
+
+
+def _transform_shard(
+    collector: adapters.Collector,
+    transform: BatchTransform,
+    batch_size: int,
+    positioned: bool,
+) -> list[TransformedBatch]:
+    return [
+        _transform_batch(transform, item)
+        for item in _iter_batches(collector, batch_size, positioned)
+    ]
+
+
+def _iter_transformed_batches(
+    collector: adapters.Collector,
+    transform: BatchTransform,
+    batch_size: int,
+    workers: int,
+    positioned: bool = False,
+) -> Iterator[TransformedBatch]:
+    shards = collector.split(DEFAULT_SHARD_SIZE) if workers > 1 else [collector]
+    if len(shards) <= 1:
+        for batch, position in _iter_batches(collector, batch_size, positioned):
+            records, rejected = _split_rejected(transform(batch))
+            yield len(batch), records, position, rejected
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # bound the shards in flight so memory doesn't grow with the input size
+        futures: deque[Future[list[TransformedBatch]]] = deque()
+        for shard in shards:
+            futures.append(
+                executor.submit(
+                    _transform_shard, shard, transform, batch_size, positioned
+                )
+            )
+            if len(futures) > 2 * workers:
+                yield from futures.popleft().result()
+        while futures:
+            yield from futures.popleft().result()
+
+
+class _BatchWriter:
+    """Write transformed batches to a repository, with their listeners and checkpoints.
+
+    Listeners and checkpoints share the repository's session, so they are committed
+    together with the batch.
+
+    """
+
+    def __init__(
+        self,
+        repo: adapters.AbstractRepository,
+        listeners: Sequence[Listener] = (),
+        checkpoints: adapters.LoadCheckpoints | None = None,
+    ):
+        self.repo = repo
+        self.listeners = listeners
+        self.checkpoints = checkpoints
+
+    def __call__(self, batch: TransformedBatch) -> None:
+        count, records, position, _ = batch
+        if self.listeners:
+            rows = [_to_row(r) for r in records]
+            for listener in self.listeners:
+                listener(rows)
+        if self.checkpoints and position is not None:
+            self.checkpoints.save(position, count)
+        self.repo.add(records=records)
+
+
+def _account(
+    report: LoadReport,
+    dead_letters: adapters.DeadLetters | None,
+    deduplicate: adapters.Deduplicator,
+    first: int,
+    batch: TransformedBatch,
+) -> TransformedBatch:
+    count, records, position, rejected = batch
+    # indexed from the start of the source, also when the load was resumed
+    index = first + report.records
+    if rejected and not dead_letters:
+        # snapshots of loads with dead letters keep their rejected records, replayed
+        # without dead letters they abort the load like transforming them again
+        i, _, error = rejected[0]
+        raise ValueError(
+            f"Record {index + i} failed to transform ({error}), load it with dead "
+            "letters to skip the records that fail."
+        )
+    if dead_letters:
+        dead_letters.add([(index + i, record, error) for i, record, error in rejected])
+        report.rejected += len(rejected)
+        dead_letters.check(report.records + count)
+    report.records += count
+    records = deduplicate(records)
+    report.duplicates = deduplicate.dropped
+    return count, records, position, rejected
+
+
+def _key(repo: adapters.AbstractRepository) -> str:
+    if isinstance(repo, SqlRepository):
+        return repo.pk
+    return str(inspect(repo.model).primary_key[0].name)
+
+
+def _partition(
+    batch: TransformedBatch, key: str, parts: int
+) -> list[TransformedBatch | None]:
+    # records with the same key always go to the same writer, so concurrent writers
+    # never upsert the same rows
+    partitions: list[list[SQLModel | dict[str, Any]]] = [[] for _ in range(parts)]
+    for record in batch[1]:
+        partitions[hash(_to_row(record)[key]) % parts].append(record)
+    return [(len(p), p, None, []) if p else None for p in partitions]
+
+
+def _fork_repos(write: _BatchWriter, writers: int) -> list[SqlRepository]:
+    if writers <= 1:
+        return []
+    if (
+        write.listeners
+        or write.checkpoints
+        or not isinstance(write.repo, SqlRepository)
+    ):
+        raise ValueError(
+            "Concurrent writers need a sql repository and can't be used with "
+            "checkpoints, rollups or sketches, which need the batches in order."
+        )
+    return [write.repo.fork() for _ in range(writers - 1)]
+
+
+def _run_pipeline(
+    collector: adapters.Collector,
+    transform: BatchTransform,
+    batch_size: int,
+    workers: int,
+    write: _BatchWriter,
+    writers: int,
+    account: Callable[[TransformedBatch], TransformedBatch],
+) -> None:
+    forks = _fork_repos(write, writers)
+    writes = [write, *[_BatchWriter(fork) for fork in forks]]
+    key = _key(write.repo)
+    if isinstance(write.repo, SqlRepository):
+        # the session is used from the first writer's thread from now on, and the
+        # connections of some databases (like SQLite) can't change threads
+        write.repo.session.commit()
+
+    def route(batch: TransformedBatch) -> Sequence[TransformedBatch | None]:
+        batch = account(batch)
+        return _partition(batch, key, len(writes)) if len(writes) > 1 else [batch]
+
+    with ExitStack() as stack:
+        for fork in forks:
+            stack.callback(fork.session.close)
+        executor = None
+        if workers > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        Pipeline(
+            partial(_transform_batch, transform),
+            route,
+            writes,
+            executor=executor,
+            concurrency=workers,
+        ).run(_iter_batches(collector, batch_size, write.checkpoints is not None))
+
+
+def _transform_name(transform: Any) -> str:
+    if isinstance(transform, _RecordTransform):
+        return _transform_name(transform.transform)
+    if isinstance(transform, _SampledTransform):
+        convert, validated = transform.convert, transform.transform
+        return f"fast({_transform_name(convert)}, {_transform_name(validated)})"
+    name = getattr(transform, "__qualname__", type(transform).__qualname__)
+    return f"{transform.__module__}.{name}"
+
+
+def _cache_key(
+    cache: adapters.SnapshotCache,
+    collector: adapters.Collector,
+    repo: adapters.AbstractRepository,
+    transform: BatchTransform,
+    writers: int,
+) -> str:
+    path = getattr(collector, "path", None)
+    if path is None or writers:
+        raise ValueError(
+            "Snapshots can only be cached for collectors reading a file, and without "
+            "writers, as they are read and written in order."
+        )
+    table = inspect(repo.model).local_table
+    # the snapshots of another transform (fast or validated, another converter) or
+    # another version of the model or of the package are not read back
+    columns = ", ".join(f"{c.name} {c.type}" for c in table.columns)
+    version = f"{__metadata__.__version__}/{_transform_name(transform)}/{columns}"
+    return cache.key(table.name, path, version)
+
+
+def _replay(
+    snapshot: adapters.Snapshot, start: int | None
+) -> Iterator[TransformedBatch]:
+    for count, rows, position, rejected in snapshot:
+        if start is None or (position is not None and position > start):
+            yield count, rows, position, rejected
+
+
+def _record(
+    cache: adapters.SnapshotCache, key: str, batches: Iterator[TransformedBatch]
+) -> Iterator[TransformedBatch]:
+    return cache.put(
+        key,
+        (
+            (count, [_to_row(r) for r in records], position, rejected)
+            for count, records, position, rejected in batches
+        ),
+    )
+
+
+def _load_options(
+    repo: adapters.AbstractRepository, listeners: Sequence[Listener]
+) -> list[str]:
+    # what the load writes besides the records, a load with other options must not
+    # resume from its checkpoints or be skipped after it
+    options = [
+        getattr(listener, "__qualname__", type(listener).__name__)
+        for listener in listeners
+    ]
+    if getattr(repo, "skip_unchanged", False):
+        options.append("skip_unchanged")
+    return options
+
+
+def _load(
+    collector: adapters.Collector,
+    repo: adapters.AbstractRepository,
+    transform: BatchTransform,
+    batch_size: int,
+    workers: int = 1,
+    listeners: Sequence[Listener] = (),
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
+    report = LoadReport()
+    if checkpoints:
+        checkpoints.scope(_load_options(repo, listeners))
+    start = checkpoints.start() if checkpoints else None
+    key = _cache_key(cache, collector, repo, transform, writers) if cache else ""
+    snapshot = cache.get(key) if cache else None
+    if snapshot and checkpoints and checkpoints.completed(snapshot.position):
+        # the same file was already loaded to the end the same way, nothing to write
+        report.skipped = True
+        return report
+    if start is not None:
+        collector = collector.resume(start)
+    if dead_letters:
+        transform = _IsolatedTransform(transform)
+    deduplicate = adapters.Deduplicator(_key(repo), digest_table)
+    first = checkpoints.records if checkpoints else 0
+    account = partial(_account, report, dead_letters, deduplicate, first)
+    write = _BatchWriter(repo, listeners, checkpoints)
+    if snapshot:
+        batches = _replay(snapshot, start)
+    else:
+        batches = _iter_transformed_batches(
+            collector, transform, batch_size, workers, bool(checkpoints or cache)
+        )
+        if cache and start is None:
+            batches = _record(cache, key, batches)
+    try:
+        if writers:
+            _run_pipeline(
+                collector, transform, batch_size, workers, write, writers, account
+            )
+        else:
+            for batch in batches:
+                write(account(batch))
+        repo.finalize()
+    except Exception:
+        repo.abort()
+        raise
+    return report
+
+
+def _transform_movie(record: dict[str, Any]) -> model.Movie:
+    return model.Movie(**record)
+
+
+def _transform_stream(record: dict[str, Any]) -> model.Stream:
+    return model.Stream(**record)
+
+
+def _transform_user(record: dict[str, Any]) -> model.User:
+    return model.User(**record)
+
+
+def _transform_author(record: dict[str, Any]) -> model.Author | None:
+    return model.build_author(raw.AuthorRaw(**record))
+
+
+def _transform_book(record: dict[str, Any]) -> model.Book:
+    return model.build_book(raw.BookRaw(**record))
+
+
+def _transform_review(record: dict[str, Any]) -> model.Review:
+    return model.build_review(raw.ReviewRaw(**record))
+
+
 def load_movies(
     collector: adapters.Collector,
     repo: adapters.AbstractRepository | None = None,
     session: Session | None = None,
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fast: bool = False,
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
     """Extract, transform, and load records into Movie model repository.
 
     Args:
         collector: how to extract the records.
         repo: where to load the records.
         session: session to be used in repository.
+        batch_size: how many records to process and commit at a time.
+        workers: how many processes parse and transform the records, when greater
+            than one, collectors that can be split (like csv files) are processed in
+            shards, in parallel.
+        fast: skip the models' validation for trusted records, converting them with
+            plain type coercion (a sample of the records is still validated).
+        checkpoints: if set, the position in the source after each batch is committed
+            with the batch, and the load can resume from the last one.
+        dead_letters: if set, the records that fail to transform are written to it
+            and skipped, instead of aborting the load, until its max error rate is
+            exceeded.
+        writers: if greater than zero, the batches are extracted, transformed and
+            written at the same time in an asyncio pipeline, by this many writers
+            with their own connections (more than one writer needs a sql repository
+            and no checkpoints).
+        digest_table: if set, records with the same content as the last record
+            written with their key by an earlier batch are dropped, records repeated
+            in a batch are always dropped (the last one is kept).
+        cache: if set, the transformed batches of the source file are read from its
+            snapshot instead of extracting and transforming the records again, or
+            stored to it, and an unchanged file already loaded to the end with
+            checkpoints, by a load with the same listeners and repository options, is
+            skipped (can't be used with writers).
+
+    Returns:
+        summary of the load.
 
     """
-    movies = [model.Movie(**record) for record in collector.collect()]
-    _build_repo(model.Movie, repo, session).add(records=movies)
+    return _load(
+        collector,
+        _build_repo(model.Movie, repo, session),
+        _select_transform(
+            _transform_movie, _RecordTransform(converters.MOVIE_CONVERTER), fast
+        ),
+        batch_size,
+        workers,
+        checkpoints=checkpoints,
+        dead_letters=dead_letters,
+        writers=writers,
+        digest_table=digest_table,
+        cache=cache,
+    )
 
 
 def load_streams(
     collector: adapters.Collector,
     repo: adapters.AbstractRepository | None = None,
     session: Session | None = None,
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fast: bool = False,
+    rollups: adapters.StreamRollups | None = None,
+    sketches: adapters.StreamSketches | None = None,
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
     """Extract, transform, and load records into Stream model repository.
 
     Args:
         collector: how to extract the records.
         repo: where to load the records.
         session: session to be used in repository.
+        batch_size: how many records to process and commit at a time.
+        workers: how many processes parse and transform the records, when greater
+            than one, collectors that can be split (like csv files) are processed in
+            shards, in parallel.
+        fast: skip the models' validation for trusted records, converting them with
+            plain type coercion (a sample of the records is still validated).
+        rollups: if set, the daily rollups are updated from each batch before it's
+            written, in the same session as the repository.
+        sketches: if set, the running sums and quantile sketches of the streams are
+            updated from each batch before it's written, in the same session as the
+            repository.
+        checkpoints: if set, the position in the source after each batch is committed
+            with the batch, and the load can resume from the last one.
+        dead_letters: if set, the records that fail to transform are written to it
+            and skipped, instead of aborting the load, until its max error rate is
+            exceeded.
+        writers: if greater than zero, the batches are extracted, transformed and
+            written at the same time in an asyncio pipeline, by this many writers
+            with their own connections (more than one writer needs a sql repository
+            and no checkpoints, rollups or sketches).
+        digest_table: if set, records with the same content as the last record
+            written with their key by an earlier batch are dropped, records repeated
+            in a batch are always dropped (the last one is kept).
+        cache: if set, the transformed batches of the source file are read from its
+            snapshot instead of extracting and transforming the records again, or
+            stored to it, and an unchanged file already loaded to the end with
+            checkpoints, by a load with the same listeners and repository options, is
+            skipped (can't be used with writers).
+
+    Returns:
+        summary of the load.
 
     """
-    streams = [model.Stream(**record) for record in collector.collect()]
-    _build_repo(model.Stream, repo, session).add(records=streams)
+    return _load(
+        collector,
+        _build_repo(model.Stream, repo, session),
+        _select_transform(_transform_stream, columnar.transform_streams, fast),
+        batch_size,
+        workers,
+        listeners=[
+            listener.apply for listener in (rollups, sketches) if listener is not None
+        ],
+        checkpoints=checkpoints,
+        dead_letters=dead_letters,
+        writers=writers,
+        digest_table=digest_table,
+        cache=cache,
+    )
 
 
 def load_users(
     collector: adapters.Collector,
     repo: adapters.AbstractRepository | None = None,
     session: Session | None = None,
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fast: bool = False,
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
     """Extract, transform, and load records into User model repository.
 
     Args:
         collector: how to extract the records.
         repo: where to load the records.
         session: session to be used in repository.
+        batch_size: how many records to process and commit at a time.
+        workers: how many processes parse and transform the records, when greater
+            than one, collectors that can be split (like csv files) are processed in
+            shards, in parallel.
+        fast: skip the models' validation for trusted records, converting them with
+            plain type coercion (a sample of the records is still validated).
+        checkpoints: if set, the position in the source after each batch is committed
+            with the batch, and the load can resume from the last one.
+        dead_letters: if set, the records that fail to transform are written to it
+            and skipped, instead of aborting the load, until its max error rate is
+            exceeded.
+        writers: if greater than zero, the batches are extracted, transformed and
+            written at the same time in an asyncio pipeline, by this many writers
+            with their own connections (more than one writer needs a sql repository
+            and no checkpoints).
+        digest_table: if set, records with the same content as the last record
+            written with their key by an earlier batch are dropped, records repeated
+            in a batch are always dropped (the last one is kept).
+        cache: if set, the transformed batches of the source file are read from its
+            snapshot instead of extracting and transforming the records again, or
+            stored to it, and an unchanged file already loaded to the end with
+            checkpoints, by a load with the same listeners and repository options, is
+            skipped (can't be used with writers).
+
+    Returns:
+        summary of the load.
 
     """
-    users = [model.User(**record) for record in collector.collect()]
-    _build_repo(model.User, repo, session).add(records=users)
+    return _load(
+        collector,
+        _build_repo(model.User, repo, session),
+        _select_transform(
+            _transform_user, _RecordTransform(converters.USER_CONVERTER), fast
+        ),
+        batch_size,
+        workers,
+        checkpoints=checkpoints,
+        dead_letters=dead_letters,
+        writers=writers,
+        digest_table=digest_table,
+        cache=cache,
+    )
 
 
 def load_authors(
     collector: adapters.Collector,
     repo: adapters.AbstractRepository | None = None,
     session: Session | None = None,
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fast: bool = False,
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
     """Extract, transform, and load records into Author model repository.
 
     This service filters out malformed records, like the ones with null values in name.
@@ -83,48 +720,171 @@ def load_authors(
         collector: how to extract the records.
         repo: where to load the records.
         session: session to be used in repository.
+        batch_size: how many records to process and commit at a time.
+        workers: how many processes parse and transform the records, when greater
+            than one, collectors that can be split (like csv files) are processed in
+            shards, in parallel.
+        fast: skip the models' validation for trusted records, converting them with
+            plain type coercion (a sample of the records is still validated).
+        checkpoints: if set, the position in the source after each batch is committed
+            with the batch, and the load can resume from the last one.
+        dead_letters: if set, the records that fail to transform are written to it
+            and skipped, instead of aborting the load, until its max error rate is
+            exceeded.
+        writers: if greater than zero, the batches are extracted, transformed and
+            written at the same time in an asyncio pipeline, by this many writers
+            with their own connections (more than one writer needs a sql repository
+            and no checkpoints).
+        digest_table: if set, records with the same content as the last record
+            written with their key by an earlier batch are dropped, records repeated
+            in a batch are always dropped (the last one is kept).
+        cache: if set, the transformed batches of the source file are read from its
+            snapshot instead of extracting and transforming the records again, or
+            stored to it, and an unchanged file already loaded to the end with
+            checkpoints, by a load with the same listeners and repository options, is
+            skipped (can't be used with writers).
+
+    Returns:
+        summary of the load.
 
     """
-    authors_raw = [raw.AuthorRaw(**record) for record in collector.collect()]
-    authors = [
-        author
-        for author in [model.build_author(author_raw) for author_raw in authors_raw]
-        if author
-    ]
-    _build_repo(model.Author, repo, session).add(records=authors)
+    return _load(
+        collector,
+        _build_repo(model.Author, repo, session),
+        _select_transform(
+            _transform_author, _RecordTransform(converters.build_author_row), fast
+        ),
+        batch_size,
+        workers,
+        checkpoints=checkpoints,
+        dead_letters=dead_letters,
+        writers=writers,
+        digest_table=digest_table,
+        cache=cache,
+    )
 
 
 def load_books(
     collector: adapters.Collector,
     repo: adapters.AbstractRepository | None = None,
     session: Session | None = None,
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fast: bool = False,
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
     """Extract, transform, and load records into Book model repository.
 
     Args:
         collector: how to extract the records.
         repo: where to load the records.
         session: session to be used in repository.
+        batch_size: how many records to process and commit at a time.
+        workers: how many processes parse and transform the records, when greater
+            than one, collectors that can be split (like csv files) are processed in
+            shards, in parallel.
+        fast: skip the models' validation for trusted records, converting them with
+            plain type coercion (a sample of the records is still validated).
+        checkpoints: if set, the position in the source after each batch is committed
+            with the batch, and the load can resume from the last one.
+        dead_letters: if set, the records that fail to transform are written to it
+            and skipped, instead of aborting the load, until its max error rate is
+            exceeded.
+        writers: if greater than zero, the batches are extracted, transformed and
+            written at the same time in an asyncio pipeline, by this many writers
+            with their own connections (more than one writer needs a sql repository
+            and no checkpoints).
+        digest_table: if set, records with the same content as the last record
+            written with their key by an earlier batch are dropped, records repeated
+            in a batch are always dropped (the last one is kept).
+        cache: if set, the transformed batches of the source file are read from its
+            snapshot instead of extracting and transforming the records again, or
+            stored to it, and an unchanged file already loaded to the end with
+            checkpoints, by a load with the same listeners and repository options, is
+            skipped (can't be used with writers).
+
+    Returns:
+        summary of the load.
 
     """
-    books_raw = [raw.BookRaw(**record) for record in collector.collect()]
-    books = [model.build_book(book_raw) for book_raw in books_raw]
-    _build_repo(model.Book, repo, session).add(records=books)
+    return _load(
+        collector,
+        _build_repo(model.Book, repo, session),
+        _select_transform(
+            _transform_book, _RecordTransform(converters.build_book_row), fast
+        ),
+        batch_size,
+        workers,
+        checkpoints=checkpoints,
+        dead_letters=dead_letters,
+        writers=writers,
+        digest_table=digest_table,
+        cache=cache,
+    )
 
 
 def load_reviews(
     collector: adapters.Collector,
     repo: adapters.AbstractRepository | None = None,
     session: Session | None = None,
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fast: bool = False,
+    checkpoints: adapters.LoadCheckpoints | None = None,
+    dead_letters: adapters.DeadLetters | None = None,
+    writers: int = 0,
+    digest_table: adapters.DigestTable | None = None,
+    cache: adapters.SnapshotCache | None = None,
+) -> LoadReport:
     """Extract, transform, and load records into Review model repository.
 
     Args:
         collector: how to extract the records.
         repo: where to load the records.
         session: session to be used in repository.
+        batch_size: how many records to process and commit at a time.
+        workers: how many processes parse and transform the records, when greater
+            than one, collectors that can be split (like csv files) are processed in
+            shards, in parallel.
+        fast: skip the models' validation for trusted records, converting them with
+            plain type coercion (a sample of the records is still validated).
+        checkpoints: if set, the position in the source after each batch is committed
+            with the batch, and the load can resume from the last one.
+        dead_letters: if set, the records that fail to transform are written to it
+            and skipped, instead of aborting the load, until its max error rate is
+            exceeded.
+        writers: if greater than zero, the batches are extracted, transformed and
+            written at the same time in an asyncio pipeline, by this many writers
+            with their own connections (more than one writer needs a sql repository
+            and no checkpoints).
+        digest_table: if set, records with the same content as the last record
+            written with their key by an earlier batch are dropped, records repeated
+            in a batch are always dropped (the last one is kept).
+        cache: if set, the transformed batches of the source file are read from its
+            snapshot instead of extracting and transforming the records again, or
+            stored to it, and an unchanged file already loaded to the end with
+            checkpoints, by a load with the same listeners and repository options, is
+            skipped (can't be used with writers).
+
+    Returns:
+        summary of the load.
 
     """
-    reviews_raw = [raw.ReviewRaw(**record) for record in collector.collect()]
-    reviews = [model.build_review(review_raw) for review_raw in reviews_raw]
-    _build_repo(model.Review, repo, session).add(records=reviews)
+    return _load(
+        collector,
+        _build_repo(model.Review, repo, session),
+        _select_transform(
+            _transform_review, _RecordTransform(converters.build_review_row), fast
+        ),
+        batch_size,
+        workers,
+        checkpoints=checkpoints,
+        dead_letters=dead_letters,
+        writers=writers,
+        digest_table=digest_table,
+        cache=cache,
+    )
@@ -1,3 +1,8 @@
+import json
+import os
+
+import pytest
+from sqlalchemy import text
 from sqlmodel import Session, create_engine
 from typer.testing import CliRunner
 
@@ -37,6 +42,9 @@ def test_app():
             "csv",
             "--config",
             "data/internal/streams.csv",
+            "--fast",
+            "--rollups",
+            "--sketches",
         ],
     )
     assert result.exit_code == 0
@@ -93,10 +101,14 @@ def test_app():
             "json",
             "--config",
             "data/vendor/reviews.json",
+            "--skip-unchanged",
         ],
     )
     assert result.exit_code == 0
 
+    result = runner.invoke(cli.app, ["refresh-completions"])
+    assert result.exit_code == 0
+
     with Session(create_engine(cli._build_connection_string())) as session:
         counts = [
             session.query(model.Movie).count(),
@@ -105,7 +117,592 @@ def test_app():
             session.query(model.Author).count(),
             session.query(model.Book).count(),
             session.query(model.Review).count(),
+            session.query(model.WatchCompletion).count(),
         ]
 
     # assert
     assert min(counts) >= 1
+
+
+@pytest.mark.skipif(
+    not cli._build_connection_string().startswith("postgresql"),
+    reason="copy repository requires PostgreSQL",
+)
+def test_load_with_copy_repository():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "review",
+            "--collector",
+            "json",
+            "--config",
+            "data/vendor/reviews.json",
+            "--repository",
+            "copy",
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+    with Session(create_engine(cli._build_connection_string())) as session:
+        assert session.query(model.Review).count() >= 1
+
+
+def test_refresh_rollups():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    runner.invoke(
+        cli.app,
+        ["load", "--model", "stream", "--config", "data/internal/streams.csv"],
+    )
+
+    # act
+    result = runner.invoke(cli.app, ["refresh-rollups"])
+
+    # assert
+    assert result.exit_code == 0
+    with Session(create_engine(cli._build_connection_string())) as session:
+        streams = session.query(model.Stream).count()
+        rollups = session.query(model.DailyMovieStreams).all()
+    assert sum(r.streams for r in rollups) == streams
+
+
+def test_refresh_sketches():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    runner.invoke(
+        cli.app,
+        ["load", "--model", "stream", "--config", "data/internal/streams.csv"],
+    )
+
+    # act
+    result = runner.invoke(cli.app, ["refresh-sketches"])
+
+    # assert
+    assert result.exit_code == 0
+    with Session(create_engine(cli._build_connection_string())) as session:
+        streams = session.query(model.Stream).count()
+        size = session.get(model.StreamStatistics, "size_mb")
+    assert size.count == streams
+
+
+def test_load_all(tmp_path):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    manifest = tmp_path / "manifest.json"
+    entries = json.loads(open("data/manifest.json").read())
+    entries[1]["depends_on"] = ["movie", "user"]
+    manifest.write_text(json.dumps(entries))
+
+    # act
+    result = runner.invoke(
+        cli.app, ["load-all", "--manifest", str(manifest), "--workers", "3"]
+    )
+
+    # assert
+    assert result.exit_code == 0
+    assert "data/internal/streams.csv" in result.output
+    assert "total wall time" in result.output
+
+
+def test_load_all_failed_entry(tmp_path):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    manifest = tmp_path / "manifest.json"
+    movies = tmp_path / "movies.csv"
+    movies.write_text("title,duration_mins,original_language,size_mb\nx,long,en,1\n")
+    entries = json.loads(open("data/manifest.json").read())[:3]
+    entries[0]["config"] = str(movies)
+    entries[1]["depends_on"] = ["movie"]
+    manifest.write_text(json.dumps(entries))
+
+    # act
+    result = runner.invoke(
+        cli.app, ["load-all", "--manifest", str(manifest), "--workers", "2"]
+    )
+
+    # assert
+    assert result.exit_code == 1
+    assert f"{movies} failed: " in result.output
+    assert "skipped, a load it depends on failed" in result.output
+    with Session(create_engine(cli._build_connection_string())) as session:
+        assert session.query(model.User).count() >= 1
+
+
+def test_ingest(tmp_path):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    movies = open("data/internal/movies.csv").read()
+    (landing / "movies-2021-12-01.csv").write_text(movies)
+    (landing / "movies-2021-12-02.csv").write_text(movies)
+    (landing / "users-2021-12-01.csv").write_text(
+        open("data/internal/users.csv").read()
+    )
+    (landing / "readme.txt").write_text("not a dump")
+    rules = tmp_path / "rules.json"
+    rules.write_text(
+        json.dumps(
+            [
+                {"pattern": "movies-*.csv", "model": "movie", "collector": "csv"},
+                {"pattern": "users-*.csv", "model": "user", "collector": "csv"},
+            ]
+        )
+    )
+    args = ["ingest", "--directory", str(landing), "--rules", str(rules)]
+
+    # act
+    first = runner.invoke(cli.app, [*args, "--workers", "2"])
+    unchanged = runner.invoke(cli.app, args)
+    os.utime(landing / "movies-2021-12-02.csv", (0, 0))
+    changed = runner.invoke(cli.app, args)
+
+    # assert
+    assert first.exit_code == 0
+    assert "movies-2021-12-01.csv" in first.output
+    assert "users-2021-12-01.csv" in first.output
+    assert "readme.txt" not in first.output
+    assert unchanged.output.strip() == "no new or changed files"
+    assert changed.exit_code == 0
+    assert "movies-2021-12-02.csv" in changed.output
+    assert "movies-2021-12-01.csv" not in changed.output
+    assert sorted(json.loads((landing / ".ingested.json").read_text())) == [
+        str(landing / name)
+        for name in [
+            "movies-2021-12-01.csv",
+            "movies-2021-12-02.csv",
+            "users-2021-12-01.csv",
+        ]
+    ]
+
+
+def test_ingest_failed_file(tmp_path):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    (landing / "movies-2021-12-01.csv").write_text(
+        "title,duration_mins,original_language,size_mb\nx,long,en,1\n"
+    )
+    (landing / "movies-2021-12-02.csv").write_text(
+        open("data/internal/movies.csv").read()
+    )
+    rules = tmp_path / "rules.json"
+    rules.write_text(
+        json.dumps([{"pattern": "movies-*.csv", "model": "movie", "collector": "csv"}])
+    )
+    args = ["ingest", "--directory", str(landing), "--rules", str(rules)]
+
+    # act
+    first = runner.invoke(cli.app, args)
+    again = runner.invoke(cli.app, args)
+
+    # assert
+    assert first.exit_code == 1
+    assert "movies-2021-12-01.csv failed: " in first.output
+    assert again.exit_code == 1
+    assert "movies-2021-12-02.csv" not in again.output
+    assert sorted(json.loads((landing / ".ingested.json").read_text())) == [
+        str(landing / "movies-2021-12-02.csv")
+    ]
+
+
+def test_ingest_invalid_rules(tmp_path):
+    # arrange
+    runner = CliRunner()
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps([{"pattern": "*.csv", "model": "unknown"}]))
+
+    # act
+    result = runner.invoke(
+        cli.app, ["ingest", "--directory", str(tmp_path), "--rules", str(rules)]
+    )
+
+    # assert
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["movies-based-on-books"],
+        ["users-streaming", "--movie-title", "Unforgiven"],
+        ["overlap", "--movie-title", "Unforgiven"],
+        ["movies-by-nationality", "--start", "2021-12-01T00:00:00"],
+        ["average-duration"],
+        ["average-duration", "--approximate"],
+        ["median-size"],
+        ["median-size", "--approximate"],
+        ["users-watching", "--ratio", "0.5"],
+        ["users-completing", "--ratio", "0.5"],
+        ["daily-movies", "--start", "2021-12-25T00:00:00"],
+        ["daily-users", "--end", "2021-12-02T00:00:00"],
+    ],
+)
+def test_query(args):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+
+    # act
+    result = runner.invoke(cli.app, ["query", *args])
+
+    # assert
+    assert result.exit_code == 0
+    assert result.output.strip()
+
+
+@pytest.mark.parametrize("option", ["--rollups", "--sketches"])
+def test_load_rollups_for_other_models(option):
+    # arrange
+    runner = CliRunner()
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "movie",
+            "--config",
+            "data/internal/movies.csv",
+            option,
+        ],
+    )
+
+    # assert
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize("repository, exit_code", [("sql", 0), ("history", 2)])
+def test_load_resume(repository, exit_code):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    args = [
+        "load",
+        "--model",
+        "movie",
+        "--config",
+        "data/internal/movies.csv",
+        "--repository",
+        repository,
+    ]
+    runner.invoke(cli.app, args)
+
+    # act
+    result = runner.invoke(cli.app, [*args, "--resume"])
+
+    # assert
+    assert result.exit_code == exit_code
+
+
+def test_load_with_mmap_collector():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "stream",
+            "--collector",
+            "mmap",
+            "--config",
+            "data/internal/streams.csv",
+            "--workers",
+            "2",
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+
+
+def test_load_with_writers():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    writers = "2" if cli._build_engine().dialect.name == "postgresql" else "1"
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "stream",
+            "--config",
+            "data/internal/streams.csv",
+            "--fast",
+            "--writers",
+            writers,
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+
+
+def test_load_with_interactive_profile():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "movie",
+            "--config",
+            "data/internal/movies.csv",
+            "--profile",
+            "interactive",
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+
+
+def test_load_bulk_rebuild():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "stream",
+            "--config",
+            "data/internal/streams.csv",
+            "--fast",
+            "--bulk-rebuild",
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+
+
+@pytest.mark.skipif(
+    not cli._build_connection_string().startswith("postgresql"),
+    reason="index renames require PostgreSQL",
+)
+def test_load_bulk_rebuild_indexes():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    engine = create_engine(cli._build_connection_string())
+    query = text(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = 'review'"
+    )
+    with engine.connect() as connection:
+        expected = connection.execute(query).all()
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "review",
+            "--collector",
+            "json",
+            "--config",
+            "data/vendor/reviews.json",
+            "--bulk-rebuild",
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+    with engine.connect() as connection:
+        assert sorted(connection.execute(query).all()) == sorted(expected)
+
+
+def test_load_bulk_rebuild_with_rollups():
+    # arrange
+    runner = CliRunner()
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "stream",
+            "--config",
+            "data/internal/streams.csv",
+            "--rollups",
+            "--bulk-rebuild",
+        ],
+    )
+
+    # assert
+    assert result.exit_code != 0
+
+
+def test_load_with_digest_table():
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "review",
+            "--collector",
+            "json",
+            "--config",
+            "data/vendor/reviews.json",
+            "--dedup-capacity",
+            "1000",
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+
+
+def test_load_with_snapshot_cache(tmp_path):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    args = [
+        "load",
+        "--model",
+        "movie",
+        "--config",
+        "data/internal/movies.csv",
+        "--cache-dir",
+        str(tmp_path),
+    ]
+    runner.invoke(cli.app, args)
+
+    # act
+    result = runner.invoke(cli.app, args)
+
+    # assert
+    assert result.exit_code == 0
+    assert "skipped" in result.stdout
+    assert len(list(tmp_path.glob("movie-*.snapshot"))) == 1
+
+
+def test_load_snapshot_cache_with_writers(tmp_path):
+    # arrange
+    runner = CliRunner()
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "movie",
+            "--config",
+            "data/internal/movies.csv",
+            "--cache-dir",
+            str(tmp_path),
+            "--writers",
+            "1",
+        ],
+    )
+
+    # assert
+    assert result.exit_code != 0
+
+
+def test_load_resume_with_writers():
+    # arrange
+    runner = CliRunner()
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "movie",
+            "--config",
+            "data/internal/movies.csv",
+            "--resume",
+            "--writers",
+            "2",
+        ],
+    )
+
+    # assert
+    assert result.exit_code != 0
+
+
+def test_load_dead_letters(tmp_path):
+    # arrange
+    runner = CliRunner()
+    runner.invoke(cli.app, ["init-db"])
+    authors = json.loads(open("data/vendor/authors.json").read())
+    authors[0]["nationalities"] = []
+    config = tmp_path / "authors.json"
+    config.write_text(json.dumps(authors))
+    dead_letters = tmp_path / "rejected.jsonl"
+
+    # act
+    result = runner.invoke(
+        cli.app,
+        [
+            "load",
+            "--model",
+            "author",
+            "--collector",
+            "json",
+            "--config",
+            str(config),
+            "--dead-letters",
+            str(dead_letters),
+        ],
+    )
+
+    # assert
+    assert result.exit_code == 0
+    assert json.loads(dead_letters.read_text())["index"] == 0
+
+
+def test_load_all_circular_dependencies(tmp_path):
+    # arrange
+    runner = CliRunner()
+    manifest = tmp_path / "manifest.json"
+    entries = json.loads(open("data/manifest.json").read())
+    entries[0]["depends_on"] = ["stream"]
+    entries[1]["depends_on"] = ["movie"]
+    manifest.write_text(json.dumps(entries))
+
+    # act
+    result = runner.invoke(cli.app, ["load-all", "--manifest", str(manifest)])
+
+    # assert
+    assert result.exit_code != 0
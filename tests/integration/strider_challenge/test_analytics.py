@@ -0,0 +1,246 @@
+import pathlib
+from bisect import bisect_left
+from datetime import date, datetime
+from functools import partial
+
+import pytest
+from sqlalchemy import BigInteger, cast, func
+from sqlmodel import Session
+
+from strider_challenge import adapters, analytics, service_layer
+from strider_challenge.domain import model
+
+DATA_FOLDER = (
+    f"{str(pathlib.Path(__file__).parent.parent.parent.parent.resolve())}/data"
+)
+
+
+@pytest.fixture
+def loaded_session(session: Session) -> Session:
+    service_layer.load_movies(
+        adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/movies.csv"),
+        session=session,
+    )
+    service_layer.load_streams(
+        adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv"),
+        session=session,
+        fast=True,
+        rollups=adapters.StreamRollups(session),
+        sketches=adapters.StreamSketches(session),
+    )
+    service_layer.load_authors(
+        adapters.JsonCollector(path=f"{DATA_FOLDER}/vendor/authors.json"),
+        session=session,
+    )
+    service_layer.load_books(
+        adapters.JsonCollector(path=f"{DATA_FOLDER}/vendor/books.json"),
+        session=session,
+    )
+    service_layer.load_reviews(
+        adapters.JsonCollector(path=f"{DATA_FOLDER}/vendor/reviews.json"),
+        session=session,
+    )
+    return session
+
+
+def test_share_of_streamed_movies_based_on_books(loaded_session):
+    # act
+    output = analytics.share_of_streamed_movies_based_on_books(loaded_session)
+
+    # assert
+    assert round(output, 2) == 0.93
+
+
+def test_count_users_streaming(loaded_session):
+    # act
+    output = analytics.count_users_streaming(
+        loaded_session,
+        movie_title="Unforgiven",
+        start=datetime(2021, 12, 25, 7),
+        end=datetime(2021, 12, 25, 12),
+    )
+
+    # assert
+    assert output == 4
+
+
+def _sqlite_epoch_millis(column):
+    return cast(func.round((func.julianday(column) - 2440587.5) * 86400000), BigInteger)
+
+
+@pytest.mark.parametrize(
+    "epoch_millis_dialects",
+    [analytics.EPOCH_MILLIS_DIALECTS, {"sqlite": _sqlite_epoch_millis}],
+)
+def test_build_stream_interval_index(
+    epoch_millis_dialects, loaded_session, monkeypatch
+):
+    # arrange
+    monkeypatch.setattr(analytics, "EPOCH_MILLIS_DIALECTS", epoch_millis_dialects)
+    windows = [
+        ("Unforgiven", datetime(2021, 12, 25, 7), datetime(2021, 12, 25, 12)),
+        ("Unforgiven", datetime(2021, 12, 1), datetime(2021, 12, 31)),
+        ("Rush", datetime(2021, 12, 10), datetime(2021, 12, 10, 1)),
+    ]
+
+    # act
+    index = analytics.build_stream_interval_index(loaded_session)
+
+    # assert
+    assert index.count(*windows[0]) == 4
+    for window in windows:
+        assert index.count(*window) == analytics.count_users_streaming(
+            loaded_session, *window
+        )
+
+
+def test_build_stream_interval_index_of_movie(loaded_session):
+    # arrange
+    window = ("Unforgiven", datetime(2021, 12, 25, 7), datetime(2021, 12, 25, 12))
+
+    # act
+    index = analytics.build_stream_interval_index(loaded_session, "Unforgiven")
+
+    # assert
+    assert index.count(*window) == 4
+    assert index.count("Rush", datetime(2021, 12, 1), datetime(2021, 12, 31)) == 0
+
+
+def test_count_streamed_movies_based_on_books_by_nationality(loaded_session):
+    # act
+    output = analytics.count_streamed_movies_based_on_books_by_nationality(
+        loaded_session,
+        nationality="singaporeans",
+        start=datetime(2021, 12, 1),
+        end=datetime(2021, 12, 31, 23, 59, 59),
+    )
+
+    # assert
+    assert output == 3
+
+
+def test_average_stream_duration(loaded_session):
+    # act
+    output = analytics.average_stream_duration(loaded_session)
+
+    # assert
+    assert round(output) == 43336
+
+
+def test_median_stream_size(loaded_session):
+    # arrange
+    sizes = sorted(s.size_mb for s in loaded_session.query(model.Stream))
+
+    # act
+    output = analytics.median_stream_size(loaded_session)
+
+    # assert
+    assert output == (sizes[len(sizes) // 2 - 1] + sizes[len(sizes) // 2]) / 2
+    assert round(output / 1000, 2) == 0.94
+
+
+def test_running_stream_average(loaded_session):
+    # act
+    output = analytics.running_stream_average(loaded_session, "duration_seconds")
+
+    # assert
+    assert output == pytest.approx(analytics.average_stream_duration(loaded_session))
+
+
+def test_approximate_stream_quantile(loaded_session):
+    # arrange
+    sizes = sorted(s.size_mb for s in loaded_session.query(model.Stream))
+
+    # act
+    output = analytics.approximate_stream_quantile(loaded_session, "size_mb", 0.5)
+
+    # assert
+    assert abs(bisect_left(sizes, output) / len(sizes) - 0.5) < 0.02
+
+
+def test_count_users_watching_at_least(loaded_session):
+    # act
+    output = analytics.count_users_watching_at_least(
+        loaded_session,
+        ratio=0.5,
+        start=datetime(2021, 12, 24),
+        end=datetime(2021, 12, 31, 23, 59, 59),
+    )
+
+    # assert
+    assert output == 747
+
+
+def test_count_users_completing(loaded_session):
+    # arrange
+    start, end = date(2021, 12, 24), date(2021, 12, 31)
+    adapters.WatchCompletions(loaded_session).refresh(start, end)
+    durations = {
+        m.title: m.duration_mins * 60 for m in loaded_session.query(model.Movie)
+    }
+    expected = {
+        s.user_email
+        for s in loaded_session.query(model.Stream)
+        if start <= s.start_at.date() <= end
+        and s.movie_title in durations
+        and s.duration_seconds >= durations[s.movie_title] * 0.5
+    }
+
+    # act
+    output = analytics.count_users_completing(loaded_session, 0.5, start, end)
+
+    # assert
+    assert output == len(expected)
+
+
+def test_daily_movie_streams(loaded_session):
+    # arrange
+    streams = loaded_session.query(model.Stream).all()
+
+    # act
+    output = analytics.daily_movie_streams(
+        loaded_session, start=date(2021, 1, 1), end=date(2022, 12, 31)
+    )
+
+    # assert
+    assert sum(row["streams"] for row in output) == len(streams)
+    assert round(sum(row["size_gb"] for row in output), 3) == round(
+        sum(s.size_mb for s in streams) / 1000, 3
+    )
+    assert set(output[0]) == {
+        "day",
+        "movie_title",
+        "streams",
+        "size_gb",
+        "average_duration_seconds",
+    }
+
+
+def test_daily_user_streams(loaded_session):
+    # arrange
+    day = date(2021, 12, 25)
+    streams = [
+        s for s in loaded_session.query(model.Stream) if s.start_at.date() == day
+    ]
+
+    # act
+    output = analytics.daily_user_streams(loaded_session, start=day, end=day)
+
+    # assert
+    assert sum(row["streams"] for row in output) == len(streams)
+    assert {row["user_email"] for row in output} == {s.user_email for s in streams}
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        analytics.share_of_streamed_movies_based_on_books,
+        analytics.average_stream_duration,
+        analytics.median_stream_size,
+        partial(analytics.running_stream_average, measure="size_mb"),
+        partial(analytics.approximate_stream_quantile, measure="size_mb", quantile=0.5),
+    ],
+)
+def test_queries_without_records(query, session):
+    # act and assert
+    assert query(session) == 0.0
@@ -1,9 +1,15 @@
+import gzip
+import json
 import pathlib
+from unittest.mock import MagicMock
 
 import pytest
+import sqlalchemy
+from sqlmodel import Session, SQLModel, create_engine
 
 from strider_challenge import adapters, service_layer
-from strider_challenge.adapters import SqlRepository
+from strider_challenge.adapters import CsvCollector, SqlRepository, repository
+from strider_challenge.adapters.checkpoint import LoadCheckpoint
 from strider_challenge.domain import model
 
 DATA_FOLDER = (
@@ -63,6 +69,567 @@ def test_load(model_cls, service, collector, reference, session):
     assert isinstance(repo.get(reference=reference), model_cls)
 
 
+def test_load_streams_in_batches(session):
+    # arrange
+    repo = adapters.SqlRepository(model=model.Stream, session=session)
+    collector = adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv")
+
+    # act
+    report = service_layer.load_streams(collector=collector, repo=repo, batch_size=1000)
+
+    # assert
+    assert report.records == len(collector.collect())
+    assert session.query(model.Stream).count() == report.records
+
+
+def test_load_streams_bulk_rebuild(session):
+    # arrange
+    collector = adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv")
+    service_layer.load_streams(collector=collector, session=session)
+    stale = model.Stream(
+        movie_title="Unforgiven",
+        user_email="stale@example.com",
+        size_mb=1,
+        start_at="2021-12-25T07:00:00",
+        end_at="2021-12-25T08:00:00",
+    )
+    adapters.SqlRepository(model=model.Stream, session=session).add([stale])
+    repo = adapters.RebuildRepository(model=model.Stream, session=session)
+
+    # act
+    report = service_layer.load_streams(collector=collector, repo=repo, batch_size=1000)
+
+    # assert
+    assert session.query(model.Stream).count() == report.records
+    assert repo.get(reference=stale.id) is None
+
+
+def test_load_streams_after_migrate(in_memory_db):
+    # arrange
+    path = f"{DATA_FOLDER}/internal/streams.csv"
+    streams = [
+        service_layer._transform_stream(r) for r in CsvCollector(path=path).collect()
+    ]
+    # the stream table as created before its typed size and its duration
+    legacy = sqlalchemy.Table(
+        "stream",
+        sqlalchemy.MetaData(),
+        *[sqlalchemy.Column(c, sqlalchemy.String) for c in ["id", "movie_title"]],
+        *[sqlalchemy.Column(c, sqlalchemy.String) for c in ["user_email", "size_mb"]],
+        *[sqlalchemy.Column(c, sqlalchemy.DateTime) for c in ["start_at", "end_at"]],
+    )
+    with in_memory_db.begin() as connection:
+        legacy.create(bind=connection)
+        connection.execute(
+            legacy.insert(),
+            [s.dict(exclude={"duration_seconds"}) for s in streams],
+        )
+    SQLModel.metadata.create_all(in_memory_db)
+    adapters.migrate(in_memory_db, [model.Stream])
+
+    # act
+    with Session(in_memory_db) as session:
+        service_layer.load_streams(collector=CsvCollector(path=path), session=session)
+        count = session.query(model.Stream).count()
+        stream = session.get(model.Stream, streams[0].id)
+
+    # assert
+    assert count == len({s.id for s in streams})
+    assert stream is not None
+    assert stream.duration_seconds == streams[0].duration_seconds
+
+
+def test_load_streams_duplicates(session, tmp_path):
+    # arrange
+    lines = open(f"{DATA_FOLDER}/internal/streams.csv").read().splitlines()
+    path = tmp_path / "streams.csv"
+    path.write_text("\n".join([lines[0], *lines[1:101], *lines[1:101]]) + "\n")
+    digest_table = adapters.DigestTable(capacity=1000)
+
+    # act
+    in_batch = service_layer.load_streams(
+        collector=adapters.CsvCollector(path=str(path)), session=session
+    )
+    across_batches = service_layer.load_streams(
+        collector=adapters.CsvCollector(path=str(path)),
+        session=session,
+        batch_size=50,
+        digest_table=digest_table,
+    )
+
+    # assert
+    assert (in_batch.records, in_batch.duplicates) == (200, 100)
+    assert (across_batches.records, across_batches.duplicates) == (200, 100)
+    assert session.query(model.Stream).count() == 100
+
+
+def test__key():
+    # arrange
+    repo = MagicMock(spec=adapters.AbstractRepository, model=model.Review)
+
+    # act
+    output = service_layer._key(repo)
+
+    # assert
+    assert output == "id"
+
+
+def test_load_reviews_skip_unchanged(session, monkeypatch):
+    # arrange
+    repo = adapters.SqlRepository(
+        model=model.Review, session=session, skip_unchanged=True
+    )
+    collector = adapters.JsonCollector(path=f"{DATA_FOLDER}/vendor/reviews.json")
+    service_layer.load_reviews(collector=collector, repo=repo)
+    written: list = []
+    monkeypatch.setattr(repo, "_write", written.extend)
+
+    # act
+    service_layer.load_reviews(collector=collector, repo=repo)
+
+    # assert
+    assert session.query(model.Review).count() >= 1
+    assert written == []
+
+
+def test_load_streams_with_rollups_twice(session):
+    # arrange
+    collector = adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv")
+    rollups = adapters.StreamRollups(session)
+    service_layer.load_streams(collector=collector, session=session, rollups=rollups)
+
+    # act
+    service_layer.load_streams(collector=collector, session=session, rollups=rollups)
+
+    # assert
+    movies = session.query(model.DailyMovieStreams).all()
+    assert sum(m.streams for m in movies) == session.query(model.Stream).count()
+
+
+def test_load_streams_in_parallel_shards(session, monkeypatch):
+    # arrange
+    monkeypatch.setattr(service_layer, "DEFAULT_SHARD_SIZE", 64 * 1024)
+    repo = adapters.SqlRepository(model=model.Stream, session=session)
+    collector = adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv")
+
+    # act
+    report = service_layer.load_streams(
+        collector=collector, repo=repo, batch_size=100, workers=2
+    )
+
+    # assert
+    assert report.records == len(collector.collect())
+    assert session.query(model.Stream).count() == report.records
+    assert isinstance(
+        repo.get(reference="642af1ae6acfd3bded70b61d6389219102424c77"), model.Stream
+    )
+
+
+def test_load_compressed_streams(session, tmp_path):
+    # arrange
+    plain = adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv")
+    path = tmp_path / "streams.csv.gz"
+    path.write_bytes(gzip.compress(open(plain.path, "rb").read()))
+    collector = adapters.CsvCollector(path=str(path))
+
+    # act
+    report = service_layer.load_streams(
+        collector=collector,
+        session=session,
+        workers=2,
+        checkpoints=adapters.LoadCheckpoints(session, model.Stream, str(path)),
+    )
+
+    # assert
+    assert report.records == len(plain.collect())
+    assert session.query(model.Stream).count() == report.records
+
+
+@pytest.fixture
+def file_session(tmp_path):
+    # the pipeline writes from other threads, where in-memory databases are empty
+    engine = create_engine(f"sqlite:///{tmp_path}/database.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.mark.parametrize("writers, workers", [(1, 1), (3, 1), (2, 2)])
+def test_load_pipelined(writers, workers, file_session, monkeypatch):
+    # arrange
+    monkeypatch.setattr(repository, "CONCURRENT_WRITE_DIALECTS", {"sqlite"})
+    collector = adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv")
+
+    # act
+    report = service_layer.load_streams(
+        collector=collector,
+        session=file_session,
+        batch_size=1000,
+        workers=workers,
+        fast=True,
+        writers=writers,
+    )
+
+    # assert
+    assert report.records == len(collector.collect())
+    assert file_session.query(model.Stream).count() == report.records
+
+
+def test_load_pipelined_in_order(file_session):
+    # arrange
+    path = f"{DATA_FOLDER}/internal/streams.csv"
+    checkpoints = adapters.LoadCheckpoints(file_session, model.Stream, path)
+
+    # act
+    report = service_layer.load_streams(
+        collector=adapters.CsvCollector(path=path),
+        session=file_session,
+        batch_size=1000,
+        rollups=adapters.StreamRollups(file_session),
+        checkpoints=checkpoints,
+        writers=1,
+    )
+
+    # assert
+    movies = file_session.query(model.DailyMovieStreams).all()
+    assert sum(m.streams for m in movies) == report.records
+    assert file_session.get(LoadCheckpoint, checkpoints.key).records == report.records
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_load_pipelined_error(ordered, file_session):
+    # arrange
+    path = f"{DATA_FOLDER}/internal/movies.csv"
+    checkpoints = adapters.LoadCheckpoints(file_session, model.Movie, path)
+
+    # act and assert
+    with pytest.raises(ValueError, match="written concurrently|in order"):
+        service_layer.load_movies(
+            collector=adapters.CsvCollector(path=path),
+            session=file_session,
+            checkpoints=checkpoints if ordered else None,
+            writers=2,
+        )
+
+
+def test__partition():
+    # arrange
+    records = [{"title": str(i)} for i in range(10)]
+
+    # act
+    output = service_layer._partition((10, records, 5, []), "title", 3)
+
+    # assert
+    parts = [part for part in output if part is not None]
+    assert sorted(r["title"] for _, p, _, _ in parts for r in p) == sorted(
+        r["title"] for r in records
+    )
+    assert all(position is None for _, _, position, _ in parts)
+
+
+class FailingRepository(SqlRepository):
+    def __init__(self, fail_at: int, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_at = fail_at
+
+    def _add(self, records):
+        self.fail_at -= 1
+        if not self.fail_at:
+            raise ConnectionError("transient error")
+        super()._add(records)
+
+
+@pytest.mark.parametrize(
+    "model_cls, service, path, workers",
+    [
+        (model.Movie, service_layer.load_movies, "internal/movies.csv", 1),
+        (model.Author, service_layer.load_authors, "vendor/authors.json", 1),
+        (model.Stream, service_layer.load_streams, "internal/streams.csv", 2),
+    ],
+)
+def test_load_resume(model_cls, service, path, workers, session, monkeypatch):
+    # arrange
+    monkeypatch.setattr(service_layer, "DEFAULT_SHARD_SIZE", 64 * 1024)
+    path = f"{DATA_FOLDER}/{path}"
+    collector_cls = adapters.JsonCollector if path.endswith("json") else CsvCollector
+    collector = collector_cls(path=path)
+    total = len(collector.collect())
+    with pytest.raises(ConnectionError):
+        service(
+            collector=collector,
+            repo=FailingRepository(fail_at=3, model=model_cls, session=session),
+            batch_size=20,
+            workers=workers,
+            checkpoints=adapters.LoadCheckpoints(session, model_cls, path),
+        )
+    session.rollback()
+    checkpoints = adapters.LoadCheckpoints(session, model_cls, path, resume=True)
+
+    # act
+    report = service(
+        collector=collector,
+        session=session,
+        batch_size=20,
+        workers=workers,
+        checkpoints=checkpoints,
+    )
+    loaded = session.query(model_cls).count()
+
+    # assert
+    assert report.records == total - 40
+    assert session.get(LoadCheckpoint, checkpoints.key).records == total
+    service(collector=collector, session=session)
+    assert session.query(model_cls).count() == loaded
+
+
+@pytest.mark.parametrize(
+    "model_cls, service, collector",
+    [
+        (
+            model.Stream,
+            service_layer.load_streams,
+            adapters.CsvCollector(path=f"{DATA_FOLDER}/internal/streams.csv"),
+        ),
+        (
+            model.Author,
+            service_layer.load_authors,
+            adapters.JsonCollector(path=f"{DATA_FOLDER}/vendor/authors.json"),
+        ),
+        (
+            model.Review,
+            service_layer.load_reviews,
+            adapters.JsonCollector(path=f"{DATA_FOLDER}/vendor/reviews.json"),
+        ),
+    ],
+)
+def test_load_fast(model_cls, service, collector, session, monkeypatch):
+    # arrange
+    monkeypatch.setattr(service_layer, "DEFAULT_VALIDATE_EVERY", 1)
+    repo = adapters.SqlRepository(model=model_cls, session=session)
+
+    # act
+    report = service(collector=collector, repo=repo, fast=True)
+
+    # assert
+    assert report.records == len(collector.collect())
+    assert session.query(model_cls).count() > 0
+
+
+@pytest.fixture
+def malformed_authors(tmp_path):
+    authors = json.loads(open(f"{DATA_FOLDER}/vendor/authors.json").read())
+    authors[1]["nationalities"] = []
+    authors[4]["metadata"]["birth_date"] = "not a date"
+    path = tmp_path / "authors.json"
+    path.write_text(json.dumps(authors))
+    return str(path), len(authors)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_load_dead_letters(malformed_authors, fast, session, tmp_path):
+    # arrange
+    path, total = malformed_authors
+    dead_letters = adapters.DeadLetters(
+        str(tmp_path / "rejected.jsonl"), max_error_rate=0.5
+    )
+
+    # act
+    report = service_layer.load_authors(
+        collector=adapters.JsonCollector(path=path),
+        session=session,
+        batch_size=3,
+        fast=fast,
+        dead_letters=dead_letters,
+    )
+
+    # assert
+    lines = [json.loads(line) for line in open(dead_letters.path)]
+    assert [line["index"] for line in lines] == [1, 4]
+    assert lines[0]["error"].startswith("IndexError")
+    assert lines[0]["record"]["nationalities"] == []
+    assert report.records == total
+    assert report.rejected == 2
+    assert session.get(model.Author, "Josh Johnston") is not None
+
+
+def test_load_history_failed(malformed_authors, session):
+    # arrange
+    path, _ = malformed_authors
+    repo = adapters.HistoryRepository(model=model.Author, session=session)
+
+    # act
+    with pytest.raises(IndexError):
+        service_layer.load_authors(
+            collector=adapters.JsonCollector(path=path), repo=repo, batch_size=1
+        )
+
+    # assert
+    tables = sqlalchemy.inspect(session.get_bind()).get_table_names()
+    assert not [t for t in tables if "__snapshot_" in t]
+    assert repo.get_history("Josh Johnston") == []
+
+
+def test_load_dead_letters_resume(malformed_authors, session, tmp_path):
+    # arrange
+    path, total = malformed_authors
+    rejected = str(tmp_path / "rejected.jsonl")
+    with pytest.raises(ConnectionError):
+        service_layer.load_authors(
+            collector=adapters.JsonCollector(path=path),
+            repo=FailingRepository(fail_at=2, model=model.Author, session=session),
+            batch_size=3,
+            checkpoints=adapters.LoadCheckpoints(session, model.Author, path),
+            dead_letters=adapters.DeadLetters(rejected, max_error_rate=0.5),
+        )
+    session.rollback()
+
+    # act
+    report = service_layer.load_authors(
+        collector=adapters.JsonCollector(path=path),
+        session=session,
+        batch_size=3,
+        checkpoints=adapters.LoadCheckpoints(session, model.Author, path, True),
+        dead_letters=adapters.DeadLetters(rejected, max_error_rate=0.5),
+    )
+
+    # assert
+    lines = [json.loads(line) for line in open(rejected)]
+    assert [line["index"] for line in lines] == [1, 4]
+    assert report.records == total - 3
+    assert report.rejected == 1
+
+
+def _convert_records(batch):
+    if len(batch) > 1:
+        raise ValueError("whole batch")
+    return [{}]
+
+
+@pytest.mark.parametrize(
+    "convert",
+    [lambda batch: [{} for _ in batch], _convert_records],
+    ids=["batch", "records"],
+)
+def test_load_dead_letters_fast_mismatch(malformed_authors, convert, session, tmp_path):
+    # arrange
+    path, _ = malformed_authors
+    dead_letters = adapters.DeadLetters(str(tmp_path / "rejected.jsonl"))
+    transform = service_layer._SampledTransform(
+        convert, service_layer._transform_author, 1
+    )
+
+    # act
+    with pytest.raises(ValueError, match="differs from the validated one"):
+        service_layer._load(
+            collector=adapters.JsonCollector(path=path),
+            repo=SqlRepository(model=model.Author, session=session),
+            transform=transform,
+            batch_size=3,
+            dead_letters=dead_letters,
+        )
+
+    # assert
+    assert dead_letters.rejected == 0
+
+
+def test_load_dead_letters_in_parallel_shards(session, tmp_path, monkeypatch):
+    # arrange
+    monkeypatch.setattr(service_layer, "DEFAULT_SHARD_SIZE", 64 * 1024)
+    lines = open(f"{DATA_FOLDER}/internal/streams.csv").read().splitlines()
+    lines[-1] = lines[-1].replace("2021", "20x1")
+    path = tmp_path / "streams.csv"
+    path.write_text("\n".join(lines))
+    dead_letters = adapters.DeadLetters(str(tmp_path / "rejected.jsonl"))
+
+    # act
+    report = service_layer.load_streams(
+        collector=adapters.CsvCollector(path=str(path)),
+        session=session,
+        batch_size=100,
+        workers=2,
+        fast=True,
+        dead_letters=dead_letters,
+    )
+
+    # assert
+    rejected = json.loads(open(dead_letters.path).read())
+    assert rejected["index"] == len(lines) - 2
+    assert report.rejected == 1
+    assert session.query(model.Stream).count() == report.records - 1
+
+
+def test_load_dead_letters_error_rate(malformed_authors, session, tmp_path):
+    # arrange
+    path, _ = malformed_authors
+    dead_letters = adapters.DeadLetters(str(tmp_path / "rejected.jsonl"))
+
+    # act and assert
+    with pytest.raises(ValueError, match="1 of 3 records were rejected"):
+        service_layer.load_authors(
+            collector=adapters.JsonCollector(path=path),
+            session=session,
+            batch_size=3,
+            dead_letters=dead_letters,
+        )
+
+
+def test_load_without_dead_letters(malformed_authors, session):
+    # arrange
+    path, _ = malformed_authors
+
+    # act and assert
+    with pytest.raises(IndexError):
+        service_layer.load_authors(
+            collector=adapters.JsonCollector(path=path), session=session
+        )
+
+
+def test__sampled_transform_mismatch():
+    # arrange
+    transform = service_layer._SampledTransform(
+        lambda batch: [{**record, "size_mb": 0} for record in batch],
+        service_layer._transform_movie,
+        validate_every=3,
+    )
+    record = {
+        "title": "title",
+        "duration_mins": 90,
+        "original_language": "en",
+        "size_mb": 1,
+    }
+
+    # act
+    transform([record, record])
+
+    # assert
+    with pytest.raises(ValueError, match="record 3 differs"):
+        transform([record, record])
+
+
+@pytest.mark.parametrize("positioned", [False, True])
+def test__transform_shard(positioned):
+    # arrange
+    path = f"{DATA_FOLDER}/internal/movies.csv"
+    collector = adapters.CsvCollector(path=path)
+
+    # act
+    output = service_layer._transform_shard(
+        collector,
+        service_layer._RecordTransform(service_layer._transform_movie),
+        batch_size=50,
+        positioned=positioned,
+    )
+
+    # assert
+    assert [count for count, _, _, _ in output] == [50, 41]
+    assert output[0][1][0] == model.Movie(**collector.collect()[0]).dict()
+    assert [rejected for _, _, _, rejected in output] == [[], []]
+    if positioned:
+        assert output[-1][2] == pathlib.Path(path).stat().st_size
+    else:
+        assert [position for _, _, position, _ in output] == [None, None]
+
+
 def test__build_repo_error():
     # act and assert
     with pytest.raises(ValueError):
@@ -75,3 +642,161 @@ def test__build_repo_with_session(session):
 
     # assert
     isinstance(output, SqlRepository)
+
+
+def test_load_with_snapshot_cache(session, tmp_path, monkeypatch):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path / "cache"))
+    path = f"{DATA_FOLDER}/internal/movies.csv"
+    collector = CsvCollector(path=path)
+    first = service_layer.load_movies(
+        collector=collector,
+        session=session,
+        cache=cache,
+        checkpoints=adapters.LoadCheckpoints(session, model.Movie, path),
+    )
+
+    # act
+    skipped = service_layer.load_movies(
+        collector=collector,
+        session=session,
+        cache=cache,
+        checkpoints=adapters.LoadCheckpoints(session, model.Movie, path),
+    )
+    monkeypatch.setattr(service_layer, "_iter_transformed_batches", None)
+    replayed = service_layer.load_movies(
+        collector=collector, session=session, cache=cache
+    )
+
+    # assert
+    assert first.records == len(collector.collect())
+    assert not first.skipped
+    assert (skipped.records, skipped.skipped) == (0, True)
+    assert replayed.records == first.records
+    assert not replayed.skipped
+    assert session.query(model.Movie).count() == first.records
+
+
+def test_load_with_snapshot_cache_and_other_options(session, tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path / "cache"))
+    path = f"{DATA_FOLDER}/internal/movies.csv"
+    collector = CsvCollector(path=path)
+    service_layer.load_movies(
+        collector=collector,
+        session=session,
+        cache=cache,
+        checkpoints=adapters.LoadCheckpoints(session, model.Movie, path),
+    )
+
+    # act
+    reports = [
+        service_layer.load_movies(
+            collector=collector,
+            repo=SqlRepository(model=model.Movie, session=session, skip_unchanged=True),
+            cache=cache,
+            checkpoints=adapters.LoadCheckpoints(session, model.Movie, path),
+        )
+        for _ in range(2)
+    ]
+
+    # assert
+    assert [report.skipped for report in reports] == [False, True]
+    digests = session.query(repository.RecordDigest).count()
+    assert digests == reports[0].records == len(collector.collect())
+
+
+def test_load_resume_from_snapshot_cache(session, tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path / "cache"))
+    path = f"{DATA_FOLDER}/internal/movies.csv"
+    collector = CsvCollector(path=path)
+    service_layer.load_movies(
+        collector=collector, session=session, batch_size=20, cache=cache
+    )
+    with pytest.raises(ConnectionError):
+        service_layer.load_movies(
+            collector=collector,
+            repo=FailingRepository(fail_at=3, model=model.Movie, session=session),
+            batch_size=20,
+            cache=cache,
+            checkpoints=adapters.LoadCheckpoints(session, model.Movie, path),
+        )
+    session.rollback()
+
+    # act
+    report = service_layer.load_movies(
+        collector=collector,
+        session=session,
+        cache=cache,
+        checkpoints=adapters.LoadCheckpoints(session, model.Movie, path, resume=True),
+    )
+
+    # assert
+    assert report.records == len(collector.collect()) - 40
+    assert session.query(model.Movie).count() == len(collector.collect())
+
+
+def test_load_with_snapshot_cache_of_another_transform(session, tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path / "cache"))
+    collector = CsvCollector(path=f"{DATA_FOLDER}/internal/movies.csv")
+    service_layer.load_movies(collector=collector, session=session, cache=cache)
+
+    # act
+    service_layer.load_movies(
+        collector=collector, session=session, cache=cache, fast=True
+    )
+
+    # assert
+    assert len(list(pathlib.Path(cache.directory).glob("movie-*.snapshot"))) == 2
+
+
+def test_load_snapshot_cache_with_rejected(malformed_authors, session, tmp_path):
+    # arrange
+    path, _ = malformed_authors
+    cache = adapters.SnapshotCache(str(tmp_path / "cache"))
+    rejected = str(tmp_path / "rejected.jsonl")
+    service_layer.load_authors(
+        collector=adapters.JsonCollector(path=path),
+        session=session,
+        batch_size=3,
+        cache=cache,
+        dead_letters=adapters.DeadLetters(rejected, max_error_rate=0.5),
+    )
+
+    # act
+    with pytest.raises(ValueError, match="Record 1 failed to transform"):
+        service_layer.load_authors(
+            collector=adapters.JsonCollector(path=path),
+            session=session,
+            batch_size=3,
+            cache=cache,
+        )
+    report = service_layer.load_authors(
+        collector=adapters.JsonCollector(path=path),
+        session=session,
+        batch_size=3,
+        cache=cache,
+        dead_letters=adapters.DeadLetters(rejected, max_error_rate=0.5),
+    )
+
+    # assert
+    assert report.rejected == 2
+    assert [json.loads(line)["index"] for line in open(rejected)] == [1, 4]
+
+
+@pytest.mark.parametrize("writers", [0, 1])
+def test_load_snapshot_cache_error(session, tmp_path, writers):
+    # arrange
+    path = f"{DATA_FOLDER}/internal/movies.csv"
+    collector = CsvCollector(path=path) if writers else MagicMock(spec=CsvCollector)
+
+    # act and assert
+    with pytest.raises(ValueError, match="Snapshots can only be cached"):
+        service_layer.load_movies(
+            collector=collector,
+            session=session,
+            cache=adapters.SnapshotCache(str(tmp_path)),
+            writers=writers,
+        )
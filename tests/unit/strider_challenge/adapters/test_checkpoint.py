@@ -0,0 +1,92 @@
+import os
+
+from sqlmodel import Session
+
+from strider_challenge import adapters
+from strider_challenge.adapters import checkpoint
+from strider_challenge.domain import model
+
+
+def test_fingerprint(tmp_path, monkeypatch):
+    # arrange
+    monkeypatch.setattr(checkpoint, "FINGERPRINT_SAMPLE_SIZE", 2)
+    path = tmp_path / "data.csv"
+    path.write_text("x,y\n1,2\n")
+    first = adapters.fingerprint(str(path))
+    stat = os.stat(path)
+
+    # act
+    path.write_text("x,y\n1,3\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    # assert
+    assert adapters.fingerprint(str(path)) != first
+    assert len(first) == 40
+
+
+def test_save_and_start(session: Session, tmp_path):
+    # arrange
+    path = tmp_path / "data.csv"
+    path.write_text("x,y\n1,2\n")
+    checkpoints = adapters.LoadCheckpoints(session, model.Movie, str(path))
+    checkpoints.save(position=10, records=2)
+    checkpoints.save(position=20, records=3)
+    session.commit()
+
+    # act
+    resumed = adapters.LoadCheckpoints(session, model.Movie, str(path), resume=True)
+    started_over = adapters.LoadCheckpoints(session, model.Movie, str(path))
+
+    # assert
+    assert resumed.start() == 20
+    assert started_over.start() is None
+    assert session.get(checkpoint.LoadCheckpoint, resumed.key).records == 5
+    assert resumed.key.startswith("movie/")
+
+
+def test_start_without_checkpoint(session: Session, tmp_path):
+    # arrange
+    path = tmp_path / "data.csv"
+    path.write_text("x,y\n1,2\n")
+
+    # act
+    output = adapters.LoadCheckpoints(session, model.Movie, str(path), resume=True)
+
+    # assert
+    assert output.start() is None
+
+
+def test_completed(session: Session, tmp_path):
+    # arrange
+    path = tmp_path / "data.csv"
+    path.write_text("x,y\n1,2\n")
+    checkpoints = adapters.LoadCheckpoints(session, model.Movie, str(path))
+    before = checkpoints.completed(8)
+
+    # act
+    checkpoints.save(position=8, records=1)
+    session.commit()
+
+    # assert
+    assert not before
+    assert checkpoints.completed(8)
+    assert not checkpoints.completed(4)
+
+
+def test_scope(session: Session, tmp_path):
+    # arrange
+    path = tmp_path / "data.csv"
+    path.write_text("x,y\n1,2\n")
+    checkpoints = adapters.LoadCheckpoints(session, model.Movie, str(path))
+    checkpoints.save(position=8, records=1)
+    session.commit()
+
+    # act
+    checkpoints.scope(["StreamRollups.apply"])
+    scoped = checkpoints.completed(8)
+    checkpoints.scope([])
+
+    # assert
+    assert not scoped
+    assert checkpoints.completed(8)
+    assert checkpoints.key == checkpoints.source
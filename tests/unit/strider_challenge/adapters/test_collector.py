@@ -1,12 +1,65 @@
+import bz2
+import gzip
+import json
+import lzma
 import pathlib
 from typing import Any
 
+import pytest
 from pydantic import BaseModel
 
 from strider_challenge import adapters
+from strider_challenge.adapters import collector as collector_module
 
 DATA = [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
 PATH = str(pathlib.Path(__file__).parent.resolve())
+COMPRESSIONS = {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+
+def compress(name: str, target: pathlib.Path, extension: str) -> str:
+    content = pathlib.Path(f"{PATH}/{name}").read_bytes()
+    target.write_bytes(COMPRESSIONS[extension](content))
+    return str(target)
+
+
+@pytest.mark.parametrize("extension", list(COMPRESSIONS))
+def test_compression(extension, tmp_path):
+    # arrange
+    named = compress("data.csv", tmp_path / f"data.csv{extension}", extension)
+    unnamed = compress("data.csv", tmp_path / "data", extension)
+
+    # act
+    output = [adapters.compression(named), adapters.compression(unnamed)]
+
+    # assert
+    assert output == [extension, extension]
+    assert adapters.compression(f"{PATH}/data.csv") is None
+
+
+class TestThreadedDecompression:
+    def test_close_before_end(self, tmp_path):
+        # arrange
+        path = compress("data.csv", tmp_path / "data.csv.gz", ".gz")
+        raw = collector_module._ThreadedDecompression(
+            path, gzip.GzipFile, chunk_size=1, read_ahead=1
+        )
+        raw.read(1)
+
+        # act
+        raw.close()
+
+        # assert
+        assert not raw._thread.is_alive()
+
+    def test_corrupted_file(self, tmp_path):
+        # arrange
+        path = tmp_path / "data.csv.gz"
+        path.write_bytes(b"\x1f\x8bnot gzip")
+        collector = adapters.CsvCollector(path=str(path))
+
+        # act and assert
+        with pytest.raises(OSError):
+            collector.collect()
 
 
 class MockModel(BaseModel):
@@ -19,6 +72,50 @@ class MockCollector(adapters.Collector):
         return DATA
 
 
+class TestCollector:
+    def test_iter_batches(self):
+        # arrange
+        collector = MockCollector()
+
+        # act
+        output = list(collector.iter_batches(batch_size=1))
+
+        # assert
+        assert output == [[DATA[0]], [DATA[1]]]
+
+    def test_split(self):
+        # arrange
+        collector = MockCollector()
+
+        # act
+        output = collector.split(shard_size=1)
+
+        # assert
+        assert output == [collector]
+
+    def test_iter_positioned_batches(self):
+        # arrange
+        collector = MockCollector()
+
+        # act
+        output = list(collector.iter_positioned_batches(batch_size=1))
+
+        # assert
+        assert output == [([DATA[0]], 1), ([DATA[1]], 2)]
+
+    def test_resume(self):
+        # arrange
+        collector = MockCollector()
+
+        # act
+        output = collector.resume(1)
+
+        # assert
+        assert output.collect() == [DATA[1]]
+        assert list(output.iter_positioned_batches(batch_size=1)) == [([DATA[1]], 2)]
+        assert output.resume(2).collect() == []
+
+
 class TestCsvCollector:
     def test__collect(self):
         # arrange
@@ -30,6 +127,167 @@ class TestCsvCollector:
         # assert
         assert output == [{k: str(v) for k, v in d.items()} for d in DATA]
 
+    def test_iter_batches(self):
+        # arrange
+        collector = adapters.CsvCollector(path=f"{PATH}/data.csv")
+
+        # act
+        output = list(collector.iter_batches(batch_size=1))
+
+        # assert
+        assert output == [[{k: str(v) for k, v in d.items()}] for d in DATA]
+
+    @pytest.mark.parametrize("shard_size", [1, 4, 1024])
+    def test_split(self, shard_size):
+        # arrange
+        collector = adapters.CsvCollector(path=f"{PATH}/data.csv")
+
+        # act
+        shards = collector.split(shard_size=shard_size)
+        output = [record for shard in shards for record in shard.collect()]
+
+        # assert
+        assert output == collector.collect()
+        assert all(a.end == b.start for a, b in zip(shards, shards[1:]))
+
+    @pytest.mark.parametrize(
+        "start, end, positions",
+        [(0, None, [8, 11]), (4, None, [8, 11]), (4, 8, [8]), (8, None, [11])],
+    )
+    def test_iter_positioned_batches(self, start, end, positions):
+        # arrange
+        collector = adapters.CsvCollector(path=f"{PATH}/data.csv", start=start, end=end)
+
+        # act
+        output = list(collector.iter_positioned_batches(batch_size=1))
+
+        # assert
+        assert [batch for batch, _ in output] == [[r] for r in collector.collect()]
+        assert [position for _, position in output] == positions
+
+    @pytest.mark.parametrize("batch_size, sizes", [(1, [1, 1, 1]), (2, [2, 1])])
+    def test_iter_positioned_batches_quoted_line_breaks(
+        self, batch_size, sizes, tmp_path
+    ):
+        # arrange
+        path = tmp_path / "data.csv"
+        path.write_text('a,b\n1,"x\ny"\n2,"say ""hi""\nthere\nfolks"\n3,z\n')
+        collector = adapters.CsvCollector(path=str(path))
+
+        # act
+        output = list(collector.iter_positioned_batches(batch_size=batch_size))
+        resumed = collector.resume(output[0][1]).collect()
+
+        # assert
+        assert [r for batch, _ in output for r in batch] == collector.collect()
+        assert [len(batch) for batch, _ in output] == sizes
+        assert collector.collect()[1] == {"a": "2", "b": 'say "hi"\nthere\nfolks'}
+        assert resumed == collector.collect()[batch_size:]
+
+    def test_resume(self):
+        # arrange
+        collector = adapters.CsvCollector(path=f"{PATH}/data.csv")
+        _, position = next(collector.iter_positioned_batches(batch_size=1))
+
+        # act
+        output = collector.resume(position)
+
+        # assert
+        assert output.collect() == collector.collect()[1:]
+
+    def test_split_byte_range(self):
+        # arrange
+        collector = adapters.CsvCollector(path=f"{PATH}/data.csv", start=4, end=8)
+
+        # act
+        output = collector.split(shard_size=1)
+
+        # assert
+        assert [(s.start, s.end) for s in output] == [(4, 8)]
+        assert output[0].collect() == [{"x": "1", "y": "2"}]
+
+    @pytest.mark.parametrize("extension", list(COMPRESSIONS))
+    def test_compressed(self, extension, tmp_path):
+        # arrange
+        path = compress("data.csv", tmp_path / f"data.csv{extension}", extension)
+        collector = adapters.CsvCollector(path=path)
+
+        # act
+        output = list(collector.iter_positioned_batches(batch_size=1))
+
+        # assert
+        assert collector.collect() == [{k: str(v) for k, v in d.items()} for d in DATA]
+        assert [position for _, position in output] == [8, 11]
+        assert collector.resume(8).collect() == collector.collect()[1:]
+        assert list(collector.resume(8).iter_positioned_batches(1))[0][1] == 11
+        assert collector.split(shard_size=1) == [collector]
+
+
+class TestMmapCsvCollector:
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test__collect(self, newline, tmp_path):
+        # arrange
+        path = tmp_path / "data.csv"
+        lines = ["x,y,z", '1,"a, ""b""",2', "3,c,4"]
+        path.write_bytes(newline.join(lines).encode())
+        collector = adapters.MmapCsvCollector(path=str(path))
+
+        # act
+        output = collector.collect()
+
+        # assert
+        assert output == adapters.CsvCollector(path=str(path)).collect()
+        assert output[0] == {"x": "1", "y": 'a, "b"', "z": "2"}
+
+    @pytest.mark.parametrize("fields", [["y"], ["y", "x"]])
+    def test_fields(self, fields):
+        # arrange
+        collector = adapters.MmapCsvCollector(path=f"{PATH}/data.csv", fields=fields)
+
+        # act
+        output = collector.collect()
+
+        # assert
+        assert output == [{f: str(d[f]) for f in fields} for d in DATA]
+
+    @pytest.mark.parametrize(
+        "start, end, positions",
+        [(0, None, [8, 11]), (4, None, [8, 11]), (4, 8, [8]), (8, None, [11])],
+    )
+    def test_iter_positioned_batches(self, start, end, positions):
+        # arrange
+        collector = adapters.MmapCsvCollector(
+            path=f"{PATH}/data.csv", start=start, end=end
+        )
+
+        # act
+        output = list(collector.iter_positioned_batches(batch_size=1))
+
+        # assert
+        assert [batch for batch, _ in output] == [[r] for r in collector.collect()]
+        assert [position for _, position in output] == positions
+
+    def test_split_and_resume(self):
+        # arrange
+        collector = adapters.MmapCsvCollector(path=f"{PATH}/data.csv", fields=["x"])
+
+        # act
+        shards = collector.split(shard_size=1)
+
+        # assert
+        assert all(isinstance(s, adapters.MmapCsvCollector) for s in shards)
+        assert [r for s in shards for r in s.collect()] == [{"x": "1"}, {"x": "3"}]
+        assert collector.resume(8).collect() == [{"x": "3"}]
+
+    def test_compressed(self, tmp_path):
+        # arrange
+        path = compress("data.csv", tmp_path / "data.csv.gz", ".gz")
+        collector = adapters.MmapCsvCollector(path=path)
+
+        # act and assert
+        with pytest.raises(ValueError, match="can't be memory-mapped"):
+            collector.collect()
+
 
 class TestJsonCollector:
     def test__collect(self):
@@ -41,3 +299,62 @@ class TestJsonCollector:
 
         # assert
         assert output == DATA
+
+    @pytest.mark.parametrize("buffer_size", [1, 7, 1024])
+    def test_iter_records(self, buffer_size):
+        # arrange
+        collector = adapters.JsonCollector(
+            path=f"{PATH}/data.json", buffer_size=buffer_size
+        )
+
+        # act
+        output = list(collector.iter_records())
+
+        # assert
+        assert output == DATA
+
+    @pytest.mark.parametrize(
+        "document, target",
+        [
+            ([], []),
+            ([1, 23456, [7, 8], "9"], [1, 23456, [7, 8], "9"]),
+            ({"x": 1}, [{"x": 1}]),
+        ],
+    )
+    def test_iter_records_documents(self, document, target, tmp_path):
+        # arrange
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps(document, indent=4))
+        collector = adapters.JsonCollector(path=str(path), buffer_size=2)
+
+        # act
+        output = list(collector.iter_records())
+
+        # assert
+        assert output == target
+
+    @pytest.mark.parametrize(
+        "document", ['[{"x": 1} {"x": 2}]', '[{"x": 1}, {"x"', '[{"x": 1}  ']
+    )
+    def test_iter_records_malformed(self, document, tmp_path):
+        # arrange
+        path = tmp_path / "data.json"
+        path.write_text(document)
+        collector = adapters.JsonCollector(path=str(path), buffer_size=4)
+
+        # act and assert
+        with pytest.raises(json.JSONDecodeError):
+            list(collector.iter_records())
+
+    @pytest.mark.parametrize("extension", list(COMPRESSIONS))
+    def test_compressed(self, extension, tmp_path):
+        # arrange
+        path = compress("data.json", tmp_path / "data", extension)
+        collector = adapters.JsonCollector(path=path, buffer_size=3)
+
+        # act
+        output = list(collector.iter_records())
+
+        # assert
+        assert output == DATA
+        assert collector.collect() == DATA
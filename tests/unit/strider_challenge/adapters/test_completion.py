@@ -0,0 +1,87 @@
+import datetime
+
+from sqlmodel import Session
+
+from strider_challenge import adapters
+from strider_challenge.domain import model
+
+
+def _stream(user_email: str, movie_title: str, day: int, minutes: int) -> model.Stream:
+    start_at = datetime.datetime(2022, 1, day, 10)
+    return model.Stream(
+        movie_title=movie_title,
+        user_email=user_email,
+        size_mb=1.0,
+        start_at=start_at,
+        end_at=start_at + datetime.timedelta(minutes=minutes),
+    )
+
+
+def _completions(session: Session) -> list:
+    return [
+        (c.day.day, c.user_email, c.movie_title, c.completion)
+        for c in session.query(model.WatchCompletion).order_by(
+            "day", "user_email", "movie_title"
+        )
+    ]
+
+
+def test_refresh(session: Session):
+    # arrange
+    session.add(
+        model.Movie(title="a", duration_mins=100, original_language="en", size_mb=1)
+    )
+    session.add_all(
+        [
+            _stream("u1", "a", 1, 20),
+            _stream("u1", "a", 1, 60),
+            _stream("u2", "a", 2, 150),
+            _stream("u2", "unknown", 2, 10),
+            _stream("u3", "a", 5, 10),
+        ]
+    )
+    session.commit()
+
+    # act
+    output = adapters.WatchCompletions(session, batch_size=2).refresh(
+        datetime.date(2022, 1, 1), datetime.date(2022, 1, 2)
+    )
+
+    # assert
+    assert output == 2
+    assert _completions(session) == [(1, "u1", "a", 0.6), (2, "u2", "a", 1.5)]
+
+
+def test_refresh_window_only(session: Session):
+    # arrange
+    session.add(
+        model.Movie(title="a", duration_mins=100, original_language="en", size_mb=1)
+    )
+    session.add_all([_stream("u1", "a", 1, 20), _stream("u2", "a", 2, 50)])
+    session.commit()
+    completions = adapters.WatchCompletions(session)
+    completions.refresh(datetime.date(2022, 1, 1), datetime.date(2022, 1, 2))
+    session.add(_stream("u1", "a", 1, 80))
+    session.add(_stream("u3", "a", 2, 90))
+    session.commit()
+
+    # act
+    output = completions.refresh(datetime.date(2022, 1, 2), datetime.date(2022, 1, 3))
+
+    # assert
+    assert output == 2
+    assert _completions(session) == [
+        (1, "u1", "a", 0.2),
+        (2, "u2", "a", 0.5),
+        (2, "u3", "a", 0.9),
+    ]
+
+
+def test_refresh_without_streams(session: Session):
+    # act
+    output = adapters.WatchCompletions(session).refresh(
+        datetime.date(2022, 1, 1), datetime.date(2022, 1, 2)
+    )
+
+    # assert
+    assert output == 0
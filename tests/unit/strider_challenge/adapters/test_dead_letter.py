@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from strider_challenge import adapters
+
+
+def test_add(tmp_path):
+    # arrange
+    path = tmp_path / "rejected.jsonl"
+    dead_letters = adapters.DeadLetters(str(path))
+
+    # act
+    dead_letters.add([(3, {"x": "a"}, "ValueError: a")])
+    dead_letters.add([])
+    dead_letters.add([(7, {"x": "b"}, "IndexError: b")])
+
+    # assert
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [
+        {"index": 3, "record": {"x": "a"}, "error": "ValueError: a"},
+        {"index": 7, "record": {"x": "b"}, "error": "IndexError: b"},
+    ]
+    assert dead_letters.rejected == 2
+
+
+def test_add_already_written(tmp_path):
+    # arrange
+    path = tmp_path / "rejected.jsonl"
+    adapters.DeadLetters(str(path)).add([(3, {"x": "a"}, "ValueError: a")])
+    dead_letters = adapters.DeadLetters(str(path))
+
+    # act
+    dead_letters.add([(3, {"x": "a"}, "ValueError: a"), (3, {"x": "b"}, "error")])
+    dead_letters.add([(3, {"x": "b"}, "error")])
+
+    # assert
+    lines = [json.loads(line)["record"] for line in path.read_text().splitlines()]
+    assert lines == [{"x": "a"}, {"x": "b"}]
+    assert dead_letters.rejected == 3
+
+
+def test_check(tmp_path):
+    # arrange
+    dead_letters = adapters.DeadLetters(
+        str(tmp_path / "rejected.jsonl"), max_error_rate=0.1
+    )
+    dead_letters.add([(0, {}, "error")])
+
+    # act
+    dead_letters.check(records=10)
+
+    # assert
+    with pytest.raises(ValueError, match="1 of 9 records were rejected"):
+        dead_letters.check(records=9)
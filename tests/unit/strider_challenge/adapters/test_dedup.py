@@ -0,0 +1,102 @@
+from hashlib import sha1
+
+from sqlmodel import Field, SQLModel
+
+from strider_challenge import adapters
+
+
+class MockDedupSqlModel(SQLModel):
+    name: str = Field(primary_key=True)
+    age: int
+
+
+def _digests(prefix: str, n: int) -> list[str]:
+    return [sha1(f"{prefix}{i}".encode("utf-8")).hexdigest() for i in range(n)]
+
+
+class TestDigestTable:
+    def test_update(self):
+        # arrange
+        table = adapters.DigestTable(capacity=1000)
+        keys = list(range(1000))
+        first, changed = _digests("first", 1000), _digests("changed", 1000)
+
+        # act
+        added = table.update(keys, first)
+        again = table.update(keys, first)
+        updated = table.update(keys, changed)
+        older = table.update(keys, first)
+
+        # assert
+        assert not any(added)
+        assert all(again)
+        assert not any(updated)
+        assert not any(older)
+        assert table.keys.nbytes + table.digests.nbytes == 16 * 1000
+        assert table.update([], []) == []
+
+    def test_update_full(self):
+        # arrange
+        table = adapters.DigestTable(capacity=1)
+        first, second = _digests("key", 2)
+        table.update(["1"], [first])
+
+        # act
+        added = table.update(["2"], [second])
+        again = table.update(["1", "2"], [first, second])
+
+        # assert
+        assert added == [False]
+        assert again == [True, False]
+        assert table.keys.size == 1
+
+
+class TestDeduplicator:
+    def test_call(self):
+        # arrange
+        deduplicate = adapters.Deduplicator("name")
+
+        # act
+        output = deduplicate(
+            [
+                {"name": "1", "age": 18},
+                MockDedupSqlModel(name="2", age=18),
+                {"name": "1", "age": 19},
+            ]
+        )
+
+        # assert
+        assert output == [{"name": "1", "age": 19}, MockDedupSqlModel(name="2", age=18)]
+        assert deduplicate.dropped == 1
+
+    def test_call_with_digest_table(self):
+        # arrange
+        deduplicate = adapters.Deduplicator("name", adapters.DigestTable(100))
+        deduplicate([{"name": "1", "age": 18}, MockDedupSqlModel(name="2", age=18)])
+
+        # act
+        output = deduplicate(
+            [
+                {"name": "1", "age": 18},
+                {"name": "2", "age": 19},
+                MockDedupSqlModel(name="3", age=20),
+            ]
+        )
+
+        # assert
+        assert output == [{"name": "2", "age": 19}, MockDedupSqlModel(name="3", age=20)]
+        assert deduplicate.dropped == 1
+        assert deduplicate([]) == []
+
+    def test_call_with_digest_table_older_version(self):
+        # arrange
+        deduplicate = adapters.Deduplicator("name", adapters.DigestTable(100))
+        deduplicate([{"name": "1", "age": 18}])
+        deduplicate([{"name": "1", "age": 19}])
+
+        # act
+        output = deduplicate([{"name": "1", "age": 18}])
+
+        # assert
+        assert output == [{"name": "1", "age": 18}]
+        assert deduplicate.dropped == 0
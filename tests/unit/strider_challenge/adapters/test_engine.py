@@ -0,0 +1,54 @@
+from sqlalchemy import text
+
+from strider_challenge import adapters
+from strider_challenge.adapters import engine
+
+
+def test_get_engine_sqlite(tmp_path):
+    # arrange
+    url = f"sqlite:///{tmp_path}/database.db"
+
+    # act
+    bulk = adapters.get_engine(url, engine.BULK)
+    with bulk.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        synchronous = connection.execute(text("PRAGMA synchronous")).scalar()
+
+    # assert
+    assert journal_mode == "wal"
+    assert synchronous == 0
+    assert adapters.get_engine(url, engine.BULK) is bulk
+    assert adapters.get_engine(url, engine.INTERACTIVE) is not bulk
+
+
+def test_get_engine_in_other_process(tmp_path, monkeypatch):
+    # arrange
+    url = f"sqlite:///{tmp_path}/database.db"
+    parent = adapters.get_engine(url)
+    monkeypatch.setattr(engine.os, "getpid", lambda: -1)
+
+    # act
+    output = adapters.get_engine(url)
+
+    # assert
+    assert output is not parent
+
+
+def test_get_engine_postgresql():
+    # act
+    output = adapters.get_engine("postgresql+pg8000://user@localhost/db", engine.BULK)
+
+    # assert
+    assert output.pool.size() == engine.BULK.pool_size
+
+
+def test__connection_statements():
+    # act
+    postgresql = engine._connection_statements(
+        "postgresql+pg8000://user@localhost/db", engine.BULK
+    )
+    other = engine._connection_statements("mysql://user@localhost/db", engine.BULK)
+
+    # assert
+    assert postgresql == ["SET synchronous_commit TO off"]
+    assert other == []
@@ -0,0 +1,23 @@
+import os
+
+from strider_challenge import adapters
+
+
+def test_changed_and_mark(tmp_path):
+    # arrange
+    manifest = adapters.LandingManifest(str(tmp_path / "manifest.json"))
+    loaded, modified = tmp_path / "movies.csv", tmp_path / "users.csv"
+    loaded.write_text("id\n1\n")
+    modified.write_text("id\n1\n")
+    for path, version in manifest.changed([str(loaded), str(modified)]):
+        manifest.mark(path, version)
+    modified.write_text("id\n1\n2\n")
+
+    # act
+    changed = adapters.LandingManifest(manifest.path).changed(
+        [str(loaded), str(modified), str(tmp_path / "removed.csv")]
+    )
+
+    # assert
+    assert changed == [(str(modified), adapters.fingerprint(str(modified)))]
+    assert sorted(os.listdir(tmp_path)) == ["manifest.json", "movies.csv", "users.csv"]
@@ -0,0 +1,76 @@
+import datetime
+
+import sqlalchemy
+from sqlmodel import Session, SQLModel
+
+from strider_challenge import adapters
+from strider_challenge.adapters import migration
+from strider_challenge.domain import model
+
+
+def test_migrate(in_memory_db):
+    # arrange
+    # the stream table as created before its typed size and its duration
+    legacy = sqlalchemy.Table(
+        "stream",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.String, primary_key=True),
+        sqlalchemy.Column("movie_title", sqlalchemy.String),
+        sqlalchemy.Column("user_email", sqlalchemy.String),
+        sqlalchemy.Column("size_mb", sqlalchemy.String),
+        sqlalchemy.Column("start_at", sqlalchemy.DateTime),
+        sqlalchemy.Column("end_at", sqlalchemy.DateTime),
+    )
+    streams = [
+        model.Stream(
+            movie_title="Unforgiven",
+            user_email=f"{i}@mail.com",
+            size_mb=10.5 + i,
+            start_at=datetime.datetime(2021, 12, 1),
+            end_at=datetime.datetime(2021, 12, 1, 0, i + 1),
+        )
+        for i in range(3)
+    ]
+    with in_memory_db.begin() as connection:
+        legacy.create(bind=connection)
+        connection.execute(
+            legacy.insert(),
+            [
+                {**s.dict(exclude={"duration_seconds"}), "size_mb": str(s.size_mb)}
+                for s in streams
+            ],
+        )
+    SQLModel.metadata.create_all(in_memory_db)
+    review_indexes = model.Review.__table__.indexes
+    next(iter(review_indexes)).drop(bind=in_memory_db)
+
+    # act
+    changes = adapters.migrate(in_memory_db, [model.Stream, model.Review], batch_size=2)
+    again = adapters.migrate(in_memory_db, [model.Stream, model.Review])
+
+    # assert
+    inspector = sqlalchemy.inspect(in_memory_db)
+    assert changes == [
+        "rebuilt stream (added duration_seconds)",
+        f"created index {next(iter(review_indexes)).name}",
+    ]
+    assert again == []
+    assert {i["name"] for i in inspector.get_indexes("stream")} == {
+        str(i.name) for i in model.Stream.__table__.indexes
+    }
+    with Session(in_memory_db) as session:
+        assert session.query(model.Stream).order_by("user_email").all() == streams
+
+
+def test_migrate_with_reflected_indexes(in_memory_db, monkeypatch):
+    # arrange
+    monkeypatch.setattr(migration, "INDEX_QUERIES", {})
+    missing = adapters.migrate(in_memory_db, [model.Stream])
+    SQLModel.metadata.create_all(in_memory_db)
+
+    # act
+    changes = adapters.migrate(in_memory_db, [model.Stream])
+
+    # assert
+    assert missing == []
+    assert changes == []
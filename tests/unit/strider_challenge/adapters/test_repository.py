@@ -1,6 +1,15 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlmodel import Field, Session, SQLModel
 
 from strider_challenge import adapters
+from strider_challenge.adapters import repository
+from strider_challenge.domain import model
 
 
 class MockSqlModel(SQLModel, table=True):
@@ -8,6 +17,21 @@ class MockSqlModel(SQLModel, table=True):
     age: int
 
 
+class MockEventSqlModel(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    name: str | None = None
+    at: datetime.datetime
+
+
+class MockKeyOnlySqlModel(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+
+
+class MockIndexedSqlModel(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+    age: int = Field(index=True)
+
+
 class TestSqlRepository:
     def test_add_and_get(self, session: Session):
         # arrange
@@ -25,3 +49,466 @@ class TestSqlRepository:
         # assert
         assert output1 == input3
         assert output2 == input2
+
+    def test_add_duplicated_references_in_many_batches(self, session: Session):
+        # arrange
+        repo = adapters.SqlRepository(session=session, model=MockSqlModel, batch_size=2)
+        records = [MockSqlModel(name=str(i % 3), age=i) for i in range(7)]
+
+        # act
+        repo.add(records)
+
+        # assert
+        assert session.query(MockSqlModel).count() == 3
+        assert repo.get(reference="0") == MockSqlModel(name="0", age=6)
+        assert repo.get(reference="1") == MockSqlModel(name="1", age=4)
+        assert repo.get(reference="2") == MockSqlModel(name="2", age=5)
+
+    def test_add_skip_unchanged(self, session: Session):
+        # arrange
+        repo = adapters.SqlRepository(
+            session=session, model=MockSqlModel, skip_unchanged=True
+        )
+        repo.add([MockSqlModel(name="1", age=18), MockSqlModel(name="2", age=18)])
+        # change the rows behind the repository's back, keeping the old digests
+        session.merge(MockSqlModel(name="1", age=0))
+        session.merge(MockSqlModel(name="2", age=0))
+        session.commit()
+
+        # act
+        repo.add([MockSqlModel(name="1", age=18), MockSqlModel(name="2", age=19)])
+
+        # assert
+        assert repo.get(reference="1") == MockSqlModel(name="1", age=0)
+        assert repo.get(reference="2") == MockSqlModel(name="2", age=19)
+        assert session.query(repository.RecordDigest).count() == 2
+
+    def test_add_without_skip_unchanged_forgets_digests(self, session: Session):
+        # arrange
+        skipping = adapters.SqlRepository(
+            session=session, model=MockSqlModel, skip_unchanged=True
+        )
+        writing = adapters.SqlRepository(session=session, model=MockSqlModel)
+        skipping.add([MockSqlModel(name="1", age=18), MockSqlModel(name="2", age=18)])
+        writing.add([MockSqlModel(name="1", age=19)])
+
+        # act
+        skipping.add([MockSqlModel(name="1", age=18), MockSqlModel(name="2", age=18)])
+
+        # assert
+        assert skipping.get(reference="1") == MockSqlModel(name="1", age=18)
+        assert session.query(repository.RecordDigest).count() == 2
+
+    def test_add_without_digests(self, session: Session):
+        # arrange
+        repo = adapters.SqlRepository(session=session, model=MockSqlModel, batch_size=1)
+        statements = []
+        sqlalchemy.event.listen(
+            session.get_bind(),
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        # act
+        repo.add([MockSqlModel(name="1", age=18), MockSqlModel(name="2", age=18)])
+        repo.add([MockSqlModel(name="1", age=19)])
+
+        # assert
+        digests = [s for s in statements if "recorddigest" in s]
+        assert len(digests) == 1
+        assert digests[0].startswith("SELECT")
+        assert session.query(MockSqlModel).count() == 2
+
+    def test_add_key_only_model(self, session: Session):
+        # arrange
+        repo = adapters.SqlRepository(session=session, model=MockKeyOnlySqlModel)
+
+        # act
+        repo.add([MockKeyOnlySqlModel(name="1")])
+        repo.add([MockKeyOnlySqlModel(name="1"), MockKeyOnlySqlModel(name="2")])
+
+        # assert
+        assert session.query(MockKeyOnlySqlModel).count() == 2
+
+    def test_add_generic_dialect_fallback(self, session: Session, monkeypatch):
+        # arrange
+        monkeypatch.setattr(repository, "UPSERT_DIALECTS", {})
+        repo = adapters.SqlRepository(session=session, model=MockSqlModel)
+        input1 = MockSqlModel(name="1", age=18)
+        input2 = MockSqlModel(name="2", age=18)
+        input3 = MockSqlModel(name="1", age=19)
+
+        # act
+        repo.add([input1])
+        repo.add([input2, input3])
+
+        # assert
+        assert repo.get(reference="1") == input3
+        assert repo.get(reference="2") == input2
+
+    def test__build_upsert_postgresql(self, session: Session):
+        # arrange
+        repo = adapters.SqlRepository(session=session, model=MockSqlModel)
+
+        # act
+        statement = repo._build_upsert(
+            postgresql.insert, [{"name": "1", "age": 18}, {"name": "2", "age": 19}]
+        )
+        output = str(statement.compile(dialect=postgresql.dialect()))
+
+        # assert
+        assert "ON CONFLICT (name) DO UPDATE SET age = excluded.age" in output
+
+    def test_fork(self, session: Session, monkeypatch):
+        # arrange
+        monkeypatch.setattr(repository, "CONCURRENT_WRITE_DIALECTS", {"sqlite"})
+        repo = adapters.SqlRepository(
+            session=session, model=MockSqlModel, skip_unchanged=True
+        )
+
+        # act
+        output = repo.fork()
+
+        # assert
+        assert output.session is not session
+        assert output.session.get_bind() is session.get_bind()
+        assert (output.model, output.skip_unchanged) == (MockSqlModel, True)
+
+    def test_fork_error(self, session: Session):
+        # arrange
+        repo = adapters.SqlRepository(session=session, model=MockSqlModel)
+
+        # act and assert
+        with pytest.raises(ValueError, match="sqlite databases"):
+            repo.fork()
+
+
+class TestCopyRepository:
+    def test__staging_table(self):
+        # arrange
+        repo = adapters.CopyRepository(session=MagicMock(), model=MockEventSqlModel)
+
+        # act
+        output = str(
+            CreateTable(repo._staging_table()).compile(dialect=postgresql.dialect())
+        )
+
+        # assert
+        assert "CREATE TEMPORARY TABLE mockeventsqlmodel__staging" in output
+        assert "at TIMESTAMP WITH TIME ZONE" in output
+        assert "ON COMMIT DROP" in output
+
+    def test__build_merge(self):
+        # arrange
+        repo = adapters.CopyRepository(session=MagicMock(), model=MockEventSqlModel)
+
+        # act
+        statement = repo._build_merge(repo._staging_table())
+        output = str(statement.compile(dialect=postgresql.dialect()))
+
+        # assert
+        assert "INSERT INTO mockeventsqlmodel (id, name, at) SELECT" in output
+        assert "FROM mockeventsqlmodel__staging ON CONFLICT (id) DO UPDATE" in output
+
+    def test__to_copy_buffer(self):
+        # arrange
+        rows = [
+            {
+                "id": "1",
+                "name": 'a "quoted", name',
+                "at": datetime.datetime(2022, 1, 1),
+            },
+            {"id": "2", "name": None, "at": datetime.datetime(2022, 1, 2)},
+        ]
+
+        # act
+        output = repository._to_copy_buffer(["id", "name", "at"], rows).read()
+
+        # assert
+        assert output == (
+            '"1","a ""quoted"", name","2022-01-01 00:00:00"\n'
+            '"2",\\N,"2022-01-02 00:00:00"\n'
+        )
+
+    def test_add(self):
+        # arrange
+        session = MagicMock()
+        cursor = MagicMock(spec=["execute"])
+        session.connection.return_value.connection.cursor.return_value = cursor
+        repo = adapters.CopyRepository(session=session, model=MockEventSqlModel)
+        record = MockEventSqlModel(id="1", at=datetime.datetime(2022, 1, 1))
+
+        # act
+        repo.add([record])
+
+        # assert
+        operation = cursor.execute.call_args.args[0]
+        stream = cursor.execute.call_args.kwargs["stream"]
+        assert operation.startswith('COPY "mockeventsqlmodel__staging"')
+        assert stream.read() == '"1",\\N,"2022-01-01 00:00:00"\n'
+        session.commit.assert_called_once()
+
+    def test_add_with_copy_expert(self):
+        # arrange
+        session = MagicMock()
+        cursor = session.connection.return_value.connection.cursor.return_value
+        repo = adapters.CopyRepository(session=session, model=MockEventSqlModel)
+        record = MockEventSqlModel(id="1", at=datetime.datetime(2022, 1, 1))
+
+        # act
+        repo.add([record])
+
+        # assert
+        cursor.copy_expert.assert_called_once()
+
+
+class TestHistoryRepository:
+    def test_fork(self, session: Session):
+        # arrange
+        repo = adapters.HistoryRepository(session=session, model=MockSqlModel)
+
+        # act and assert
+        with pytest.raises(ValueError, match="History"):
+            repo.fork()
+
+    def test_add_and_finalize_snapshots(self, session: Session):
+        # arrange
+        repo = adapters.HistoryRepository(session=session, model=MockSqlModel)
+        snapshots = [
+            [MockSqlModel(name="1", age=18), MockSqlModel(name="2", age=18)],
+            [MockSqlModel(name="1", age=19), MockSqlModel(name="3", age=20)],
+            [MockSqlModel(name="2", age=18)],
+        ]
+
+        # act
+        for snapshot in snapshots:
+            repo.add(snapshot[:1])
+            repo.add(snapshot[1:])
+            repo.finalize()
+        history = {name: repo.get_history(name) for name in ["1", "2", "3"]}
+
+        # assert
+        assert [(v["age"], v["is_deleted"]) for v in history["1"]] == [
+            (18, False),
+            (19, False),
+            (19, True),
+        ]
+        assert [(v["age"], v["is_deleted"]) for v in history["2"]] == [
+            (18, False),
+            (18, True),
+            (18, False),
+        ]
+        assert [(v["age"], v["is_deleted"]) for v in history["3"]] == [
+            (20, False),
+            (20, True),
+        ]
+        for versions in history.values():
+            assert [v["valid_to"] is None for v in versions][-1]
+            assert all(v["valid_to"] for v in versions[:-1])
+        assert repo.get(reference="1") == MockSqlModel(name="1", age=19)
+        assert session.query(MockSqlModel).count() == 3
+
+    def test_finalize_without_records(self, session: Session):
+        # arrange
+        repo = adapters.HistoryRepository(session=session, model=MockSqlModel)
+        repo.add([MockSqlModel(name="1", age=18)])
+        repo.finalize()
+
+        # act
+        repo.finalize()
+
+        # assert
+        assert [(v["age"], v["is_deleted"]) for v in repo.get_history("1")] == [
+            (18, False),
+            (18, True),
+        ]
+        assert [
+            t
+            for t in sqlalchemy.inspect(session.get_bind()).get_table_names()
+            if "__snapshot" in t
+        ] == []
+
+    def test_abort(self, session: Session):
+        # arrange
+        repo = adapters.HistoryRepository(session=session, model=MockSqlModel)
+        repo.abort()
+        repo.add([MockSqlModel(name="1", age=18)])
+
+        # act
+        repo.abort()
+
+        # assert
+        inspector = sqlalchemy.inspect(session.get_bind())
+        assert not inspector.has_table(repo.snapshot.name)
+        assert repo.get_history("1") == []
+        assert repo.loaded_at is None
+
+
+class TestRebuildRepository:
+    def test_init_skip_unchanged(self, session: Session):
+        # act and assert
+        with pytest.raises(ValueError, match="can't skip unchanged"):
+            adapters.RebuildRepository(
+                session=session, model=MockSqlModel, skip_unchanged=True
+            )
+
+    def test_fork(self, session: Session):
+        # arrange
+        repo = adapters.RebuildRepository(session=session, model=MockSqlModel)
+
+        # act and assert
+        with pytest.raises(ValueError, match="Rebuild"):
+            repo.fork()
+
+    def test_add_postgresql(self):
+        # arrange
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "postgresql"
+        cursor = MagicMock(spec=["execute"])
+        session.connection.return_value.connection.cursor.return_value = cursor
+        repo = adapters.RebuildRepository(session=session, model=MockSqlModel)
+
+        # act
+        repo.add([MockSqlModel(name="1", age=18)])
+        repo.add([MockSqlModel(name="2", age=19)])
+
+        # assert
+        operation = cursor.execute.call_args.args[0]
+        stream = cursor.execute.call_args.kwargs["stream"]
+        output = str(CreateTable(repo.shadow).compile(dialect=postgresql.dialect()))
+        assert operation.startswith('COPY "mocksqlmodel__shadow"')
+        assert stream.read() == '"2","19","1"\n'
+        assert "CREATE UNLOGGED TABLE mocksqlmodel__shadow" in output
+
+    def test__rebuilt_index_postgresql(self, session: Session):
+        # arrange
+        repo = adapters.RebuildRepository(session=session, model=model.Review)
+        rebuilt = repo._rebuilt_table()
+        index = next(iter(model.Review.__table__.indexes))
+
+        # act
+        output = str(
+            CreateIndex(repo._rebuilt_index(index, rebuilt)).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+
+        # assert
+        assert output == (
+            "CREATE INDEX ix_review_book_title__rebuilt "
+            "ON review__rebuilt (lower(book_title))"
+        )
+
+    def test_add_and_finalize(self, session: Session):
+        # arrange
+        repo = adapters.RebuildRepository(
+            session=session, model=MockIndexedSqlModel, batch_size=2
+        )
+        adapters.SqlRepository(session=session, model=MockIndexedSqlModel).add(
+            [MockIndexedSqlModel(name="0", age=10)]
+        )
+
+        # act
+        repo.add([MockIndexedSqlModel(name="1", age=18)])
+        repo.add(
+            [
+                MockIndexedSqlModel(name="2", age=18),
+                MockIndexedSqlModel(name="1", age=19),
+                MockIndexedSqlModel(name="3", age=20),
+            ]
+        )
+        during = session.query(MockIndexedSqlModel).count()
+        repo.finalize()
+        repo.finalize()
+
+        # assert
+        inspector = sqlalchemy.inspect(session.get_bind())
+        assert during == 1
+        assert session.query(MockIndexedSqlModel).order_by("name").all() == [
+            MockIndexedSqlModel(name="1", age=19),
+            MockIndexedSqlModel(name="2", age=18),
+            MockIndexedSqlModel(name="3", age=20),
+        ]
+        assert [i["name"] for i in inspector.get_indexes(repo.table.name)] == [
+            "ix_mockindexedsqlmodel_age"
+        ]
+        assert not inspector.has_table(repo.shadow.name)
+        assert not inspector.has_table(f"{repo.table.name}__rebuilt")
+
+    def test_finalize_forgets_digests(self, session: Session):
+        # arrange
+        adapters.SqlRepository(
+            session=session, model=MockIndexedSqlModel, skip_unchanged=True
+        ).add([MockIndexedSqlModel(name="1", age=18)])
+        adapters.SqlRepository(
+            session=session, model=MockSqlModel, skip_unchanged=True
+        ).add([MockSqlModel(name="1", age=18)])
+        repo = adapters.RebuildRepository(session=session, model=MockIndexedSqlModel)
+
+        # act
+        repo.add([MockIndexedSqlModel(name="1", age=19)])
+        repo.finalize()
+
+        # assert
+        assert [d.key for d in session.query(repository.RecordDigest).all()] == [
+            "mocksqlmodel/1"
+        ]
+
+    def test_finalize_swap_error(self, session: Session, monkeypatch):
+        # arrange
+        repo = adapters.RebuildRepository(session=session, model=MockIndexedSqlModel)
+        adapters.SqlRepository(session=session, model=MockIndexedSqlModel).add(
+            [MockIndexedSqlModel(name="0", age=10)]
+        )
+        repo.add([MockIndexedSqlModel(name="1", age=18)])
+        invalid = sqlalchemy.Table(
+            repo.table.name,
+            sqlalchemy.MetaData(),
+            sqlalchemy.Column("missing", sqlalchemy.Integer),
+        )
+        monkeypatch.setattr(
+            repo.table, "indexes", {sqlalchemy.Index("ix_invalid", invalid.c.missing)}
+        )
+
+        # act
+        with pytest.raises(sqlalchemy.exc.OperationalError):
+            repo.finalize()
+        session.rollback()
+
+        # assert
+        assert session.query(MockIndexedSqlModel).all() == [
+            MockIndexedSqlModel(name="0", age=10)
+        ]
+
+    def test_finalize_with_index_renames(self, session: Session, monkeypatch):
+        # arrange
+        repo = adapters.RebuildRepository(session=session, model=MockIndexedSqlModel)
+        monkeypatch.setattr(repository, "INDEX_RENAME_DIALECTS", {"sqlite"})
+        renames = []
+        exec_driver_sql = sqlalchemy.future.Connection.exec_driver_sql
+
+        def _exec_driver_sql(connection, statement, *args):
+            # sqlite can't rename indexes and constraints, only record them
+            if "RENAME CONSTRAINT" in statement or "ALTER INDEX" in statement:
+                renames.append(statement)
+                return None
+            return exec_driver_sql(connection, statement, *args)
+
+        monkeypatch.setattr(
+            sqlalchemy.future.Connection, "exec_driver_sql", _exec_driver_sql
+        )
+
+        # act
+        repo.add([MockIndexedSqlModel(name="1", age=18)])
+        repo.finalize()
+
+        # assert
+        assert renames == [
+            "ALTER TABLE mockindexedsqlmodel RENAME CONSTRAINT "
+            "mockindexedsqlmodel__rebuilt_pkey TO mockindexedsqlmodel_pkey",
+            "ALTER INDEX ix_mockindexedsqlmodel_age__rebuilt "
+            "RENAME TO ix_mockindexedsqlmodel_age",
+        ]
+        assert session.query(MockIndexedSqlModel).all() == [
+            MockIndexedSqlModel(name="1", age=18)
+        ]
@@ -0,0 +1,121 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+from strider_challenge import adapters
+from strider_challenge.adapters import rollup
+from strider_challenge.domain import model
+
+
+def _stream(user_email: str, size_mb: float, day: int = 1) -> dict:
+    return model.Stream(
+        movie_title="title",
+        user_email=user_email,
+        size_mb=size_mb,
+        start_at=datetime.datetime(2022, 1, day, 10),
+        end_at=datetime.datetime(2022, 1, day, 11),
+    ).dict()
+
+
+def _load(session: Session, rows: list) -> None:
+    adapters.StreamRollups(session).apply(rows)
+    adapters.SqlRepository(model=model.Stream, session=session).add(rows)
+
+
+@pytest.mark.parametrize("upsert_dialects", [rollup.UPSERT_DIALECTS, {}])
+def test_apply(upsert_dialects, session: Session, monkeypatch):
+    # arrange
+    monkeypatch.setattr(rollup, "UPSERT_DIALECTS", upsert_dialects)
+    _load(session, [_stream("a", 100), _stream("b", 200), _stream("a", 50, day=2)])
+
+    # act
+    _load(session, [_stream("a", 100), _stream("b", 300), _stream("c", 10)])
+    movies = session.query(model.DailyMovieStreams).order_by("day").all()
+    users = session.query(model.DailyUserStreams).order_by("day", "user_email").all()
+
+    # assert
+    assert [(m.day.day, m.streams, m.size_mb, m.duration_seconds) for m in movies] == [
+        (1, 3, 410, 3 * 3600),
+        (2, 1, 50, 3600),
+    ]
+    assert [(u.day.day, u.user_email, u.streams, u.size_mb) for u in users] == [
+        (1, "a", 1, 100),
+        (1, "b", 1, 300),
+        (1, "c", 1, 10),
+        (2, "a", 1, 50),
+    ]
+
+
+def test_apply_repeated_ids_in_batch(session: Session):
+    # act
+    _load(session, [_stream("a", 100), _stream("a", 150)])
+    movies = session.query(model.DailyMovieStreams).all()
+
+    # assert
+    assert [(m.streams, m.size_mb) for m in movies] == [(1, 150)]
+
+
+def test_refresh(session: Session):
+    # arrange
+    adapters.SqlRepository(model=model.Stream, session=session).add(
+        [_stream("a", 100), _stream("b", 200)]
+    )
+    _load(session, [_stream("a", 100), _stream("c", 10), _stream("a", 50, day=2)])
+
+    # act
+    written = adapters.StreamRollups(session).refresh()
+    movies = session.query(model.DailyMovieStreams).order_by("day").all()
+    users = session.query(model.DailyUserStreams).order_by("day", "user_email").all()
+
+    # assert
+    assert written == 6
+    assert [(m.day.day, m.streams, m.size_mb, m.duration_seconds) for m in movies] == [
+        (1, 3, 310, 3 * 3600),
+        (2, 1, 50, 3600),
+    ]
+    assert [(u.day.day, u.user_email, u.streams, u.size_mb) for u in users] == [
+        (1, "a", 1, 100),
+        (1, "b", 1, 200),
+        (1, "c", 1, 10),
+        (2, "a", 1, 50),
+    ]
+
+
+def test_refresh_window(session: Session):
+    # arrange
+    adapters.SqlRepository(model=model.Stream, session=session).add(
+        [_stream("a", 100, day=1), _stream("a", 50, day=2), _stream("a", 20, day=3)]
+    )
+    _load(session, [_stream("b", 10, day=1), _stream("b", 10, day=3)])
+
+    # act
+    written = adapters.StreamRollups(session).refresh(
+        datetime.date(2022, 1, 2), datetime.date(2022, 1, 2)
+    )
+    movies = session.query(model.DailyMovieStreams).order_by("day").all()
+
+    # assert
+    assert written == 2
+    assert [(m.day.day, m.streams, m.size_mb) for m in movies] == [
+        (1, 1, 10),
+        (2, 1, 50),
+        (3, 1, 10),
+    ]
+
+
+def test__day_postgresql():
+    # arrange
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+
+    # act
+    day = adapters.StreamRollups(session)._day(model.Stream.start_at)
+
+    # assert
+    assert (
+        str(day.compile(dialect=postgresql.dialect()))
+        == "CAST(stream.start_at AS DATE)"
+    )
@@ -0,0 +1,80 @@
+import datetime
+import os
+
+import pytest
+
+from strider_challenge import adapters
+
+BATCHES = [
+    (2, [{"id": "1", "at": datetime.datetime(2022, 1, 1)}], 10, [(1, {}, "error")]),
+    (1, [{"id": "2", "at": datetime.datetime(2022, 1, 2)}], 20, []),
+]
+
+
+def test_put_and_get(tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path / "cache"))
+    path = tmp_path / "data.csv"
+    path.write_text("id,at\n")
+    key = cache.key("movie", str(path))
+    missing = cache.get(key)
+
+    # act
+    written = list(cache.put(key, iter(BATCHES)))
+    snapshot = cache.get(key)
+
+    # assert
+    assert missing is None
+    assert written == BATCHES
+    assert snapshot is not None
+    assert (snapshot.records, snapshot.position) == (3, 20)
+    assert list(snapshot) == BATCHES
+    assert key.startswith("movie-")
+    assert cache.key("movie", str(path), "fast") != key
+
+
+def test_put_without_positions(tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path))
+
+    # act
+    list(cache.put("key", iter([(0, [], None, [])])))
+    snapshot = cache.get("key")
+
+    # assert
+    assert snapshot is not None
+    assert (snapshot.records, snapshot.position) == (0, None)
+    assert list(snapshot) == [(0, [], None, [])]
+
+
+def test_put_error(tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path))
+
+    def batches():
+        yield BATCHES[0]
+        raise ValueError("transform failed")
+
+    # act
+    with pytest.raises(ValueError, match="transform failed"):
+        list(cache.put("key", batches()))
+
+    # assert
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_least_recently_used(tmp_path):
+    # arrange
+    cache = adapters.SnapshotCache(str(tmp_path))
+    for i, key in enumerate(["a", "b"]):
+        list(cache.put(key, iter(BATCHES)))
+        os.utime(tmp_path / f"{key}.snapshot", ns=(i, i))
+    cache.max_bytes = 2 * os.path.getsize(tmp_path / "a.snapshot")
+
+    # act
+    cache.get("a")
+    list(cache.put("c", iter(BATCHES)))
+
+    # assert
+    assert sorted(os.listdir(tmp_path)) == ["a.snapshot", "c.snapshot"]
@@ -0,0 +1,96 @@
+import datetime
+import json
+
+from sqlmodel import Session
+
+from strider_challenge import adapters
+from strider_challenge.domain import model
+from strider_challenge.domain.sketch import QuantileSketch
+
+
+def _stream(user_email: str, size_mb: float, hours: int = 1) -> dict:
+    return model.Stream(
+        movie_title="title",
+        user_email=user_email,
+        size_mb=size_mb,
+        start_at=datetime.datetime(2022, 1, 1, 10),
+        end_at=datetime.datetime(2022, 1, 1, 10 + hours),
+    ).dict()
+
+
+def _load(session: Session, rows: list) -> None:
+    adapters.StreamSketches(session).apply(rows)
+    adapters.SqlRepository(model=model.Stream, session=session).add(rows)
+
+
+def test_apply(session: Session):
+    # arrange
+    _load(session, [_stream("a", 100), _stream("b", 200, hours=2)])
+
+    # act
+    _load(session, [_stream("a", 100), _stream("c", 10, hours=3), _stream("d", 300)])
+    _load(session, [_stream("a", 100)])
+    size = session.get(model.StreamStatistics, "size_mb")
+    duration = session.get(model.StreamStatistics, "duration_seconds")
+
+    # assert
+    assert (size.count, size.total, size.minimum, size.maximum) == (4, 610, 10, 300)
+    assert (duration.count, duration.total) == (4, 7 * 3600)
+    sketch = QuantileSketch.from_dict(json.loads(size.sketch))
+    assert sketch.count == 4
+    assert sketch.quantile(0.5) == 100
+
+
+def test_apply_changed_size(session: Session):
+    # arrange
+    _load(session, [_stream("a", 100), _stream("b", 200)])
+
+    # act
+    _load(session, [_stream("a", 150)])
+    size = session.get(model.StreamStatistics, "size_mb")
+
+    # assert
+    assert (size.count, size.total, size.minimum, size.maximum) == (2, 350, 100, 200)
+
+
+def test_apply_changed_size_without_statistics(session: Session):
+    # arrange
+    adapters.SqlRepository(model=model.Stream, session=session).add([_stream("a", 100)])
+
+    # act
+    _load(session, [_stream("a", 150)])
+
+    # assert
+    assert session.query(model.StreamStatistics).count() == 0
+
+
+def test_refresh(session: Session):
+    # arrange
+    adapters.SqlRepository(model=model.Stream, session=session).add(
+        [_stream("a", 100), _stream("b", 200, hours=2)]
+    )
+    _load(session, [_stream("c", 10, hours=3), _stream("a", 150)])
+
+    # act
+    count = adapters.StreamSketches(session, batch_size=2).refresh()
+    size = session.get(model.StreamStatistics, "size_mb")
+    duration = session.get(model.StreamStatistics, "duration_seconds")
+
+    # assert
+    assert count == 3
+    assert (size.count, size.total, size.minimum, size.maximum) == (3, 360, 10, 200)
+    assert (duration.count, duration.total) == (3, 6 * 3600)
+    assert QuantileSketch.from_dict(json.loads(size.sketch)).quantile(0.5) == 150
+
+
+def test_refresh_without_streams(session: Session):
+    # arrange
+    _load(session, [_stream("a", 100)])
+    session.query(model.Stream).delete()
+
+    # act
+    count = adapters.StreamSketches(session).refresh()
+
+    # assert
+    assert count == 0
+    assert session.query(model.StreamStatistics).count() == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from strider_challenge.domain import columnar, converters
+
+
+def _record(start_at: str, end_at: str, size_mb: str = "613.42") -> dict:
+    return {
+        "movie_title": "Full Metal Jacket",
+        "user_email": "rodrick_bergnaum@murray.co",
+        "size_mb": size_mb,
+        "start_at": start_at,
+        "end_at": end_at,
+    }
+
+
+def test_transform_streams():
+    # arrange
+    records = [
+        _record("2021-12-06T19:30:19.099+0100", "2021-12-07T15:44:38.177+0100"),
+        _record("2021-12-06T19:30:19.000+0000", "2021-12-06T19:30:19.010-0000"),
+        _record("2021-12-06T19:30:19.000-0330", "2021-12-31T23:59:59.999+1400"),
+    ]
+
+    # act
+    output = columnar.transform_streams(records)
+
+    # assert
+    assert output == [converters.STREAM_CONVERTER(r) for r in records]
+
+
+def test_transform_streams_other_timestamp_formats():
+    # arrange
+    records = [
+        _record("2021-12-06T19:30:19.099+0100", "2021-12-07T15:44:38.177+0100"),
+        _record("2021-12-06 19:30:19", "2021-12-07T15:44:38"),
+    ]
+
+    # act
+    output = columnar.transform_streams(records)
+
+    # assert
+    assert output == [converters.STREAM_CONVERTER(r) for r in records]
+
+
+def test_transform_streams_empty():
+    # act and assert
+    assert columnar.transform_streams([]) == []
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        _record("2021-12-06T19:30:19.099+0100", "2021-12-07T15:44:38.177+0100", "a"),
+        _record("2021-13-06T19:30:19.099+0100", "2021-12-07T15:44:38.177+0100"),
+        _record("2021-12-06T19:30:19.099+01ö0", "2021-12-07T15:44:38.177+0100"),
+    ],
+)
+def test_transform_streams_invalid(record):
+    # act and assert
+    with pytest.raises(ValueError):
+        columnar.transform_streams([record])
@@ -0,0 +1,43 @@
+import numpy as np
+
+from strider_challenge.domain.completion import MovieDurations, max_by_group
+
+
+def test_ratios():
+    # arrange
+    durations = MovieDurations(["b", "a", "c"], [60, 120, 30])
+
+    # act
+    output = durations.ratios(
+        np.array(["a", "b", "z", "0"]), np.array([3600.0, 1800.0, 60.0, 60.0])
+    )
+
+    # assert
+    np.testing.assert_array_equal(output, [0.5, 0.5, np.nan, np.nan])
+
+
+def test_ratios_without_movies():
+    # act
+    output = MovieDurations([], []).ratios(np.array(["a"]), np.array([60.0]))
+
+    # assert
+    assert np.isnan(output).all()
+
+
+def test_max_by_group():
+    # arrange
+    days = np.array([1, 1, 1, 2, 1, 1])
+    users = np.array(["u1", "u1", "u2", "u1", "u1", "u1"])
+    movies = np.array(["a", "a", "a", "a", "b", "b"])
+    ratios = np.array([0.2, 0.7, 0.1, 0.3, np.nan, 0.4])
+
+    # act
+    output = max_by_group(days, users, movies, ratios)
+
+    # assert
+    assert [column.tolist() for column in output] == [
+        [1, 1, 1, 2],
+        ["u1", "u1", "u2", "u1"],
+        ["a", "b", "a", "a"],
+        [0.7, 0.4, 0.1, 0.3],
+    ]
@@ -0,0 +1,100 @@
+import datetime
+
+import pytest
+
+from strider_challenge.domain import converters, model, raw
+
+AUTHOR_RECORD = {
+    "metadata": {
+        "name": "name",
+        "birth_date": "2000-01-01T00:00:00.000+0000",
+        "died_at": None,
+    },
+    "nationalities": [
+        {"id": None, "label": "Guianese (French)", "slug": "guianese-french"},
+        {"id": None, "label": "", "slug": ""},
+    ],
+}
+
+REVIEW_RECORD = {
+    "content": {"text": "text"},
+    "rating": {"rate": 5, "label": "FIVE"},
+    "books": [{"id": None, "metadata": {"title": "book_title", "pages": "pages"}}],
+    "movies": [{"id": 0, "title": "movie_title"}, {"id": 0, "title": "end"}],
+}
+
+
+def test_converter():
+    # arrange
+    record = {
+        "movie_title": "title",
+        "user_email": "email",
+        "size_mb": "256.5",
+        "start_at": "2022-01-01T00:00:00.000+0100",
+        "end_at": "2022-01-01T01:00:00.500+0100",
+    }
+
+    # act
+    output = converters.STREAM_CONVERTER(record)
+
+    # assert
+    assert output == model.Stream(**record).dict()
+    assert output["start_at"] == datetime.datetime(
+        2022, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=1))
+    )
+
+
+def test_converter_coerce_types():
+    # act
+    output = converters.MOVIE_CONVERTER(
+        {"title": 1, "duration_mins": "90", "original_language": "en", "size_mb": 5}
+    )
+
+    # assert
+    assert output == {
+        "title": "1",
+        "duration_mins": 90,
+        "original_language": "en",
+        "size_mb": 5,
+    }
+
+
+def test_converter_missing_required_field():
+    # act and assert
+    with pytest.raises(KeyError):
+        converters.USER_CONVERTER({"email": "email", "first_name": "first"})
+
+
+def test_build_author_row():
+    # act
+    output = converters.build_author_row(AUTHOR_RECORD)
+
+    # assert
+    assert output == model.build_author(raw.AuthorRaw(**AUTHOR_RECORD)).dict()
+
+
+def test_build_author_row_without_name():
+    # act
+    output = converters.build_author_row({"metadata": {"name": None}})
+
+    # assert
+    assert output is None
+
+
+def test_build_book_row():
+    # arrange
+    record = {"name": "title", "pages": 123, "author": "a", "publisher": "p"}
+
+    # act
+    output = converters.build_book_row(record)
+
+    # assert
+    assert output == model.build_book(raw.BookRaw(**record)).dict()
+
+
+def test_build_review_row():
+    # act
+    output = converters.build_review_row(REVIEW_RECORD)
+
+    # assert
+    assert output == model.build_review(raw.ReviewRaw(**REVIEW_RECORD)).dict()
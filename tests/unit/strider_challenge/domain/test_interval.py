@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from strider_challenge.domain.interval import IntervalIndex
+
+ROWS = [
+    ("a", "u1", datetime(2021, 12, 25, 1), datetime(2021, 12, 25, 23)),
+    ("a", "u2", datetime(2021, 12, 25, 6), datetime(2021, 12, 25, 7)),
+    ("a", "u3", datetime(2021, 12, 25, 8), datetime(2021, 12, 25, 9)),
+    ("a", "u3", datetime(2021, 12, 25, 10), datetime(2021, 12, 25, 11)),
+    ("a", "u4", datetime(2021, 12, 25, 12, 1), datetime(2021, 12, 25, 13)),
+    ("b", "u4", datetime(2021, 12, 25, 8), datetime(2021, 12, 25, 9)),
+]
+
+
+@pytest.mark.parametrize(
+    "key, start, end, expected",
+    [
+        (
+            "a",
+            datetime(2021, 12, 25, 7),
+            datetime(2021, 12, 25, 12),
+            ["u1", "u2", "u3"],
+        ),
+        ("a", datetime(2021, 12, 25, 9, 30), datetime(2021, 12, 25, 9, 45), ["u1"]),
+        ("a", datetime(2021, 12, 26), datetime(2021, 12, 27), []),
+        ("b", datetime(2021, 12, 25, 7), datetime(2021, 12, 25, 12), ["u4"]),
+        ("c", datetime(2021, 12, 25, 7), datetime(2021, 12, 25, 12), []),
+    ],
+)
+def test_overlapping(key, start, end, expected):
+    # arrange
+    index = IntervalIndex.build(ROWS)
+
+    # act
+    output = index.overlapping(key, start, end)
+
+    # assert
+    assert output == expected
+    assert index.count(key, start, end) == len(expected)
+
+
+def test_overlapping_brute_force():
+    # arrange
+    day = datetime(2021, 12, 1)
+    rows = [
+        ("a", f"u{i % 7}", day + timedelta(hours=i % 50), day + timedelta(hours=i % 13))
+        for i in range(200)
+    ]
+    rows = [(k, v, s, e) for k, v, s, e in rows if e >= s]
+    index = IntervalIndex.build(rows)
+
+    for hour in range(60):
+        start, end = day + timedelta(hours=hour), day + timedelta(hours=hour + 2)
+
+        # act
+        output = index.overlapping("a", start, end)
+
+        # assert
+        assert output == sorted({v for _, v, s, e in rows if s <= end and e >= start})
+
+
+def test_overlapping_timezone_aware():
+    # arrange
+    zone = timezone(timedelta(hours=1))
+    index = IntervalIndex.build(
+        [("a", "u1", datetime(2021, 12, 25, 8, tzinfo=zone), datetime(2021, 12, 25, 9))]
+    )
+
+    # act
+    output = index.overlapping(
+        "a", datetime(2021, 12, 25, 7, 30), datetime(2021, 12, 25, 8, 30, tzinfo=zone)
+    )
+
+    # assert
+    assert output == ["u1"]
+
+
+def test_build_epoch_millis():
+    # arrange
+    rows = [("a", "u1", 1640419200000, 1640422800000)]  # 2021-12-25 08:00 to 09:00
+
+    # act
+    index = IntervalIndex.build(rows, epoch_millis=True)
+
+    # assert
+    assert index.count("a", datetime(2021, 12, 25, 8, 30), datetime(2021, 12, 26)) == 1
+    assert index.count("a", datetime(2021, 12, 25, 9, 1), datetime(2021, 12, 26)) == 0
+
+
+def test_build_empty():
+    # act
+    index = IntervalIndex.build([])
+
+    # assert
+    assert index.overlapping("a", datetime(2021, 1, 1), datetime(2022, 1, 1)) == []
@@ -107,3 +107,17 @@ def test_stream_id_generation():
 
     # act and assert
     assert stream.id == "7bd49d0f438ed44e7ab2b1c30b8d78e5fc93e1f2"
+
+
+def test_stream_duration():
+    # act
+    stream = model.Stream(
+        movie_title="title",
+        user_email="email",
+        size_mb=256,
+        start_at=datetime.datetime(2022, 1, 1),
+        end_at=datetime.datetime(2022, 1, 1, 1, 30, 0, 500000),
+    )
+
+    # act and assert
+    assert stream.duration_seconds == 5400.5
@@ -0,0 +1,85 @@
+import random
+from bisect import bisect_left
+
+from strider_challenge.domain.sketch import QuantileSketch
+
+
+def _rank_error(values: list, value: float, q: float) -> float:
+    return abs(bisect_left(values, value) / len(values) - q)
+
+
+def test_quantile():
+    # arrange
+    generator = random.Random(1)
+    values = [generator.lognormvariate(0, 1) for _ in range(20_000)]
+    sketch = QuantileSketch()
+
+    # act
+    sketch.update(values)
+
+    # assert
+    assert sketch.count == len(values)
+    assert sum(len(items) for items in sketch.compactors) < 3 * sketch.k
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        assert _rank_error(sorted(values), sketch.quantile(q), q) < 0.02
+
+
+def test_merge():
+    # arrange
+    generator = random.Random(2)
+    values = [generator.random() for _ in range(20_000)]
+    first, second = QuantileSketch(), QuantileSketch()
+    first.update(values[:5_000])
+    second.update(values[5_000:])
+
+    # act
+    first.merge(second)
+
+    # assert
+    assert first.count == len(values)
+    assert _rank_error(sorted(values), first.quantile(0.5), 0.5) < 0.02
+
+
+def test_merge_taller_sketch():
+    # arrange
+    small, large = QuantileSketch(k=8), QuantileSketch(k=8)
+    small.update([1.0])
+    large.update(float(i) for i in range(100))
+
+    # act
+    small.merge(large)
+
+    # assert
+    assert small.count == 101
+    assert len(small.compactors) >= len(large.compactors)
+
+
+def test_quantile_exact_for_few_values():
+    # arrange
+    sketch = QuantileSketch()
+
+    # act
+    sketch.update([3.0, 1.0, 2.0])
+
+    # assert
+    assert sketch.quantile(0) == 1.0
+    assert sketch.quantile(0.5) == 2.0
+    assert sketch.quantile(1) == 3.0
+
+
+def test_quantile_empty():
+    # act and assert
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_to_dict_and_from_dict():
+    # arrange
+    sketch = QuantileSketch(k=16)
+    sketch.update(float(i) for i in range(100))
+
+    # act
+    output = QuantileSketch.from_dict(sketch.to_dict())
+
+    # assert
+    assert output.to_dict() == sketch.to_dict()
+    assert output.quantile(0.5) == sketch.quantile(0.5)
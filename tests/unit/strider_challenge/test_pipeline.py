@@ -0,0 +1,55 @@
+import operator
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from strider_challenge.pipeline import Pipeline
+
+
+def _route(item: int) -> list[int | None]:
+    return [item, None] if item % 2 else [None, item]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run(workers):
+    # arrange
+    even: list[int] = []
+    odd: list[int] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pipeline = Pipeline(
+            operator.neg,
+            _route,
+            [odd.append, even.append],
+            executor=executor if workers > 1 else None,
+            concurrency=workers,
+            queue_size=1,
+        )
+
+        # act
+        pipeline.run(iter(range(20)))
+
+    # assert
+    assert odd == [-i for i in range(20) if i % 2]
+    assert even == [-i for i in range(20) if not i % 2]
+
+
+def test_run_failing_writer():
+    # arrange
+    def fail(item: int) -> None:
+        raise ConnectionError("transient error")
+
+    pipeline = Pipeline(operator.neg, _route, [fail, fail], queue_size=1)
+
+    # act and assert
+    with pytest.raises(ConnectionError):
+        pipeline.run(iter(range(20)))
+
+
+def test_run_failing_extract():
+    # arrange
+    written: list[int] = []
+    pipeline = Pipeline(operator.neg, lambda item: [item], [written.append])
+
+    # act and assert
+    with pytest.raises(ZeroDivisionError):
+        pipeline.run(1 // i for i in [1, 0, 1])